@@ -0,0 +1,60 @@
+"""Benchmark synthesis throughput against dynamic batch size.
+
+Usage:
+    python benchmarks/bench_batching.py --requests 256 --batch-sizes 1 2 4 8 16 32
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import wait
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.core.config import Config
+from voice_clone.modules.batch_scheduler import BatchScheduler
+from voice_clone.modules.synthesis_engine import SynthesisEngine
+
+
+def run(batch_size: int, n_requests: int, max_wait_ms: float, seed: int = 0) -> float:
+    """Submit n_requests concurrently and return requests per second"""
+    config = Config()
+    config.model.max_batch_size = batch_size
+    config.model.batch_max_wait_ms = max_wait_ms
+    engine = SynthesisEngine(config)
+    scheduler = BatchScheduler(engine, config)
+
+    rng = np.random.default_rng(seed)
+    texts = ["x" * int(n) for n in rng.integers(10, 40, size=n_requests)]
+    embeddings = rng.standard_normal((n_requests, 512)).astype(np.float32)
+    rates = rng.uniform(0.8, 1.5, size=n_requests)
+    pitches = rng.uniform(-15, 15, size=n_requests)
+
+    start = time.perf_counter()
+    futures = [scheduler.submit(text, embeddings[i], rates[i], pitches[i])
+               for i, text in enumerate(texts)]
+    wait(futures)
+    elapsed = time.perf_counter() - start
+    scheduler.shutdown()
+    return n_requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=128)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--max-wait-ms', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'batch_size':>10}  {'req/s':>10}  {'speedup':>8}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        throughput = run(batch_size, args.requests, args.max_wait_ms)
+        baseline = baseline or throughput
+        print(f"{batch_size:>10}  {throughput:>10.1f}  {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
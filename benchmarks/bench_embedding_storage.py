@@ -0,0 +1,112 @@
+"""Measure size, decode speed and cosine error of fp16/int8 embedding storage.
+
+Runs on synthetic embeddings by default, or on a real voice library with
+--voices-dir (per-voice .npz profiles, or an mmap store directory).
+
+Usage:
+    python benchmarks/bench_embedding_storage.py --voices 100000
+    python benchmarks/bench_embedding_storage.py --voices-dir ~/.voice_clone/voices
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.modules.embedding_codec import (
+    STORAGE_DTYPES, cosine_similarity_rows, dequantize_embeddings, quantize_embeddings, read_profile_embedding,
+    save_profile,
+)
+from voice_clone.modules.voice_store import VoiceStore
+
+
+def load_library(voices_dir: Path) -> np.ndarray:
+    """Float32 (n, dim) matrix of every voice in a library directory"""
+    if (voices_dir / VoiceStore.INDEX_FILE).exists():
+        store = VoiceStore(voices_dir)
+        rows = store.live_rows()
+        return np.asarray(store.matrix()[sorted(rows.values())], dtype=np.float32)
+    embeddings = []
+    for path in sorted(voices_dir.glob("*.npz")):
+        with np.load(path) as data:
+            embeddings.append(read_profile_embedding(data))
+    return np.stack(embeddings)
+
+
+def best_of(fn, repeats: int = 3) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def top_k(matrix: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k most cosine-similar rows for each query"""
+    normalized = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    scores = queries @ normalized.T
+    return np.argpartition(-scores, k, axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--voices', type=int, default=100000, help='synthetic library size')
+    parser.add_argument('--dim', type=int, default=512)
+    parser.add_argument('--voices-dir', type=Path, help='measure an existing library instead')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.voices_dir:
+        embeddings = load_library(args.voices_dir.expanduser())
+    else:
+        # Correlated directions and varied norms, closer to real speaker embeddings than iid noise
+        basis = rng.standard_normal((64, args.dim)).astype(np.float32)
+        embeddings = rng.standard_normal((args.voices, 64)).astype(np.float32) @ basis
+        embeddings += 0.5 * rng.standard_normal(embeddings.shape).astype(np.float32)
+        embeddings *= rng.uniform(0.1, 5.0, (args.voices, 1)).astype(np.float32)
+    n, dim = embeddings.shape
+    k = min(args.k, n - 1)
+    query_rows = rng.choice(n, size=min(args.queries, n), replace=False)
+    queries = embeddings[query_rows] + 0.3 * rng.standard_normal((len(query_rows), dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    reference = top_k(embeddings, queries, k)
+
+    print(f"{n} embeddings x {dim} dims; recall@{k} over {len(query_rows)} noisy queries")
+    print(f"{'dtype':>6} {'MB':>8} {'npz B':>7} {'encode ms':>10} {'decode ms':>10} {'GB/s':>6} "
+          f"{'err max':>9} {'err p99':>9} {'err mean':>9} {'recall':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in STORAGE_DTYPES:
+            values, scales = quantize_embeddings(embeddings, dtype)
+            encode = best_of(lambda: quantize_embeddings(embeddings, dtype))
+            out = np.empty(embeddings.shape, dtype=np.float32)
+            decode = best_of(lambda: dequantize_embeddings(values, scales, out=out))
+            decoded = dequantize_embeddings(values, scales)
+
+            size = values.nbytes + (scales.nbytes if scales is not None else 0)
+            profile = Path(tmp) / f"profile_{dtype}.npz"
+            save_profile(profile, embeddings[0], "sample", dtype)
+
+            error = 1 - cosine_similarity_rows(embeddings, decoded)  # cosine error per vector
+            found = top_k(decoded, queries, k)
+            recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(reference, found)])
+            print(f"{dtype:>6} {size / 2 ** 20:>8.1f} {profile.stat().st_size:>7} {1000 * encode:>10.1f} "
+                  f"{1000 * decode:>10.1f} {out.nbytes / decode / 1e9:>6.2f} {error.max():>9.2e} "
+                  f"{np.percentile(error, 99):>9.2e} {error.mean():>9.2e} {recall:>7.3f}")
+
+    # Bulk decode against decoding each vector separately, as per-profile loads do
+    values, scales = quantize_embeddings(embeddings[:10000], "int8")
+    bulk = best_of(lambda: dequantize_embeddings(values, scales))
+    per_row = best_of(lambda: [dequantize_embeddings(v, s) for v, s in zip(values, scales)], repeats=1)
+    print(f"\nint8 decode of {len(values)} vectors: bulk {1000 * bulk:.1f} ms, "
+          f"per vector {1000 * per_row:.1f} ms ({per_row / bulk:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Compare WAV, FLAC and Ogg/Opus export: encode throughput and output size.
+
+Encodes deterministic speech-like clips with each format, once file by file
+on the calling thread and once as a batch through BatchExporter's process
+pool, and reports realtime factors and bytes per audio second.
+
+Usage:
+    python benchmarks/bench_export_formats.py --files 40 --seconds 20 --processes 4
+"""
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_suite import synthetic_voice
+from voice_clone.core.batch_export import BatchExporter
+from voice_clone.core.config import Config
+from voice_clone.modules.encoders import EXPORT_FORMATS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=40)
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    clips = [(synthetic_voice(args.seconds, args.sample_rate, seed), args.sample_rate) for seed in range(args.files)]
+    audio_seconds = args.files * args.seconds
+    print(f"{args.files} clips x {args.seconds:.0f}s at {args.sample_rate} Hz, "
+          f"{args.processes} encode processes, cpu_count={os.cpu_count()}")
+    print(f"{'format':>7} {'KB/audio s':>11} {'ratio':>6} {'serial x rt':>12} {'pool x rt':>10}")
+
+    wav_bytes = None
+    with tempfile.TemporaryDirectory(prefix="voice_clone_export_") as tmp:
+        tmp = Path(tmp)
+        config = Config(app_dir=tmp, models_dir=tmp / "models", voices_dir=tmp / "voices",
+                        exports_dir=tmp / "exports", logs_dir=tmp / "logs", cache_dir=tmp / "cache")
+        config.audio.sample_rate = args.sample_rate
+        for fmt, extension in EXPORT_FORMATS.items():
+            with BatchExporter(config, fmt, processes=0) as exporter:
+                exporter.export(clips[0], tmp / f"warm{extension}")  # imports and filter design
+                start = time.perf_counter()
+                entries = [exporter.export(clip, tmp / f"serial_{i}{extension}") for i, clip in enumerate(clips)]
+                serial = time.perf_counter() - start
+
+            # The pool is fed from several threads, as the render pipeline's write stage does
+            with BatchExporter(config, fmt, processes=args.processes) as exporter, \
+                    ThreadPoolExecutor(max_workers=2 * args.processes) as threads:
+                exporter.export(clips[0], tmp / f"warm{extension}")  # start the worker processes
+                start = time.perf_counter()
+                list(threads.map(lambda item: exporter.export(item[1], tmp / f"pool_{item[0]}{extension}"),
+                                 enumerate(clips)))
+                pooled = time.perf_counter() - start
+
+            size = sum(entry['bytes'] for entry in entries)
+            wav_bytes = wav_bytes or size
+            print(f"{fmt:>7} {size / audio_seconds / 1024:>11.1f} {wav_bytes / size:>6.1f} "
+                  f"{audio_seconds / serial:>12.0f} {audio_seconds / pooled:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
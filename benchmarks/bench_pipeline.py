@@ -0,0 +1,99 @@
+"""Compare sequential and pipelined script rendering.
+
+Renders the same synthetic script once line by line (preprocess, synthesize,
+post-process and write in turn) and once through the staged pipeline, then
+prints wall time, throughput and per-stage queue statistics. Synthesis can
+be given extra simulated latency to stand in for a model forward pass that
+releases the GIL.
+
+Usage:
+    python benchmarks/bench_pipeline.py --lines 40 --synthesis-workers 2 --write-workers 2
+    python benchmarks/bench_pipeline.py --model-latency-ms 50 --lufs -16
+"""
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.core.config import Config
+from voice_clone.core.render_pipeline import PipelineItem, format_stage_stats
+from voice_clone.core.script_renderer import ScriptRenderer, load_script
+
+TEXT = "The pipeline overlaps synthesis of one line with writing the previous one. " * 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=40)
+    parser.add_argument('--synthesis-workers', type=int, default=2)
+    parser.add_argument('--write-workers', type=int, default=2)
+    parser.add_argument('--queue-size', type=int, default=4)
+    parser.add_argument('--model-latency-ms', type=float, default=0.0,
+                        help='extra sleep per synthesized line, simulating GPU inference')
+    parser.add_argument('--lufs', type=float, default=None, help='loudness-normalize in post-processing')
+    parser.add_argument('--unordered', action='store_true')
+    args = parser.parse_args()
+
+    from voice_clone.core.application import VoiceCloneApp
+
+    with tempfile.TemporaryDirectory(prefix="voice_clone_pipeline_") as tmp:
+        tmp = Path(tmp)
+        config = Config(app_dir=tmp, models_dir=tmp / "models", voices_dir=tmp / "voices",
+                        exports_dir=tmp / "exports", logs_dir=tmp / "logs", cache_dir=tmp / "cache")
+        config.model.device = "cpu"
+        config.cache.enabled = False
+        config.pipeline.synthesis_workers = args.synthesis_workers
+        config.pipeline.write_workers = args.write_workers
+        config.pipeline.queue_size = args.queue_size
+        app = VoiceCloneApp(config)
+        app.warm_up(background=False)
+        app.voice_embedder.store_voice("bench", np.random.default_rng(0).standard_normal(512).astype(np.float32))
+
+        if args.model_latency_ms:
+            synthesize = app.synthesis_engine.synthesize
+
+            def slow_synthesize(*a, **kw):
+                time.sleep(args.model_latency_ms / 1000)
+                return synthesize(*a, **kw)
+
+            app.synthesis_engine.synthesize = slow_synthesize
+
+        script = tmp / "script.jsonl"
+        script.write_text("\n".join(json.dumps({"voice": "bench", "text": TEXT, "rate": 1.0 + 0.05 * (i % 5)})
+                                    for i in range(args.lines)), encoding="utf-8")
+
+        # Sequential: the same stage functions, one line at a time
+        renderer = ScriptRenderer(app, tmp / "sequential")
+        start = time.perf_counter()
+        audio_seconds = 0.0
+        for line in load_script(script):
+            job = renderer._write(renderer._postprocess(renderer._synthesize(
+                renderer._preprocess({'line': line})), args.lufs))
+            audio_seconds += renderer._finish(PipelineItem(line.index, job))['audio_seconds']
+        sequential = time.perf_counter() - start
+
+        summary = app.render_script(str(script), resume=False, output_dir=str(tmp / "pipelined"),
+                                    ordered=not args.unordered, target_lufs=args.lufs)
+        pipelined = summary['wall_time']
+
+    print(f"{args.lines} lines, {audio_seconds:.0f}s of audio, cpu_count={os.cpu_count()}")
+    print(f"sequential  {sequential:7.2f}s  {audio_seconds / sequential:7.1f}x realtime")
+    print(f"pipelined   {pipelined:7.2f}s  {summary['audio_seconds'] / pipelined:7.1f}x realtime  "
+          f"({sequential / pipelined:.2f}x speedup)")
+    print(f"latency per line: p50 {summary['latency_p50']:.3f}s, p95 {summary['latency_p95']:.3f}s")
+    for line in format_stage_stats(summary['stages']):
+        print(f"  {line}")
+
+
+if __name__ == '__main__':
+    main()
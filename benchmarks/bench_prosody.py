@@ -0,0 +1,81 @@
+"""Real-time factor of the phase-vocoder prosody engine over rate and pitch.
+
+Processes deterministic speech-like clips at every (rate, pitch) point of a
+grid, one clip at a time, as a batch in one call, and streamed in chunks,
+and reports how many times faster than realtime each mode runs. Run with
+one BLAS/FFT thread to measure a single core.
+
+Usage:
+    python benchmarks/bench_prosody.py --clips 4 --seconds 10
+    OMP_NUM_THREADS=1 python benchmarks/bench_prosody.py --rates 0.8 1.0 1.5 --pitches -15 0 15
+"""
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_suite import synthetic_voice
+from voice_clone.modules.prosody import ProsodyProcessor, apply_prosody
+
+
+def best_of(fn, repeats: int) -> float:
+    """Fastest wall time of fn over repeats"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clips', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.8, 1.0, 1.25, 1.5])
+    parser.add_argument('--pitches', type=float, nargs='+', default=[-15.0, -5.0, 0.0, 5.0, 15.0])
+    parser.add_argument('--chunk', type=int, default=4096, help='streaming chunk size in samples')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    sr = args.sample_rate
+    clips = np.stack([synthetic_voice(args.seconds, sr, seed) for seed in range(args.clips)]).astype(np.float32)
+    audio_seconds = args.clips * args.seconds
+    print(f"{args.clips} clips x {args.seconds:.0f}s at {sr} Hz, cpu_count={os.cpu_count()}; x realtime")
+    print(f"{'rate':>5} {'pitch':>6} {'single':>8} {'batch':>8} {'stream':>8}")
+
+    worst = np.inf
+    for rate in args.rates:
+        for pitch in args.pitches:
+            if rate == 1.0 and pitch == 0.0:
+                continue  # identity, nothing to process
+            apply_prosody(clips[0], sr, rate, pitch)  # filter design
+
+            def stream():
+                processor = ProsodyProcessor(sr, rate, pitch)
+                for clip in clips:
+                    for i in range(0, len(clip), args.chunk):
+                        processor.process(clip[i:i + args.chunk])
+                    processor.flush()
+
+            single = best_of(lambda: [apply_prosody(clip, sr, rate, pitch) for clip in clips], args.repeats)
+            batch = best_of(lambda: apply_prosody(clips, sr, rate, pitch), args.repeats)
+            streamed = best_of(stream, args.repeats)
+            worst = min(worst, audio_seconds / max(single, batch, streamed))
+            print(f"{rate:>5.2f} {pitch:>+6.0f} {audio_seconds / single:>8.0f} {audio_seconds / batch:>8.0f} "
+                  f"{audio_seconds / streamed:>8.0f}")
+    print(f"slowest point: {worst:.0f}x realtime")
+
+
+if __name__ == '__main__':
+    main()
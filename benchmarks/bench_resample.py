@@ -0,0 +1,88 @@
+"""Benchmark the polyphase resampler against librosa.resample.
+
+Usage:
+    python benchmarks/bench_resample.py --clips 16 --seconds 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.modules.resampler import StreamingResampler, filter_bank, resample
+
+RATE_PAIRS = [(16000, 44100), (22050, 44100), (44100, 48000), (48000, 44100), (48000, 16000)]
+
+
+def best_of(fn, repeats: int) -> float:
+    """Fastest wall time of fn over repeats"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def snr_db(reference: np.ndarray, estimate: np.ndarray) -> float:
+    """Agreement between two resampled signals, ignoring edge transients"""
+    n = min(len(reference), len(estimate))
+    reference, estimate = reference[256:n - 256], estimate[256:n - 256]
+    error = np.sum((reference - estimate) ** 2)
+    return float(10 * np.log10(np.sum(reference ** 2) / max(error, 1e-30)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clips', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--quality', default='default')
+    parser.add_argument('--chunk', type=int, default=4096, help='streaming chunk size in samples')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    import librosa
+
+    rng = np.random.default_rng(0)
+    print(f"{args.clips} clips x {args.seconds:.1f}s, quality={args.quality}; ms per clip")
+    print(f"{'rate pair':>15} {'librosa':>9} {'design':>8} {'single':>8} {'batch':>8} "
+          f"{'stream':>8} {'speedup':>8} {'snr_db':>7}")
+    for orig_sr, target_sr in RATE_PAIRS:
+        n = int(orig_sr * args.seconds)
+        # Band-limited test signal: a few tones below both Nyquist rates
+        t = np.arange(n) / orig_sr
+        freqs = rng.uniform(80, 0.4 * min(orig_sr, target_sr), size=(args.clips, 4, 1))
+        clips = (0.2 * np.sin(2 * np.pi * freqs * t).sum(axis=1)).astype(np.float32)
+
+        filter_bank.cache_clear()
+        start = time.perf_counter()
+        filter_bank(orig_sr, target_sr, args.quality)
+        design = time.perf_counter() - start
+
+        t_librosa = best_of(lambda: [librosa.resample(c, orig_sr=orig_sr, target_sr=target_sr)
+                                     for c in clips], args.repeats)
+        t_single = best_of(lambda: [resample(c, orig_sr, target_sr, args.quality) for c in clips],
+                           args.repeats)
+        t_batch = best_of(lambda: resample(clips, orig_sr, target_sr, args.quality), args.repeats)
+
+        def stream():
+            resampler = StreamingResampler(orig_sr, target_sr, args.quality)
+            for clip in clips:
+                for i in range(0, n, args.chunk):
+                    resampler.process(clip[i:i + args.chunk])
+                resampler.flush()
+        t_stream = best_of(stream, args.repeats)
+
+        agreement = snr_db(librosa.resample(clips[0], orig_sr=orig_sr, target_sr=target_sr),
+                           resample(clips[0], orig_sr, target_sr, args.quality))
+        per_clip = lambda t: 1000 * t / args.clips
+        print(f"{orig_sr:>7}->{target_sr:<7} {per_clip(t_librosa):9.2f} {1000 * design:8.2f} "
+              f"{per_clip(t_single):8.2f} {per_clip(t_batch):8.2f} {per_clip(t_stream):8.2f} "
+              f"{t_librosa / t_single:7.2f}x {agreement:7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Compare pickling waveforms with shared-memory handles for process-pool IPC.
+
+Sends float32 clips of several lengths to a process pool whose task only
+reads the audio (a peak scan), once pickled as arrays and once as
+SharedBufferPool handles, so the difference is the cost of moving the
+samples between processes. Reports milliseconds per task, effective
+throughput and the pool's segment count (slab reuse keeps it flat).
+
+Usage:
+    python benchmarks/bench_shared_memory.py --tasks 200 --processes 2
+"""
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.core.shared_buffers import SharedBufferPool, attach
+
+CLIP_SECONDS = [1.0, 10.0, 60.0, 300.0]
+
+
+def peak_of_array(waveform: np.ndarray) -> float:
+    return float(np.abs(waveform).max())
+
+
+def peak_of_handle(handle) -> float:
+    return float(np.abs(attach(handle)).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    parser.add_argument('--in-flight', type=int, default=4, help='tasks submitted before waiting')
+    args = parser.parse_args()
+
+    print(f"{args.tasks} tasks per size, {args.processes} processes, cpu_count={os.cpu_count()}; ms per task")
+    print(f"{'clip':>6} {'MB':>7} {'pickle':>9} {'shared':>9} {'speedup':>8} {'shm GB/s':>9} {'segments':>9}")
+    with SharedBufferPool() as buffers, ProcessPoolExecutor(max_workers=args.processes) as pool:
+        for seconds in CLIP_SECONDS:
+            clip = np.random.default_rng(0).standard_normal(int(seconds * args.sample_rate)).astype(np.float32)
+            tasks = max(args.tasks * 10 // int(max(seconds, 10)), args.in_flight)
+            list(pool.map(peak_of_array, [clip] * args.processes))  # start the workers
+
+            start = time.perf_counter()
+            for i in range(0, tasks, args.in_flight):
+                futures = [pool.submit(peak_of_array, clip) for _ in range(args.in_flight)]
+                [future.result() for future in futures]
+            pickled = (time.perf_counter() - start) / tasks
+
+            start = time.perf_counter()
+            for i in range(0, tasks, args.in_flight):
+                handles = [buffers.put(clip) for _ in range(args.in_flight)]
+                futures = [pool.submit(peak_of_handle, handle) for handle in handles]
+                [future.result() for future in futures]
+                for handle in handles:
+                    buffers.release(handle)
+            shared = (time.perf_counter() - start) / tasks
+
+            print(f"{seconds:>5.0f}s {clip.nbytes / 2 ** 20:>7.1f} {1000 * pickled:>9.2f} {1000 * shared:>9.2f} "
+                  f"{pickled / shared:>7.1f}x {clip.nbytes / shared / 1e9:>9.2f} {buffers.segments_created:>9}")
+
+
+if __name__ == '__main__':
+    main()
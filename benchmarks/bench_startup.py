@@ -0,0 +1,90 @@
+"""Benchmark cold-start import time per module and application construction.
+
+Runs each measurement in a fresh interpreter using ``python -X importtime``.
+
+Usage:
+    python benchmarks/bench_startup.py --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+MODULES = [
+    "voice_clone.core.config",
+    "voice_clone.core.application",
+    "voice_clone.modules.audio_handler",
+    "voice_clone.modules.voice_embedder",
+    "voice_clone.modules.synthesis_engine",
+    "voice_clone.ui.main_window",
+]
+
+
+def import_times(statement: str):
+    """Run statement under -X importtime; return (total_us, {dependency: cumulative_us})"""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name[1:].rstrip()
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative_us)))
+
+    # importtime prints children before their parent; walk backwards to find,
+    # for each third-party module, whether it was imported directly by voice_clone
+    total = sum(us for depth, _, us in entries if depth == 0)
+    dependencies = {}
+    stack = []
+    for depth, name, us in reversed(entries):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        parent = stack[-1][1] if stack else None
+        if not name.startswith("voice_clone") and (parent is None or parent.startswith("voice_clone")):
+            dependencies[name] = dependencies.get(name, 0) + us
+        stack.append((depth, name))
+    return total, dependencies
+
+
+def wall_time(statement: str) -> float:
+    """Seconds to run statement in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=10, help="Slowest dependencies to list per module")
+    args = parser.parse_args()
+
+    for module in MODULES:
+        try:
+            total, cumulative = import_times(f"import {module}")
+        except RuntimeError as e:
+            print(f"{module}: failed ({e})")
+            continue
+        print(f"{module}: {total / 1000:.1f} ms")
+        slowest = sorted(((us, name) for name, us in cumulative.items()), reverse=True)
+        for us, name in slowest[:args.top]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+
+    construct = wall_time("from voice_clone.core.application import VoiceCloneApp; VoiceCloneApp()")
+    print(f"import + VoiceCloneApp(): {construct * 1000:.1f} ms")
+    warm = wall_time("from voice_clone.core.application import VoiceCloneApp; VoiceCloneApp().warm_up(background=False)")
+    print(f"import + VoiceCloneApp() + warm_up(): {warm * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Benchmark suite for the audio and synthesis hot paths, with regression gates.
+
+Every case runs on deterministic synthetic audio (seeded, speech-like
+harmonics with pauses) on CPU only. Each case reports latency percentiles,
+throughput in audio seconds per wall second and peak traced memory.
+
+Usage:
+    python benchmarks/bench_suite.py run -o benchmarks/baseline.json
+    python benchmarks/bench_suite.py compare benchmarks/baseline.json --threshold 0.25
+    python benchmarks/bench_suite.py run --filter resample --repeats 10
+"""
+import os
+
+# CPU only: hide GPUs before torch can be imported by anything below
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.core.config import Config
+
+SAMPLE_TEXT = (
+    "Voice cloning turns a short reference recording into a reusable speaker profile. "
+    "The synthesis engine then reads any script in that voice, sentence by sentence, "
+    "with adjustable speed, pitch and tone, and exports broadcast ready audio files "
+    "for editing."
+)  # 50 words, the PRD's synthesis latency target
+
+# (name, duration seconds, sample rate) of the generated reference clips
+CLIPS = [
+    ("5s_44k", 5.0, 44100),
+    ("30s_44k", 30.0, 44100),
+    ("60s_44k", 60.0, 44100),
+    ("30s_16k", 30.0, 16000),
+    ("30s_48k", 30.0, 48000),
+]
+
+
+def synthetic_voice(seconds: float, sr: int, seed: int = 0) -> np.ndarray:
+    """Speech-like test signal: gliding harmonic tone, syllable envelope, pauses, low noise"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    t = np.arange(n) / sr
+    f0 = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t)) * ((t % 2.0) < 1.7)
+    return (0.3 * voiced * envelope + 1e-3 * rng.standard_normal(n)).astype(np.float32)
+
+
+def measure(fn: Callable[[], Any], repeats: int, audio_seconds: float, trace_memory: bool = True) -> Dict[str, float]:
+    """Time fn over repeats (after one warm-up call), then trace its peak memory once"""
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times = np.array(times)
+
+    peak_mb = None
+    if trace_memory:
+        # Separate pass: tracing slows allocation-heavy code and would skew the timings
+        tracemalloc.start()
+        fn()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    p50 = float(np.median(times))
+    return {
+        'repeats': repeats,
+        'min_ms': 1000 * float(times.min()),
+        'p50_ms': 1000 * p50,
+        'p95_ms': 1000 * float(np.percentile(times, 95)),
+        'mean_ms': 1000 * float(times.mean()),
+        'audio_seconds': audio_seconds,
+        'throughput_x': audio_seconds / p50 if audio_seconds else None,
+        'peak_mem_mb': peak_mb,
+    }
+
+
+def build_cases(workdir: Path) -> List[Tuple[str, float, Callable[[], Any]]]:
+    """(name, audio seconds, callable) for every benchmark case"""
+    from voice_clone.core.application import VoiceCloneApp
+
+    config = Config(app_dir=workdir, models_dir=workdir / "models", voices_dir=workdir / "voices",
+                    exports_dir=workdir / "exports", logs_dir=workdir / "logs", cache_dir=workdir / "cache")
+    config.model.device = "cpu"
+    config.cache.enabled = False  # measure synthesis, not cache hits
+    app = VoiceCloneApp(config)
+    handler, embedder, engine = app.audio_handler, app.voice_embedder, app.synthesis_engine
+    app.warm_up(background=False)
+
+    import soundfile as sf
+
+    cases = []
+    clips = {}
+    for name, seconds, sr in CLIPS:
+        waveform = synthetic_voice(seconds, sr)
+        path = workdir / f"clip_{name}.wav"
+        sf.write(str(path), waveform, sr, subtype='PCM_16')
+        clips[name] = (path, (waveform, sr), seconds)
+
+    for name, (path, audio_data, seconds) in clips.items():
+        cases.append((f"load_audio[{name}]", seconds, lambda p=path: handler.load_audio(str(p))))
+        cases.append((f"load_and_validate[{name}]", seconds, lambda p=path: handler.load_and_validate(str(p))))
+        cases.append((f"validate_audio[{name}]", seconds, lambda a=audio_data: handler.validate_audio(a)))
+        cases.append((f"export_wav[{name}]", seconds, lambda a=audio_data: handler.export_wav(a, io.BytesIO())))
+        if audio_data[1] != config.audio.sample_rate:
+            cases.append((f"resample_audio[{name}]", seconds,
+                          lambda a=audio_data: handler.resample_audio(a, config.audio.sample_rate)))
+        cases.append((f"normalize_loudness[{name}]", seconds,
+                      lambda a=audio_data: handler.normalize_loudness(a[0], sample_rate=a[1])))
+        cases.append((f"analyze_quality[{name}]", seconds, lambda a=audio_data: handler.analyze_quality(a)))
+        cases.append((f"extract_embedding[{name}]", seconds, lambda a=audio_data: embedder.extract_embedding(a)))
+
+    embedding = synthetic_voice(1.0, 512)[:512]
+    for rate, pitch in [(1.0, 0.0), (1.25, 5.0)]:
+        synth_seconds = len(engine.synthesize(SAMPLE_TEXT, embedding, rate, pitch)[0]) / config.audio.sample_rate
+        cases.append((f"synthesize[rate{rate}_pitch{pitch:+.0f}]", synth_seconds,
+                      lambda r=rate, p=pitch: engine.synthesize(SAMPLE_TEXT, embedding, r, p)))
+        stream_seconds = sum(len(chunk) for chunk in engine.synthesize_stream(SAMPLE_TEXT, embedding, rate, pitch))
+        cases.append((f"synthesize_stream[rate{rate}_pitch{pitch:+.0f}]", stream_seconds / config.audio.sample_rate,
+                      lambda r=rate, p=pitch: list(engine.synthesize_stream(SAMPLE_TEXT, embedding, r, p))))
+
+    # End to end through the application, including disk I/O
+    path, _, seconds = clips["60s_44k"]
+    stream_seconds = sum(len(chunk) for chunk in engine.synthesize_stream(SAMPLE_TEXT, embedding))
+
+    def clone():
+        if not app.clone_voice(str(path), "bench"):
+            raise RuntimeError("clone_voice failed on the synthetic reference clip")
+
+    def speak():
+        output = app.synthesize_speech("bench", SAMPLE_TEXT)
+        if output is None:
+            raise RuntimeError("synthesize_speech failed")
+        os.unlink(output)
+
+    clone()
+    cases.append(("e2e_clone_voice[60s_44k]", seconds, clone))
+    cases.append(("e2e_synthesize_speech[50_words]", stream_seconds / config.audio.sample_rate, speak))
+    return cases
+
+
+def run_suite(repeats: int, name_filter: str, trace_memory: bool) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="voice_clone_bench_") as tmp:
+        cases = build_cases(Path(tmp))
+        results = {}
+        print(f"{'case':<42}{'p50 ms':>10}{'p95 ms':>10}{'x realtime':>12}{'peak MB':>10}")
+        for name, seconds, fn in cases:
+            if name_filter and name_filter not in name:
+                continue
+            result = measure(fn, repeats, seconds, trace_memory)
+            results[name] = result
+            throughput = f"{result['throughput_x']:.1f}" if result['throughput_x'] else "-"
+            peak = f"{result['peak_mem_mb']:.1f}" if result['peak_mem_mb'] is not None else "-"
+            print(f"{name:<42}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{throughput:>12}{peak:>10}",
+                  flush=True)
+
+    import scipy
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float,
+            memory_threshold: float, min_delta_ms: float) -> List[str]:
+    """Print a comparison table and return the cases that regressed"""
+    regressions = []
+    print(f"\n{'case':<42}{'base ms':>10}{'now ms':>10}{'ratio':>8}{'base MB':>9}{'now MB':>9}")
+    for name, now in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<42}{'-':>10}{now['p50_ms']:>10.2f}{'new':>8}")
+            continue
+        ratio = now['p50_ms'] / base['p50_ms']
+        flags = []
+        # Sub-millisecond cases are dominated by timer and scheduler noise
+        if ratio > 1 + threshold and now['p50_ms'] - base['p50_ms'] > min_delta_ms:
+            flags.append("SLOWER")
+        base_mb, now_mb = base.get('peak_mem_mb'), now.get('peak_mem_mb')
+        # Ignore sub-megabyte peaks, where allocator noise dominates
+        if base_mb is not None and now_mb is not None and max(base_mb, now_mb) > 1.0 \
+                and now_mb > base_mb * (1 + memory_threshold):
+            flags.append("MORE MEMORY")
+        mem = f"{base_mb or 0:>9.1f}{now_mb or 0:>9.1f}" if base_mb is not None and now_mb is not None else ""
+        print(f"{name:<42}{base['p50_ms']:>10.2f}{now['p50_ms']:>10.2f}{ratio:>8.2f}{mem}  {' '.join(flags)}")
+        if flags:
+            regressions.append(f"{name}: {', '.join(flags).lower()} (p50 x{ratio:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='mode', required=True)
+    run_parser = sub.add_parser('run', help='run the suite and optionally save the results')
+    run_parser.add_argument('-o', '--output', type=Path, help='write results JSON here (e.g. a new baseline)')
+    compare_parser = sub.add_parser('compare', help='run the suite and fail on regressions against a baseline')
+    compare_parser.add_argument('baseline', type=Path)
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help='allowed p50 slowdown as a fraction (0.25 = 25%%)')
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.25,
+                                help='allowed peak memory growth as a fraction')
+    compare_parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                                help='ignore slowdowns smaller than this in absolute terms')
+    compare_parser.add_argument('-o', '--output', type=Path, help='also write the current results here')
+    for p in (run_parser, compare_parser):
+        p.add_argument('--repeats', type=int, default=5)
+        p.add_argument('--filter', default='', help='only run cases whose name contains this')
+        p.add_argument('--no-memory', action='store_true', help='skip the traced peak-memory pass')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.mode == 'compare':
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+
+    current = run_suite(args.repeats, args.filter, not args.no_memory)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2), encoding='utf-8')
+        print(f"\nWrote {len(current['results'])} results to {args.output}")
+
+    if baseline is not None:
+        if baseline['meta'].get('platform') != current['meta']['platform']:
+            print(f"\nWarning: baseline was recorded on {baseline['meta'].get('platform')}; "
+                  f"timings are only comparable on the same machine")
+        regressions = compare(baseline, current, args.threshold, args.memory_threshold,
+                              args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond the threshold:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
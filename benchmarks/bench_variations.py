@@ -0,0 +1,58 @@
+"""Benchmark batched variant rendering against independent synthesis calls.
+
+Usage:
+    python benchmarks/bench_variations.py --voices 4 --rates 0.9 1.0 1.2 --pitches -5 0 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.core.config import Config
+from voice_clone.core.variations import variant_grid
+from voice_clone.modules.synthesis_engine import SynthesisEngine
+
+TEXT = ("The quick brown fox jumps over the lazy dog. Pack my box with five dozen liquor jugs, "
+        "then sphinx of black quartz, judge my vow; how vexingly quick daft zebras jump!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--voices', type=int, default=4)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.9, 1.0, 1.2])
+    parser.add_argument('--pitches', type=float, nargs='+', default=[-5.0, 0.0, 5.0])
+    parser.add_argument('--batch-size', type=int, default=8)
+    args = parser.parse_args()
+
+    engine = SynthesisEngine(Config())
+    engine.load_model()
+    rng = np.random.default_rng(0)
+    voices = {f"voice{i}": rng.standard_normal(512).astype(np.float32) for i in range(args.voices)}
+    grid = variant_grid(list(voices), args.rates, args.pitches)
+    # Same order VariationRenderer uses, so rate variants share a batch
+    grid.sort(key=lambda v: (v.voice, v.pitch, v.tone))
+
+    start = time.perf_counter()
+    for v in grid:
+        np.concatenate(list(engine.synthesize_stream(TEXT, voices[v.voice], v.speech_rate, v.pitch, v.tone)))
+    independent = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, len(grid), args.batch_size):
+        batch = grid[offset:offset + args.batch_size]
+        engine.synthesize_variants(TEXT, [voices[v.voice] for v in batch], [v.speech_rate for v in batch],
+                                   [v.pitch for v in batch], [v.tone for v in batch])
+    batched = time.perf_counter() - start
+
+    print(f"{len(grid)} variants, batch size {args.batch_size}")
+    print(f"independent: {independent:.3f}s ({1000 * independent / len(grid):.1f} ms/variant)")
+    print(f"batched:     {batched:.3f}s ({1000 * batched / len(grid):.1f} ms/variant)")
+    print(f"speedup:     {independent / batched:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
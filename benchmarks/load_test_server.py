@@ -0,0 +1,169 @@
+"""Load-test the local synthesis server and report latency percentiles.
+
+Usage:
+    python -m voice_clone serve &               # or pass --spawn
+    python benchmarks/load_test_server.py --requests 200 --concurrency 16
+    python benchmarks/load_test_server.py --spawn --mode ws --requests 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from voice_clone.server.protocol import OP_BINARY, OP_CLOSE, OP_TEXT, encode_frame, read_message
+
+TEXT = "The quick brown fox jumps over the lazy dog. Sphinx of black quartz, judge my vow."
+
+
+async def http_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                       payload: Optional[dict] = None) -> Tuple[int, bytes]:
+    """Send one keep-alive request and read the response status and body"""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split(" ")[1])
+    headers = {line.split(":", 1)[0].lower(): line.split(":", 1)[1].strip() for line in head[1:] if ":" in line}
+    return status, await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+async def http_worker(host: str, port: int, jobs: asyncio.Queue, payload: dict, results: List[Dict]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while not jobs.empty():
+            jobs.get_nowait()
+            start = time.perf_counter()
+            try:
+                status, body = await http_request(reader, writer, "POST", "/synthesize", payload)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                results.append({'status': 0, 'latency': time.perf_counter() - start})
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            results.append({'status': status, 'latency': time.perf_counter() - start,
+                            'audio_bytes': len(body) - 44 if status == 200 else 0})
+    finally:
+        writer.close()
+
+
+async def ws_worker(host: str, port: int, jobs: asyncio.Queue, payload: dict, results: List[Dict]):
+    while not jobs.empty():
+        jobs.get_nowait()
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /stream HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(encode_frame(OP_TEXT, json.dumps(payload).encode(), mask=True))
+        result = {'status': 200, 'audio_bytes': 0}
+        while True:
+            opcode, data = await read_message(reader, max_size=1 << 30)
+            if opcode == OP_BINARY:
+                result.setdefault('first_chunk', time.perf_counter() - start)
+                result['audio_bytes'] += len(data)
+            elif opcode == OP_TEXT and b'"error"' in data:
+                result['status'] = json.loads(data)['status']
+            elif opcode == OP_CLOSE:
+                break
+        result['latency'] = time.perf_counter() - start
+        results.append(result)
+        writer.close()
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms  max {1000 * max(values):7.1f} ms"
+
+
+def spawn_server(workers: int, max_queue: int):
+    """Start an in-process server on an ephemeral port; returns (server, loop)"""
+    from voice_clone.core.config import Config
+    from voice_clone.server import SynthesisServer
+
+    config = Config.load_config()
+    config.server.port = 0
+    config.server.workers = workers
+    config.server.max_queue = max_queue
+    config.cache.enabled = False  # measure synthesis, not cache hits
+    server = SynthesisServer(config)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    return server, loop
+
+
+async def run(args, port: int):
+    reader, writer = await asyncio.open_connection(args.host, port)
+    voice = args.voice
+    if voice is None:
+        _, body = await http_request(reader, writer, "GET", "/voices")
+        voices = json.loads(body)['voices']
+        if not voices:
+            raise SystemExit("No voices stored; clone one first or pass --voice")
+        voice = voices[0]
+    writer.close()
+
+    payload = {'voice': voice, 'text': args.text, 'speech_rate': 1.0, 'pitch': 0.0,
+               'deadline_ms': args.deadline_ms}
+    jobs: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        jobs.put_nowait(None)
+    results: List[Dict] = []
+    worker = http_worker if args.mode == "http" else ws_worker
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(args.host, port, jobs, payload, results) for _ in range(args.concurrency)))
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r['status'] == 200]
+    statuses: Dict[int, int] = {}
+    for r in results:
+        statuses[r['status']] = statuses.get(r['status'], 0) + 1
+    audio_seconds = sum(r['audio_bytes'] for r in ok) / 2 / args.sample_rate
+    print(f"{args.mode}: {len(results)} requests, concurrency {args.concurrency}, {wall:.2f}s wall")
+    print(f"status counts: {statuses}")
+    print(f"throughput: {len(ok) / wall:.1f} req/s, {audio_seconds / wall:.1f} audio s/s")
+    print(f"latency    {percentiles([r['latency'] for r in ok])}")
+    if args.mode == "ws":
+        print(f"first chunk {percentiles([r['first_chunk'] for r in ok if 'first_chunk' in r])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--spawn', action='store_true', help='run an in-process server on a free port')
+    parser.add_argument('--workers', type=int, default=2, help='server workers when spawning')
+    parser.add_argument('--max-queue', type=int, default=32, help='server queue bound when spawning')
+    parser.add_argument('--mode', choices=['http', 'ws'], default='http')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--voice', default=None, help='defaults to the first stored voice')
+    parser.add_argument('--text', default=TEXT)
+    parser.add_argument('--deadline-ms', type=float, default=30000)
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    args = parser.parse_args()
+
+    server = loop = None
+    port = args.port
+    if args.spawn:
+        server, loop = spawn_server(args.workers, args.max_queue)
+        port = server.port
+    try:
+        asyncio.run(run(args, port))
+    finally:
+        if server is not None:
+            asyncio.run_coroutine_threadsafe(server.shutdown(), loop).result()
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,7 @@ setup(
         "librosa>=0.10.0",
         "scipy>=1.11.4",
         "numpy>=1.24.3",
+        "soundfile>=0.12.1",
         "PyQt6>=6.6.1",
         "pydantic>=2.5.0",
         "pydantic-settings>=2.1.0",
@@ -0,0 +1,235 @@
+"""Headless command-line interface for Voice Clone"""
+import csv
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+import click
+from .core.config import Config
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac"}
+
+
+def _iter_clone_inputs(source: Path) -> Iterator[Tuple[str, str]]:
+    """Yield (audio_path, voice_name) from a directory, CSV or JSONL listing"""
+    if source.is_dir():
+        for path in sorted(source.iterdir()):
+            if path.suffix.lower() in AUDIO_EXTENSIONS:
+                yield str(path), path.stem
+    elif source.suffix.lower() == ".jsonl":
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row['audio_path'], row['voice_name']
+    else:
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                yield row['audio_path'], row['voice_name']
+
+
+@click.group()
+@click.option("--config", "config_path", type=click.Path(dir_okay=False, path_type=Path),
+              help="Path to config.json")
+@click.option("-v", "--verbose", is_flag=True, help="Enable info logging")
+@click.option("--metrics", "metrics_path", type=click.Path(dir_okay=False, path_type=Path),
+              help="Record per-stage timings and write them here on exit (.json or .prom)")
+@click.pass_context
+def main(ctx: click.Context, config_path: Optional[Path], verbose: bool, metrics_path: Optional[Path]):
+    """Voice Clone command-line interface (no GUI)"""
+    logging.basicConfig(
+        level=logging.INFO if verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    ctx.obj = Config.load_config(config_path)
+    if metrics_path is not None:
+        from .utils.metrics import metrics
+
+        metrics.enable()
+        ctx.call_on_close(lambda: metrics.export(metrics_path))
+
+
+@main.command("clone-bulk")
+@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.option("-j", "--workers", type=int, default=None, help="Decode/validate processes")
+@click.option("--batch-size", type=int, default=8, show_default=True, help="Clips per embedding batch")
+@click.pass_obj
+def clone_bulk(config: Config, source: Path, workers: Optional[int], batch_size: int):
+    """
+    Clone voices from SOURCE: a directory of audio files (voice name = file
+    stem) or a CSV/JSONL listing with audio_path and voice_name columns.
+
+    Writes one JSON report per clip to stdout as it completes.
+    """
+    from .core.application import VoiceCloneApp
+
+    app = VoiceCloneApp(config)
+    succeeded = failed = 0
+    for item in app.clone_voices_bulk(_iter_clone_inputs(source), workers, batch_size):
+        click.echo(json.dumps(item))
+        if item['success']:
+            succeeded += 1
+        else:
+            failed += 1
+
+    click.echo(f"Cloned {succeeded} voices, {failed} failed", err=True)
+    sys.exit(1 if failed and not succeeded else 0)
+
+
+@main.command("render")
+@click.argument("script", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-j", "--workers", type=int, default=None,
+              help="Synthesis workers (defaults to pipeline.synthesis_workers)")
+@click.option("-o", "--output-dir", type=click.Path(file_okay=False, path_type=Path),
+              help="Output directory (defaults to exports_dir)")
+@click.option("--resume/--no-resume", default=True, show_default=True,
+              help="Skip lines already recorded in the manifest")
+@click.option("--ordered/--unordered", default=None,
+              help="Finish lines in script order (defaults to pipeline.ordered)")
+@click.option("--lufs", "target_lufs", type=float, default=None,
+              help="Loudness-normalize each line to this integrated level")
+@click.option("--format", "fmt", type=click.Choice(["wav", "flac", "opus"]), default=None,
+              help="Output format (defaults to audio.export_format)")
+@click.option("--bundle", type=click.Path(dir_okay=False, path_type=Path),
+              help="Collect the outputs into this tar archive with a manifest.json")
+@click.option("--stats", "show_stats", is_flag=True, help="Print per-stage pipeline statistics")
+@click.pass_obj
+def render(config: Config, script: Path, workers: Optional[int], output_dir: Optional[Path], resume: bool,
+           ordered: Optional[bool], target_lufs: Optional[float], fmt: Optional[str], bundle: Optional[Path],
+           show_stats: bool):
+    """
+    Render SCRIPT (CSV or JSONL with voice, text, rate, pitch, tone and
+    output columns) to WAV, FLAC or Ogg/Opus files.
+    """
+    from .core.application import VoiceCloneApp
+    from .core.render_pipeline import format_stage_stats
+
+    app = VoiceCloneApp(config)
+    summary = app.render_script(str(script), workers, resume, str(output_dir) if output_dir else None,
+                                ordered, target_lufs, fmt, str(bundle) if bundle else None)
+
+    click.echo(f"Rendered {summary['rendered']} lines, {summary['failed']} failed, "
+               f"{summary['skipped']} skipped (already rendered)")
+    if summary['rendered']:
+        click.echo(f"Audio: {summary['audio_seconds']:.1f}s in {summary['wall_time']:.1f}s "
+                   f"(realtime factor {summary['throughput_rtf']:.3f})")
+        click.echo(f"Latency per line: p50 {summary['latency_p50']:.3f}s, "
+                   f"p95 {summary['latency_p95']:.3f}s, max {summary['latency_max']:.3f}s")
+    if show_stats:
+        for line in format_stage_stats(summary['stages']):
+            click.echo(line)
+    click.echo(f"Manifest: {summary['manifest']}")
+    if 'bundle' in summary:
+        click.echo(f"Bundle: {summary['bundle']}")
+    sys.exit(1 if summary['failed'] else 0)
+
+
+@main.command("variations")
+@click.argument("text")
+@click.option("--voice", "voices", multiple=True, required=True, help="Voice to render (repeatable)")
+@click.option("--rate", "rates", type=float, multiple=True, default=(1.0,), show_default=True,
+              help="Speech rate (repeatable)")
+@click.option("--pitch", "pitches", type=float, multiple=True, default=(0.0,), show_default=True,
+              help="Pitch change in percent (repeatable)")
+@click.option("--tone", "tones", multiple=True, default=("neutral",), show_default=True,
+              help="Tone (repeatable)")
+@click.option("-o", "--output-dir", type=click.Path(file_okay=False, path_type=Path),
+              help="Output folder (defaults to a new folder in exports_dir)")
+@click.pass_obj
+def variations(config: Config, text: str, voices: Tuple[str, ...], rates: Tuple[float, ...],
+               pitches: Tuple[float, ...], tones: Tuple[str, ...], output_dir: Optional[Path]):
+    """Render TEXT for every combination of the given voices, rates, pitches and tones."""
+    from .core.application import VoiceCloneApp
+    from .core.variations import variant_grid
+
+    app = VoiceCloneApp(config)
+    grid = variant_grid(voices, rates, pitches, tones)
+    summary = app.render_variants(text, grid, str(output_dir) if output_dir else None)
+    click.echo(f"Rendered {summary['rendered']} variants ({summary['cached']} from cache), "
+               f"{summary['failed']} failed in {summary['wall_time']:.1f}s")
+    click.echo(f"Manifest: {summary['manifest']}")
+    sys.exit(1 if summary['failed'] else 0)
+
+
+@main.command("enroll")
+@click.argument("voice")
+@click.argument("clips", nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--remove", "remove_ids", type=int, multiple=True, help="Clip id to remove (repeatable)")
+@click.option("--rebuild", is_flag=True, help="Recompute the embedding from stored segment vectors")
+@click.pass_obj
+def enroll(config: Config, voice: str, clips: Tuple[Path, ...], remove_ids: Tuple[int, ...], rebuild: bool):
+    """
+    Refine VOICE with additional reference CLIPS, remove clips by id, or
+    rebuild it; prints the voice's enrolled clips afterwards.
+    """
+    from .core.application import VoiceCloneApp
+
+    app = VoiceCloneApp(config)
+    failed = 0
+    for clip in clips:
+        clip_id = app.add_reference_clip(voice, str(clip))
+        click.echo(f"{clip}: {'added as clip ' + str(clip_id) if clip_id is not None else 'failed'}", err=True)
+        failed += clip_id is None
+    for clip_id in remove_ids:
+        if not app.remove_reference_clip(voice, clip_id):
+            click.echo(f"Could not remove clip {clip_id}", err=True)
+            failed += 1
+    if rebuild and not app.rebuild_voice(voice):
+        failed += 1
+
+    for clip in app.list_reference_clips(voice):
+        click.echo(json.dumps(clip))
+    sys.exit(1 if failed else 0)
+
+
+@main.command("normalize")
+@click.argument("folder", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option("--lufs", "target_lufs", type=float, default=None,
+              help="Integrated loudness target (defaults to audio.target_lufs)")
+@click.option("--true-peak", "true_peak_db", type=float, default=None,
+              help="True-peak ceiling in dBTP (defaults to audio.true_peak_db)")
+@click.option("-j", "--workers", type=int, default=None, help="Worker processes")
+@click.option("-o", "--output-dir", type=click.Path(file_okay=False, path_type=Path),
+              help="Write normalized copies here instead of rewriting in place")
+@click.pass_obj
+def normalize(config: Config, folder: Path, target_lufs: Optional[float], true_peak_db: Optional[float],
+              workers: Optional[int], output_dir: Optional[Path]):
+    """
+    Loudness-normalize every WAV, FLAC and Opus file in FOLDER (ITU-R
+    BS.1770 integrated loudness, true-peak limited), keeping each file's
+    format. Writes one JSON report per file.
+    """
+    from .modules.loudness import normalize_folder
+
+    target_lufs = config.audio.target_lufs if target_lufs is None else target_lufs
+    true_peak_db = config.audio.true_peak_db if true_peak_db is None else true_peak_db
+    failed = 0
+    for report in normalize_folder(folder, target_lufs, true_peak_db, workers, output_dir):
+        click.echo(json.dumps(report))
+        failed += not report['success']
+    sys.exit(1 if failed else 0)
+
+
+@main.command("serve")
+@click.option("--port", type=int, default=None, help="Port (defaults to server.port)")
+@click.option("-j", "--workers", type=int, default=None, help="Concurrent synthesis jobs")
+@click.pass_obj
+def serve(config: Config, port: Optional[int], workers: Optional[int]):
+    """
+    Run the synthesis service on localhost (HTTP + WebSocket) until
+    interrupted; Ctrl+C drains in-flight requests before exiting.
+    """
+    from .server import run_server
+
+    if port is not None:
+        config.server.port = port
+    if workers is not None:
+        config.server.workers = workers
+    run_server(config)
+
+
+if __name__ == "__main__":
+    main()
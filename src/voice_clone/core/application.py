@@ -1,10 +1,24 @@
 import logging
-from typing import Optional
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 from pathlib import Path
+import numpy as np
 from .config import Config
+from .bulk_clone import clone_voices_bulk
+from .progress import JobCancelled, ProgressCallback, report_progress
+from .script_renderer import ScriptRenderer
+from .variations import Variant, VariationRenderer
 from ..modules.voice_embedder import VoiceEmbedder
 from ..modules.synthesis_engine import SynthesisEngine
 from ..modules.audio_handler import AudioHandler
+from ..modules.batch_scheduler import BatchScheduler
+from ..modules.enrollment import VoiceEnrollment
+from ..modules.loudness import normalize_stream
+from ..modules.render_cache import RenderCache, render_key
+from ..utils.helpers import sanitize_filename
+from ..utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -21,32 +35,382 @@ class VoiceCloneApp:
         self.audio_handler = AudioHandler(self.config)
         self.voice_embedder = VoiceEmbedder(self.config)
         self.synthesis_engine = SynthesisEngine(self.config)
+        self.batch_scheduler = BatchScheduler(self.synthesis_engine, self.config)
+        self.render_cache = RenderCache(
+            self.config.cache_dir / "renders",
+            self.config.cache.memory_budget_mb * 1024 * 1024,
+            self.config.cache.disk_budget_mb * 1024 * 1024,
+            self.config.cache.export_mode,
+        ) if self.config.cache.enabled else None
+        
+        if self.config.enable_metrics or self.config.ui.show_debug_panel:
+            metrics.enable()
         
         logger.info("Application initialization complete")
     
-    def clone_voice(self, audio_path: str, voice_name: str) -> bool:
-        """Clone a voice from reference audio"""
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """Import heavy dependencies and load models ahead of first use"""
+        def _warm_up():
+            try:
+                self.audio_handler.warm_up()
+                self.voice_embedder.load_model()
+                self.synthesis_engine.load_model()
+                logger.info("Warm-up complete")
+            except Exception as e:
+                logger.error(f"Warm-up failed: {e}")
+        
+        if not background:
+            _warm_up()
+            return None
+        
+        thread = threading.Thread(target=_warm_up, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def clone_voice(self, audio_path: str, voice_name: str,
+                    progress_callback: Optional[ProgressCallback] = None) -> bool:
+        """
+        Clone a voice from reference audio.
+        
+        progress_callback receives the load, validate, embed and save stages
+        and may raise JobCancelled to stop before the next one.
+        """
         try:
             logger.info(f"Starting voice cloning: {voice_name}")
             
             # Load and validate audio
-            audio_data = self.audio_handler.load_audio(audio_path)
-            validation_result = self.audio_handler.validate_audio(audio_data)
+            report_progress(progress_callback, "load", 0, 4)
+            audio_data, validation_result = self.audio_handler.load_and_validate(audio_path)
+            report_progress(progress_callback, "validate", 1, 4)
             
             if not validation_result['is_valid']:
                 logger.error(f"Audio validation failed: {validation_result['issues']}")
                 return False
             
-            # Extract voice embedding
-            embedding = self.voice_embedder.extract_embedding(audio_data)
+            # Extract segment embeddings from speech frames only
+            report_progress(progress_callback, "embed", 2, 4)
+            quality = self.audio_handler.analyze_quality(audio_data)
+            speech_mask = quality.sample_mask(len(audio_data[0]))
+            embeddings, weights = self.voice_embedder.extract_segment_embeddings(audio_data, speech_mask)
             
-            # Save voice profile
-            voice_profile_path = self.config.voices_dir / f"{voice_name}.npz"
-            self.voice_embedder.save_voice_profile(embedding, voice_profile_path, voice_name)
+            # Save voice profile, replacing any earlier enrollment
+            report_progress(progress_callback, "save", 3, 4)
+            enrollment = VoiceEnrollment(embeddings.shape[1])
+            enrollment.add_clip(embeddings, weights, source=Path(audio_path).name,
+                                duration=float(validation_result['duration']))
+            self.voice_embedder.store_enrollment(voice_name, enrollment, {
+                'source_file': Path(audio_path).name,
+                'duration': float(validation_result['duration']),
+                'snr_db': float(validation_result['snr_db']),
+                'speech_snr_db': quality.snr_db,
+                'speech_ratio': quality.speech_ratio,
+                'sample_rate': int(validation_result['sample_rate']),
+            })
             
+            report_progress(progress_callback, "save", 4, 4)
+            metrics.count("voices_cloned")
             logger.info(f"Voice cloning completed: {voice_name}")
             return True
             
+        except JobCancelled:
+            logger.info(f"Voice cloning cancelled: {voice_name}")
+            raise
         except Exception as e:
             logger.error(f"Voice cloning failed: {e}")
             return False
+    
+    def add_reference_clip(self, voice_name: str, audio_path: str,
+                           progress_callback: Optional[ProgressCallback] = None) -> Optional[int]:
+        """
+        Refine an existing voice with another reference clip.
+        
+        Only the new clip is decoded and embedded; its segment embeddings
+        are folded into the voice's running statistics. Added clips may be
+        shorter than ``audio.min_duration`` but must pass the other checks.
+        
+        Returns:
+            The clip id (for remove_reference_clip), or None on failure
+        """
+        try:
+            report_progress(progress_callback, "load", 0, 4)
+            enrollment = self._enrollment_for_update(voice_name)
+            audio_data, validation_result = self.audio_handler.load_and_validate(audio_path)
+            report_progress(progress_callback, "validate", 1, 4)
+            
+            issues = [issue for issue in validation_result['issues'] if not issue.startswith("Duration too short")]
+            if issues:
+                logger.error(f"Audio validation failed: {issues}")
+                return None
+            
+            report_progress(progress_callback, "embed", 2, 4)
+            quality = self.audio_handler.analyze_quality(audio_data)
+            embeddings, weights = self.voice_embedder.extract_segment_embeddings(
+                audio_data, quality.sample_mask(len(audio_data[0])))
+            clip_id = enrollment.add_clip(embeddings, weights, source=Path(audio_path).name,
+                                          duration=float(validation_result['duration']))
+            
+            report_progress(progress_callback, "save", 3, 4)
+            self.voice_embedder.store_enrollment(voice_name, enrollment, {'enrollment_clips': len(enrollment)})
+            report_progress(progress_callback, "save", 4, 4)
+            logger.info(f"Added reference clip {clip_id} to {voice_name}: {len(embeddings)} segments")
+            return clip_id
+            
+        except JobCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Adding reference clip failed: {e}")
+            return None
+    
+    def remove_reference_clip(self, voice_name: str, clip_id: int) -> bool:
+        """Drop one reference clip's contribution; the voice's last clip cannot be removed"""
+        try:
+            enrollment = self.voice_embedder.load_enrollment(voice_name)
+            if enrollment is None or clip_id not in enrollment.clips:
+                logger.error(f"No reference clip {clip_id} for voice {voice_name}")
+                return False
+            if len(enrollment) == 1:
+                logger.error(f"Refusing to remove the only reference clip of {voice_name}")
+                return False
+            enrollment.remove_clip(clip_id)
+            self.voice_embedder.store_enrollment(voice_name, enrollment, {'enrollment_clips': len(enrollment)})
+            return True
+        except Exception as e:
+            logger.error(f"Removing reference clip failed: {e}")
+            return False
+    
+    def rebuild_voice(self, voice_name: str) -> bool:
+        """Recompute a voice's embedding from its stored segment vectors (no audio decoding)"""
+        try:
+            enrollment = self.voice_embedder.load_enrollment(voice_name)
+            if enrollment is None:
+                logger.error(f"Voice {voice_name} has no enrollment state to rebuild from")
+                return False
+            enrollment.rebuild()
+            self.voice_embedder.store_enrollment(voice_name, enrollment, {'enrollment_clips': len(enrollment)})
+            return True
+        except Exception as e:
+            logger.error(f"Rebuilding voice failed: {e}")
+            return False
+    
+    def list_reference_clips(self, voice_name: str) -> List[Dict[str, Any]]:
+        """Metadata of the clips enrolled into a voice (empty for voices without enrollment state)"""
+        enrollment = self.voice_embedder.load_enrollment(voice_name)
+        return enrollment.summary() if enrollment is not None else []
+    
+    def clone_voices_bulk(self, paths_to_names: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+                          workers: Optional[int] = None,
+                          embed_batch_size: int = 8) -> Iterator[Dict[str, Any]]:
+        """Clone many voices in parallel, yielding a report per item as it completes"""
+        logger.info("Starting bulk voice cloning")
+        return clone_voices_bulk(self, paths_to_names, workers, embed_batch_size)
+    
+    def render_script(self, script_path: str, workers: Optional[int] = None, resume: bool = True,
+                      output_dir: Optional[str] = None, ordered: Optional[bool] = None,
+                      target_lufs: Optional[float] = None, fmt: Optional[str] = None,
+                      bundle: Optional[str] = None) -> Dict[str, Any]:
+        """Render a CSV/JSONL script to WAV/FLAC/Opus files through the staged pipeline and return a summary"""
+        renderer = ScriptRenderer(self, Path(output_dir) if output_dir else None)
+        return renderer.render(Path(script_path), workers, resume, ordered, target_lufs, fmt,
+                               Path(bundle) if bundle else None)
+    
+    def render_variants(self, text: str, variants: Iterable[Union[Variant, Mapping[str, Any], Sequence[Any]]],
+                        output_dir: Optional[str] = None,
+                        progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Render one text for a grid of (voice, speech_rate, pitch, tone) variants.
+        
+        Files go to ``<output_dir>/<voice>/`` with a manifest.json at the top;
+        see variant_grid() for building the full cartesian product.
+        """
+        renderer = VariationRenderer(self, Path(output_dir) if output_dir else None)
+        return renderer.render(text, variants, progress_callback)
+    
+    def get_voice_list(self) -> List[str]:
+        """List the names of stored voices"""
+        return self.voice_embedder.list_voices()
+    
+    def delete_voice(self, voice_name: str) -> bool:
+        """Delete a stored voice profile"""
+        return self.voice_embedder.remove_voice(voice_name)
+    
+    def import_voice_profiles(self) -> int:
+        """Import per-voice .npz profiles into the memory-mapped voice store"""
+        if self.voice_embedder.voice_store is None:
+            logger.warning("Voice store backend is not 'mmap'; nothing to import")
+            return 0
+        return self.voice_embedder.voice_store.import_npz(self.config.voices_dir)
+    
+    def find_similar_voices(self, embedding: np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """Find the k stored voices closest to an embedding"""
+        return self.voice_embedder.find_similar_voices(embedding, k)
+    
+    def find_duplicate_voices(self, threshold: float = 0.95) -> List[Tuple[str, str, float]]:
+        """Report near-duplicate voice pairs across the whole library"""
+        return self.voice_embedder.find_duplicate_voices(threshold)
+    
+    def synthesize_speech(self, voice_name: str, text: str, speech_rate: float = 1.0,
+                          pitch: float = 0.0, tone: str = "neutral",
+                          progress_callback: Optional[ProgressCallback] = None) -> Optional[str]:
+        """
+        Synthesize text with a cloned voice and export it as WAV.
+        
+        Uses the same unit-by-unit path as preview, so progress_callback sees
+        a "synthesize" stage per text unit between "load" and "export".
+        """
+        try:
+            report_progress(progress_callback, "load", 0, 1)
+            embedding = self._load_voice(voice_name)
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            output_path = self.config.exports_dir / f"{sanitize_filename(voice_name)}_{timestamp}.wav"
+            sample_rate, bit_depth = self.config.audio.sample_rate, self.config.audio.bit_depth
+            
+            # Identical renders are served from the cache as a copy/hardlink of the WAV
+            key = None
+            if self.render_cache is not None:
+                key = render_key(embedding, text, speech_rate, pitch, tone, self.synthesis_engine.version)
+                # A disk miss falls through to the memory tier, which counts the miss
+                if self.render_cache.export_wav(key, sample_rate, bit_depth, output_path, count_miss=False):
+                    metrics.count("render_cache_hits")
+                    report_progress(progress_callback, "export", 1, 1)
+                    return str(output_path)
+            
+            audio_data = self.render_speech(embedding, text, speech_rate, pitch, tone, progress_callback, key)
+            
+            report_progress(progress_callback, "export", 0, 1)
+            if not self.audio_handler.export_wav(audio_data, str(output_path), bit_depth):
+                return None
+            if key:
+                self.render_cache.put_wav(key, sample_rate, bit_depth, output_path)
+            
+            report_progress(progress_callback, "export", 1, 1)
+            return str(output_path)
+            
+        except JobCancelled:
+            logger.info(f"Speech synthesis cancelled: {voice_name}")
+            raise
+        except Exception as e:
+            logger.error(f"Speech synthesis failed: {e}")
+            return None
+    
+    def render_speech(self, embedding: np.ndarray, text: str, speech_rate: float = 1.0,
+                      pitch: float = 0.0, tone: str = "neutral",
+                      progress_callback: Optional[ProgressCallback] = None,
+                      key: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """
+        Render text to a whole waveform, through the memory tier of the render cache.
+        
+        Export, preview and script rendering all synthesize unit by unit with
+        synthesize_stream, so the same (voice, text, rate, pitch, tone) gives
+        the same audio and cache key from every entry point.
+        """
+        if key is None and self.render_cache is not None:
+            key = render_key(embedding, text, speech_rate, pitch, tone, self.synthesis_engine.version)
+        audio_data = self.render_cache.get_audio(key) if key else None
+        metrics.count("render_cache_hits" if audio_data is not None else "renders")
+        if audio_data is not None:
+            return audio_data
+        
+        def on_unit(done: int, total: int):
+            report_progress(progress_callback, "synthesize", done, total)
+        
+        chunks = list(self.synthesis_engine.synthesize_stream(
+            text, embedding, speech_rate, pitch, tone, progress_callback=on_unit
+        ))
+        waveform = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        audio_data = (waveform, self.config.audio.sample_rate)
+        if key:
+            self.render_cache.put_audio(key, audio_data)
+        return audio_data
+    
+    def synthesize_speech_stream(self, voice_name: str, text: str, speech_rate: float = 1.0,
+                                 pitch: float = 0.0, tone: str = "neutral",
+                                 chunk_size: int = 4096) -> Iterator[np.ndarray]:
+        """Stream synthesized float32 chunks at config.audio.sample_rate for playback"""
+        embedding = self._load_voice(voice_name)
+        if self.render_cache is None:
+            yield from self.synthesis_engine.synthesize_stream(
+                text, embedding, speech_rate, pitch, tone, chunk_size=chunk_size
+            )
+            return
+        
+        key = render_key(embedding, text, speech_rate, pitch, tone, self.synthesis_engine.version)
+        cached = self.render_cache.get_audio(key)
+        if cached is not None:
+            waveform = cached[0]
+            for start in range(0, len(waveform), chunk_size):
+                yield waveform[start:start + chunk_size]
+            return
+        
+        # Only a fully consumed stream is cached; an abandoned preview is not
+        chunks = []
+        for chunk in self.synthesis_engine.synthesize_stream(
+                text, embedding, speech_rate, pitch, tone, chunk_size=chunk_size):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            self.render_cache.put_audio(key, (np.concatenate(chunks), self.config.audio.sample_rate))
+    
+    def export_speech_stream(self, voice_name: str, text: str, output, speech_rate: float = 1.0,
+                             pitch: float = 0.0, tone: str = "neutral", gain: float = 1.0,
+                             target_lufs: Optional[float] = None) -> bool:
+        """
+        Synthesize straight into a WAV file or binary stream, one chunk at a time.
+        
+        Peak memory stays at one chunk; since the peak isn't known up front,
+        a fixed gain is applied instead of export_wav's peak normalization.
+        With ``target_lufs`` the program is loudness-normalized and true-peak
+        limited in two passes over a temporary spill file instead.
+        """
+        try:
+            embedding = self._load_voice(voice_name)
+            chunks = self.synthesis_engine.synthesize_stream(text, embedding, speech_rate, pitch, tone)
+            if target_lufs is not None:
+                chunks = normalize_stream(chunks, self.config.audio.sample_rate, target_lufs,
+                                          self.config.audio.true_peak_db, spill_dir=self.config.cache_dir)
+            with self.audio_handler.open_wav_writer(output, gain=gain) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+            logger.info(f"Streamed WAV export: frames={writer.frames_written}")
+            return True
+        except Exception as e:
+            logger.error(f"Streaming export failed: {e}")
+            return False
+    
+    def submit_synthesis(self, voice_name: str, text: str, speech_rate: float = 1.0,
+                         pitch: float = 0.0, tone: str = "neutral") -> "Future[Tuple[np.ndarray, int]]":
+        """Queue a synthesis request for dynamic batching; safe to call from many threads"""
+        embedding = self._load_voice(voice_name)
+        return self.batch_scheduler.submit(text, embedding, speech_rate, pitch, tone)
+    
+    def export_metrics(self, path: Optional[Union[str, Path]] = None) -> Optional[Path]:
+        """
+        Write collected stage metrics to path (.prom/.txt for Prometheus text,
+        JSON otherwise); defaults to ``logs_dir/metrics.json``.
+        """
+        try:
+            return metrics.export(path or self.config.logs_dir / "metrics.json")
+        except OSError as e:
+            logger.error(f"Failed to export metrics: {e}")
+            return None
+    
+    def shutdown(self):
+        """Release background workers and write metrics if enabled"""
+        self.batch_scheduler.shutdown()
+        if metrics.enabled:
+            self.export_metrics()
+            self.export_metrics(self.config.logs_dir / "metrics.prom")
+    
+    def _enrollment_for_update(self, voice_name: str) -> VoiceEnrollment:
+        """Enrollment state to extend, seeded from the stored embedding for older voices"""
+        enrollment = self.voice_embedder.load_enrollment(voice_name)
+        if enrollment is None:
+            # Voices cloned before enrollment existed count as one clip of min_duration seconds
+            embedding = self._load_voice(voice_name)
+            enrollment = VoiceEnrollment(len(embedding))
+            enrollment.add_clip(embedding[None, :], [self.config.audio.min_duration], source="existing profile")
+        return enrollment
+    
+    def _load_voice(self, voice_name: str) -> np.ndarray:
+        """Load the embedding for a stored voice"""
+        return self.voice_embedder.load_voice(voice_name)
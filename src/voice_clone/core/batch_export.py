@@ -0,0 +1,242 @@
+import io
+import json
+import logging
+import os
+import tarfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+import numpy as np
+from .config import Config
+from .shared_buffers import SharedAudio, SharedBufferPool, attach
+from ..modules.audio_handler import AudioHandler
+from ..modules.encoders import export_format, export_gain
+from ..modules.loudness import LoudnessMeter
+
+logger = logging.getLogger(__name__)
+
+# Per-process AudioHandler, created once by the pool initializer
+_worker_audio_handler: Optional[AudioHandler] = None
+
+
+def _init_worker(config: Config):
+    """Process pool initializer"""
+    global _worker_audio_handler
+    _worker_audio_handler = AudioHandler(config)
+
+
+def _encode(handler: AudioHandler, audio_data: Tuple[np.ndarray, int], output_path: str, fmt: str,
+            bit_depth: int, peak_normalize: bool = True) -> Dict[str, Any]:
+    """Encode one file and describe it for the manifest; raises if encoding fails"""
+    waveform, sr = audio_data
+    start = time.perf_counter()
+    if not handler.export_audio(audio_data, output_path, fmt, bit_depth, peak_normalize=peak_normalize):
+        raise IOError(f"Failed to export {output_path}")
+    encode_seconds = time.perf_counter() - start
+
+    # Loudness of what was written: the source level plus the gain the encoder applied
+    meter = LoudnessMeter(sr)
+    meter.update(waveform)
+    gain_db = 20 * np.log10(export_gain(waveform, peak_normalize))
+    return {
+        'format': fmt,
+        'duration': len(waveform) / sr,
+        'loudness_lufs': meter.integrated() + gain_db,
+        'bytes': os.path.getsize(output_path),
+        'encode_seconds': encode_seconds,
+    }
+
+
+def _encode_in_worker(audio_data: Tuple[SharedAudio, int], output_path: str, fmt: str,
+                      bit_depth: int, peak_normalize: bool) -> Dict[str, Any]:
+    """Pool task; the waveform arrives as a shared-memory handle"""
+    handle, sr = audio_data
+    return _encode(_worker_audio_handler, (attach(handle), sr), output_path, fmt, bit_depth, peak_normalize)
+
+
+class ExportBundle:
+    """
+    Single-archive bundle of a batch export, filled as files complete.
+
+    Files are appended to an uncompressed tar (FLAC and Opus are already
+    compressed) and removed from disk, and each file's manifest entry is
+    appended and fsynced to a ``.manifest.jsonl`` sidecar at the same time,
+    so a crash leaves a readable archive plus a manifest of everything in
+    it. ``close`` adds the complete ``manifest.json`` to the archive;
+    a resumed bundle gets a newer copy appended, which tar extraction
+    prefers over the earlier one. Before resuming, a member left
+    half-written by a crash is cut off (with its manifest entry), so new
+    files are never appended behind a broken one.
+    """
+
+    def __init__(self, path: Union[str, Path], resume: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.path.with_name(self.path.name + '.manifest.jsonl')
+        self.entries: List[Dict[str, Any]] = []
+        if resume and self.path.exists():
+            members = self._recover()
+            entries = self._read_entries()
+            self.entries = [entry for entry in entries if entry['file'] in members]
+            if len(self.entries) != len(entries):
+                self._rewrite_entries()
+            self._tar = tarfile.open(self.path, 'a')
+        else:
+            self.manifest_path.unlink(missing_ok=True)
+            self._tar = tarfile.open(self.path, 'w')
+        self._manifest = open(self.manifest_path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __contains__(self, arcname: str) -> bool:
+        return any(entry['file'] == arcname for entry in self.entries)
+
+    def add(self, file_path: Union[str, Path], arcname: str, entry: Dict[str, Any]):
+        """Move a finished file into the archive and record its manifest entry"""
+        entry = dict(entry, file=arcname)
+        with self._lock:
+            self._tar.add(str(file_path), arcname=arcname)
+            # The file must be durable in the archive before the manifest lists it
+            self._tar.fileobj.flush()
+            os.fsync(self._tar.fileobj.fileno())
+            self._manifest.write(json.dumps(entry) + "\n")
+            self._manifest.flush()
+            os.fsync(self._manifest.fileno())
+            self.entries.append(entry)
+        Path(file_path).unlink()
+
+    def close(self):
+        """Write manifest.json into the archive and finish it"""
+        with self._lock:
+            if self._tar.closed:
+                return
+            try:
+                data = json.dumps({'files': self.entries}, indent=2).encode('utf-8')
+                info = tarfile.TarInfo('manifest.json')
+                info.size, info.mtime = len(data), int(time.time())
+                self._tar.addfile(info, io.BytesIO(data))
+            finally:
+                self._tar.close()
+                self._manifest.close()
+
+    def _recover(self) -> Set[str]:
+        """Cut the archive back to its last complete member; returns the member names kept"""
+        size = self.path.stat().st_size
+        members: Set[str] = set()
+        end = 0
+        try:
+            with tarfile.open(self.path, 'r:') as tar:
+                for member in tar:
+                    data_end = member.offset_data + -(-member.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                    if data_end > size:
+                        break  # header written, data cut short
+                    members.add(member.name)
+                    end = data_end
+        except tarfile.ReadError as e:
+            logger.warning(f"Bundle {self.path} is damaged after {len(members)} members: {e}")
+        if end < size - 2 * tarfile.BLOCKSIZE:
+            logger.info(f"Truncating bundle {self.path} to its {len(members)} complete members")
+        with open(self.path, 'r+b') as f:
+            # A fresh end-of-archive marker, which the next append overwrites
+            f.truncate(end)
+            f.seek(end)
+            f.write(bytes(2 * tarfile.BLOCKSIZE))
+        return members
+
+    def _rewrite_entries(self):
+        """Atomically replace the manifest sidecar with the current entries"""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _read_entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue  # torn write from a crash
+        return entries
+
+
+class BatchExporter:
+    """
+    Encode batch renders in a process pool, optionally bundling them.
+
+    ``export`` blocks until its file is written, so it can be called from
+    many threads (e.g. a pipeline's write stage) to keep the pool busy.
+    WAV is written on the calling thread: quantizing PCM costs less than
+    shipping the audio to another process. With ``processes=0`` every
+    format is encoded on the calling thread. Files are peak-normalized
+    unless ``peak_normalize`` is False (for loudness-normalized audio,
+    whose level and true-peak ceiling must be kept). Waveforms reach the pool
+    through a SharedBufferPool rather than being pickled, and each buffer
+    is released when its file is done, whether or not the worker survived.
+    """
+
+    def __init__(self, config: Config, fmt: str = "wav", processes: int = 0,
+                 bundle: Optional[ExportBundle] = None, handler: Optional[AudioHandler] = None,
+                 peak_normalize: bool = True):
+        self.config = config
+        self.format = export_format(fmt)
+        self.peak_normalize = peak_normalize
+        self.bit_depth = config.audio.bit_depth
+        self.bundle = bundle
+        self._handler = handler or AudioHandler(config)
+        self._pool = None
+        self._buffers: Optional[SharedBufferPool] = None
+        if processes > 0 and self.format != "wav":
+            # Before the pool, so the workers share this process's resource tracker
+            self._buffers = SharedBufferPool(config.pipeline.shared_slab_mb << 20)
+            self._pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                             initargs=(config,))
+
+    def __enter__(self) -> "BatchExporter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def export(self, audio_data: Tuple[np.ndarray, int], output_path: Union[str, Path],
+               arcname: Optional[str] = None, info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Encode one file and return its manifest entry.
+
+        Args:
+            audio_data: (waveform, sample_rate) to encode
+            output_path: Destination file
+            arcname: Name inside the bundle, if bundling (defaults to the file name)
+            info: Extra manifest fields, e.g. the render parameters
+        """
+        output_path = str(output_path)
+        if self._pool is not None:
+            waveform, sr = audio_data
+            handle = self._buffers.put(waveform)
+            try:
+                entry = self._pool.submit(_encode_in_worker, (handle, sr), output_path, self.format,
+                                          self.bit_depth, self.peak_normalize).result()
+            finally:
+                self._buffers.release(handle)
+        else:
+            entry = _encode(self._handler, audio_data, output_path, self.format, self.bit_depth,
+                            self.peak_normalize)
+        entry.update(info or {})
+        if self.bundle is not None:
+            self.bundle.add(output_path, arcname or Path(output_path).name, entry)
+        return entry
+
+    def close(self):
+        """Shut down the pool and finish the bundle"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._buffers.close()
+        if self.bundle is not None:
+            self.bundle.close()
@@ -0,0 +1,262 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+import numpy as np
+from .config import Config
+from .shared_buffers import SharedAudio, SharedBufferPool, attach
+from ..modules.audio_handler import AudioHandler
+from ..modules.enrollment import VoiceEnrollment
+
+logger = logging.getLogger(__name__)
+
+# Per-process AudioHandler, created once by the pool initializer
+_worker_audio_handler: Optional[AudioHandler] = None
+
+
+def _init_worker(config: Config):
+    """Process pool initializer"""
+    global _worker_audio_handler
+    _worker_audio_handler = AudioHandler(config)
+
+
+def _probe_capacity(audio_path: str) -> int:
+    """Frames to reserve for a clip's decoded audio, from its header; 0 when none will be returned"""
+    try:
+        probe = _worker_audio_handler.probe_audio(audio_path)
+    except Exception:
+        return 0  # the decode task reports the error
+    max_duration = _worker_audio_handler.audio_config.max_duration
+    if probe['duration'] > max_duration:
+        return 0  # rejected from the header
+    cap = int(max_duration * probe['sample_rate'])
+    if probe['streamable']:
+        return min(probe['frames'], cap)
+    # audioread durations are approximate; a longer decode is sent back pickled
+    return min(int((probe['duration'] + 1.0) * probe['sample_rate']), cap)
+
+
+def _decode_and_validate(audio_path: str, voice_name: str, buffer: Optional[SharedAudio] = None) -> Dict[str, Any]:
+    """
+    Decode and validate one clip in a worker; audio is only returned if valid.
+
+    The speech samples are written to the start of ``buffer`` when they fit
+    (the item then carries ``shared_audio=(samples, sample_rate)``) and are
+    pickled back as ``audio_data`` otherwise.
+    """
+    item: Dict[str, Any] = {'audio_path': audio_path, 'voice_name': voice_name}
+    try:
+        audio_data, validation = _worker_audio_handler.load_and_validate(audio_path)
+    except Exception as e:
+        item.update(success=False, issues=[f"Failed to load audio: {e}"])
+        return item
+
+    item.update(
+        issues=validation['issues'],
+        duration=float(validation['duration']),
+        snr_db=float(validation['snr_db']),
+        sample_rate=int(validation['sample_rate']),
+    )
+    if not validation['is_valid']:
+        item['success'] = False
+        return item
+
+    # Return only speech samples to the parent for embedding
+    waveform, sr = audio_data
+    quality = _worker_audio_handler.analyze_quality(audio_data)
+    speech_mask = quality.sample_mask(len(waveform))
+    speech = waveform[speech_mask] if speech_mask.any() else waveform
+    item.update(speech_snr_db=quality.snr_db, speech_ratio=quality.speech_ratio)
+    if buffer is not None and len(speech) <= buffer.shape[0]:
+        attach(buffer, writable=True)[:len(speech)] = speech
+        item['shared_audio'] = (len(speech), sr)
+    else:
+        item['audio_data'] = (speech, sr)
+    return item
+
+
+def clone_voices_bulk(app, paths_to_names: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+                      workers: Optional[int] = None, embed_batch_size: int = 8) -> Iterator[Dict[str, Any]]:
+    """
+    Clone many voices, decoding and validating clips in a process pool.
+
+    Valid clips are embedded in groups of ``embed_batch_size`` on the calling
+    process, each one segment by segment and stored with its enrollment
+    state exactly as ``clone_voice`` does, so bulk-cloned voices can be
+    refined with added clips later. At most ``2 * workers`` clips are in
+    flight and at most one group is buffered, so memory stays bounded
+    however many inputs are given.
+
+    Decoded audio comes back through a SharedBufferPool instead of being
+    pickled: a worker first reads the clip's header, the parent reserves a
+    buffer of that many frames, and the decode task writes the speech
+    samples into it. Buffers are released once their clip is embedded or
+    has failed; the parent owns every segment, so a crashed worker leaks
+    none.
+
+    A worker that dies (a decoder crash on a malformed file, an OOM kill)
+    breaks the pool for every clip in flight. The pool is recreated and
+    those clips are retried one at a time, so the clip that crashed is
+    reported as failed and the rest carry on.
+
+    Args:
+        app: VoiceCloneApp whose embedder and voice library are used
+        paths_to_names: Mapping or iterable of (audio_path, voice_name)
+        workers: Process count (defaults to os.cpu_count())
+        embed_batch_size: Number of clips embedded per group
+
+    Yields:
+        Per-item report dicts with ``audio_path``, ``voice_name``, ``success``
+        and ``issues`` (plus ``duration``, ``snr_db``, ``sample_rate`` when the
+        clip could be decoded), in completion order
+    """
+    items = iter(paths_to_names.items() if isinstance(paths_to_names, Mapping) else paths_to_names)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    pending_embed: List[Dict[str, Any]] = []
+    # Clips that were in flight when the pool broke, retried in isolation
+    suspects: Deque[Tuple[str, str]] = deque()
+
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(app.config,))
+
+    # Before the pool, so the workers share this process's resource tracker
+    buffers = SharedBufferPool(app.config.pipeline.shared_slab_mb << 20, prefix="vcclone")
+    pool = new_pool()
+    try:
+        # future -> (clip, retried in isolation, buffer reserved for its decode or None while probing)
+        in_flight: Dict[Future, Tuple[Tuple[str, str], bool, Optional[SharedAudio]]] = {}
+        decoding: Set[Future] = set()
+        exhausted = False
+        while in_flight or suspects or not exhausted:
+            if suspects:
+                if not in_flight:
+                    clip = suspects.popleft()
+                    in_flight[pool.submit(_probe_capacity, clip[0])] = (clip, True, None)
+            else:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    try:
+                        audio_path, voice_name = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    clip = (str(audio_path), voice_name)
+                    in_flight[pool.submit(_probe_capacity, clip[0])] = (clip, False, None)
+
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                clip, isolated, buffer = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    if buffer is not None:
+                        buffers.release(buffer)
+                    if not isolated:
+                        suspects.append(clip)
+                        continue
+                    logger.error(f"Decode worker crashed on {clip[0]}: {e}")
+                    yield {'audio_path': clip[0], 'voice_name': clip[1], 'success': False,
+                           'issues': [f"Decoder process crashed: {e}"]}
+                    continue
+                except Exception as e:
+                    if buffer is not None:
+                        buffers.release(buffer)
+                    yield {'audio_path': clip[0], 'voice_name': clip[1], 'success': False,
+                           'issues': [f"Failed to load audio: {e}"]}
+                    continue
+
+                if future not in decoding:
+                    # Header read; reserve the decoded audio's buffer and decode into it
+                    buffer = buffers.allocate(result, np.float32)[0] if result else None
+                    try:
+                        decode = pool.submit(_decode_and_validate, clip[0], clip[1], buffer)
+                    except BrokenProcessPool:
+                        # Another clip's worker died since this header was read
+                        broken = True
+                        if buffer is not None:
+                            buffers.release(buffer)
+                        suspects.append(clip)
+                        continue
+                    in_flight[decode] = (clip, isolated, buffer)
+                    decoding.add(decode)
+                    continue
+
+                decoding.discard(future)
+                item = result
+                if 'shared_audio' in item:
+                    samples, sr = item.pop('shared_audio')
+                    item.update(audio_data=(buffers.array(buffer)[:samples], sr), buffer=buffer)
+                elif buffer is not None:
+                    buffers.release(buffer)
+                if 'audio_data' in item:
+                    pending_embed.append(item)
+                else:
+                    yield item
+
+            if broken:
+                # Every other clip in the dead pool fails the same way; retry them all
+                for future, (clip, _, buffer) in in_flight.items():
+                    future.cancel()
+                    if buffer is not None:
+                        buffers.release(buffer)
+                    suspects.append(clip)
+                in_flight.clear()
+                decoding.clear()
+                pool.shutdown(wait=False)
+                pool = new_pool()
+                logger.warning(f"Decode pool restarted; retrying {len(suspects)} clip(s) one at a time")
+
+            if len(pending_embed) >= embed_batch_size:
+                yield from _embed_and_store(app, pending_embed, buffers)
+                pending_embed = []
+
+        if pending_embed:
+            yield from _embed_and_store(app, pending_embed, buffers)
+    finally:
+        pool.shutdown()
+        buffers.close()
+
+
+def _embed_and_store(app, batch: List[Dict[str, Any]], buffers: SharedBufferPool) -> Iterator[Dict[str, Any]]:
+    """Embed a group of validated clips and store each as a newly enrolled voice"""
+    for item in batch:
+        # Workers already cut the clip down to its speech samples
+        audio_data = item.pop('audio_data')
+        buffer = item.pop('buffer', None)
+        source_file = Path(item['audio_path']).name
+        try:
+            embeddings, weights = app.voice_embedder.extract_segment_embeddings(audio_data)
+        except Exception as e:
+            logger.error(f"Embedding failed for {item['voice_name']}: {e}")
+            item.update(success=False, issues=item['issues'] + [f"Embedding failed: {e}"])
+            yield item
+            continue
+        finally:
+            # Segment embeddings don't view the audio, so its buffer can be reused now
+            del audio_data
+            if buffer is not None:
+                buffers.release(buffer)
+
+        try:
+            enrollment = VoiceEnrollment(embeddings.shape[1])
+            enrollment.add_clip(embeddings, weights, source=source_file, duration=item['duration'])
+            app.voice_embedder.store_enrollment(item['voice_name'], enrollment, {
+                'source_file': source_file,
+                'duration': item['duration'],
+                'snr_db': item['snr_db'],
+                'speech_snr_db': item['speech_snr_db'],
+                'speech_ratio': item['speech_ratio'],
+                'sample_rate': item['sample_rate'],
+            })
+            item['success'] = True
+            logger.info(f"Voice cloning completed: {item['voice_name']}")
+        except Exception as e:
+            item.update(success=False, issues=item['issues'] + [f"Failed to save voice: {e}"])
+        yield item
@@ -17,6 +17,12 @@ class AudioConfig(BaseModel):
     min_duration: float = 30.0
     max_duration: float = 120.0
     min_snr: float = 15.0
+    resample_quality: str = "default"  # fast, default or high
+    target_lufs: float = -16.0
+    true_peak_db: float = -1.0
+    export_format: str = "wav"  # batch render output: wav, flac or opus
+    flac_compression_level: float = 0.5  # 0 to 1: encoder effort
+    opus_compression_level: float = 0.8  # 0 to 1: 256 kb/s down to 6 kb/s; 0.8 is about 56 kb/s
 
 
 class ModelConfig(BaseModel):
@@ -26,6 +32,46 @@ class ModelConfig(BaseModel):
     device: str = "cuda"
     dtype: str = "fp16"
     max_cache_size: int = 5
+    max_batch_size: int = 8
+    embedding_segment_seconds: float = 3.0  # long clips are embedded as batches of segments this long
+    embedding_batch_size: int = 8  # segments per embedding forward pass (max_batch_size is for synthesis)
+    batch_max_wait_ms: float = 10.0
+    ann_min_library_size: int = 50000
+    ann_nprobe: int = 8
+
+
+class CacheConfig(BaseModel):
+    """Rendered audio cache configuration"""
+    enabled: bool = True
+    memory_budget_mb: int = 256
+    disk_budget_mb: int = 2048
+    export_mode: str = "copy"  # "copy" or "hardlink"
+
+
+class ServerConfig(BaseModel):
+    """Local synthesis service configuration"""
+    host: str = "127.0.0.1"  # loopback only
+    port: int = 8765
+    workers: int = 2  # concurrent synthesis jobs
+    max_queue: int = 32  # admitted requests waiting for a worker
+    default_deadline_s: float = 30.0
+    max_deadline_s: float = 300.0
+    max_text_chars: int = 5000
+    drain_timeout_s: float = 30.0
+    stream_chunk_size: int = 4096
+
+
+class PipelineConfig(BaseModel):
+    """Script render pipeline configuration"""
+    preprocess_workers: int = 1
+    synthesis_workers: int = 2
+    postprocess_workers: int = 1
+    write_workers: int = 2
+    encode_processes: int = 2  # FLAC/Opus encoder processes (0 encodes in the write threads)
+    shared_slab_mb: int = 8  # shared-memory slab size for audio exchanged with encoder and decoder processes
+    queue_size: int = 4  # items buffered between consecutive stages
+    ordered: bool = True  # finish lines in script order
+    autosave_interval_s: float = 30.0  # job state checkpoint period
 
 
 class UIConfig(BaseModel):
@@ -49,14 +95,24 @@ class Config(BaseSettings):
     voices_dir: Path = Field(default_factory=lambda: Path.home() / ".voice_clone" / "voices")
     exports_dir: Path = Field(default_factory=lambda: Path.home() / "Documents" / "Voice Clone Exports")
     logs_dir: Path = Field(default_factory=lambda: Path.home() / ".voice_clone" / "logs")
+    cache_dir: Path = Field(default_factory=lambda: Path.home() / ".voice_clone" / "cache")
+    
+    # Voice library storage: "npz" (one file per voice) or "mmap" (single memory-mapped matrix)
+    voice_store_backend: str = "npz"
+    # Embedding storage precision for new profiles: "fp32", "fp16" or "int8" (per-vector scale)
+    embedding_storage_dtype: str = "fp32"
     
     # Feature flags
     enable_telemetry: bool = False
     enable_crash_reporting: bool = False
+    enable_metrics: bool = False  # per-stage timing, exported to logs_dir on shutdown
     
     # Sub-configurations
     audio: AudioConfig = Field(default_factory=AudioConfig)
     model: ModelConfig = Field(default_factory=ModelConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    server: ServerConfig = Field(default_factory=ServerConfig)
+    pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
     ui: UIConfig = Field(default_factory=UIConfig)
     
     class Config:
@@ -67,8 +123,20 @@ class Config(BaseSettings):
         super().__init__(**data)
         self._create_directories()
     
+    @classmethod
+    def load_config(cls, config_path: Optional[Path] = None) -> "Config":
+        """Load configuration from config.json, falling back to defaults"""
+        config_path = Path(config_path or Path.home() / ".voice_clone" / "config.json")
+        if config_path.exists():
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    return cls(**json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load config from {config_path}: {e}")
+        return cls()
+    
     def _create_directories(self):
         """Create necessary application directories"""
         for directory in [self.app_dir, self.models_dir, self.voices_dir, 
-                         self.exports_dir, self.logs_dir]:
+                         self.exports_dir, self.logs_dir, self.cache_dir]:
             directory.mkdir(parents=True, exist_ok=True)
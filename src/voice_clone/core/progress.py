@@ -0,0 +1,14 @@
+from typing import Callable, Optional
+
+# Progress callbacks receive (stage, done, total), e.g. ("synthesize", 3, 10)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class JobCancelled(Exception):
+    """Raised from a progress callback to cooperatively cancel a running job"""
+
+
+def report_progress(callback: Optional[ProgressCallback], stage: str, done: int, total: int):
+    """Invoke callback if one was given; it may raise JobCancelled"""
+    if callback is not None:
+        callback(stage, done, total)
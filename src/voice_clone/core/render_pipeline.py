@@ -0,0 +1,232 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of input for one worker of a stage
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One step of a staged pipeline: fn(payload) -> payload, run by its own worker threads"""
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    queue_size: int = 4  # bounded input queue; a full queue blocks the stage upstream
+
+
+@dataclass
+class PipelineItem:
+    """A payload travelling through the pipeline with its input position and any error"""
+    seq: int
+    payload: Any
+    error: Optional[BaseException] = None
+    failed_stage: Optional[str] = None
+
+
+class _StageStats:
+    """Counters for one stage, updated by its workers"""
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0  # time spent waiting to hand results downstream
+        self.depth_sum = 0
+        self.depth_samples = 0
+        self.depth_max = 0
+        self.lock = threading.Lock()
+
+    def sample_depth(self, depth: int):
+        with self.lock:
+            self.depth_sum += depth
+            self.depth_samples += 1
+            self.depth_max = max(self.depth_max, depth)
+
+    def snapshot(self, wall_time: float, depth: int) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'queue_depth': depth,
+                'queue_depth_mean': self.depth_sum / self.depth_samples if self.depth_samples else 0.0,
+                'queue_depth_max': self.depth_max,
+                'processed': self.processed,
+                'failed': self.failed,
+                'items_per_second': self.processed / wall_time if wall_time > 0 else 0.0,
+                'busy_seconds': self.busy_seconds,
+                'blocked_seconds': self.blocked_seconds,
+                'utilization': self.busy_seconds / (wall_time * self.workers) if wall_time > 0 else 0.0,
+            }
+
+
+class StagedPipeline:
+    """
+    Producer/consumer pipeline of stages joined by bounded queues.
+
+    Every stage has its own worker threads, so while one item is being
+    synthesized the previous one can be post-processed and the one before
+    that written to disk. Bounded queues plus a cap on items in flight
+    keep memory flat however long the input is: a slow stage fills its
+    queue and the stages feeding it block instead of buffering.
+
+    Items that raise in a stage are not retried; they skip the remaining
+    stages and come out with ``error`` set, so one bad input never stalls
+    the rest.
+    """
+
+    def __init__(self, stages: Sequence[Stage], ordered: bool = True, max_in_flight: Optional[int] = None):
+        """
+        Args:
+            stages: Stages in processing order
+            ordered: Yield results in input order (held in a reorder buffer)
+                rather than as soon as each finishes
+            max_in_flight: Cap on items between input and output; defaults to
+                the sum of all queue sizes and worker counts
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        for stage in stages:
+            if stage.workers < 1 or stage.queue_size < 1:
+                raise ValueError(f"Stage {stage.name} needs at least one worker and queue slot")
+        self.stages = list(stages)
+        self.ordered = ordered
+        self.max_in_flight = max_in_flight or sum(s.workers + s.queue_size for s in stages)
+        self._stats = [_StageStats(s.name, s.workers, s.queue_size) for s in self.stages]
+        self._queues: List[queue.Queue] = []
+        self._output: Optional[queue.Queue] = None
+        self._start = 0.0
+        self._end: Optional[float] = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage queue depth, throughput and utilization so far (safe to call while running)"""
+        if not self._start:
+            return {}
+        wall_time = (self._end or time.perf_counter()) - self._start
+        return {stats.name: stats.snapshot(wall_time, q.qsize())
+                for stats, q in zip(self._stats, self._queues)}
+
+    def run(self, payloads: Iterable[Any]) -> Iterator[PipelineItem]:
+        """
+        Feed payloads through every stage, yielding finished items.
+
+        Closing the generator early stops the workers once their current
+        items finish; items still queued are dropped.
+        """
+        self._queues = [queue.Queue(maxsize=s.queue_size) for s in self.stages]
+        self._output = queue.Queue()
+        self._start, self._end = time.perf_counter(), None
+        stop = threading.Event()
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        remaining = [s.workers for s in self.stages]
+        remaining_lock = threading.Lock()
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            count = 0
+            try:
+                for payload in payloads:
+                    while not in_flight.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if not put(self._queues[0], PipelineItem(count, payload)):
+                        return
+                    count += 1
+            except BaseException as e:
+                logger.error(f"Pipeline input failed: {e}")
+                self._output.put(e)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    put(self._queues[0], _DONE)
+
+        def work(index: int):
+            stage, stats, inbox = self.stages[index], self._stats[index], self._queues[index]
+            outbox = self._queues[index + 1] if index + 1 < len(self.stages) else self._output
+            while not stop.is_set():
+                try:
+                    item = inbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                stats.sample_depth(inbox.qsize())
+                if item.error is None:
+                    start = time.perf_counter()
+                    try:
+                        item.payload = stage.fn(item.payload)
+                    except Exception as e:
+                        item.error, item.failed_stage = e, stage.name
+                        with stats.lock:
+                            stats.failed += 1
+                    with stats.lock:
+                        stats.processed += 1
+                        stats.busy_seconds += time.perf_counter() - start
+                start = time.perf_counter()
+                if not put(outbox, item):
+                    break
+                with stats.lock:
+                    stats.blocked_seconds += time.perf_counter() - start
+            # The last worker of a stage to finish passes end-of-input downstream
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    put(outbox, _DONE)
+            elif last:
+                outbox.put(_DONE)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=work, args=(index,), name=f"pipeline-{stage.name}-{n}",
+                                         daemon=True) for n in range(stage.workers)]
+        for thread in threads:
+            thread.start()
+
+        pending: Dict[int, PipelineItem] = {}
+        next_seq = 0
+        try:
+            while True:
+                item = self._output.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                if not self.ordered:
+                    in_flight.release()
+                    yield item
+                    continue
+                pending[item.seq] = item
+                while next_seq in pending:
+                    in_flight.release()
+                    yield pending.pop(next_seq)
+                    next_seq += 1
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self._end = time.perf_counter()
+
+
+def format_stage_stats(stats: Dict[str, Dict[str, Any]]) -> List[str]:
+    """One human-readable line per stage"""
+    return [f"{name:<12} x{s['workers']}  {s['items_per_second']:7.2f} items/s  "
+            f"busy {100 * s['utilization']:5.1f}%  queue mean {s['queue_depth_mean']:.1f} "
+            f"max {s['queue_depth_max']}/{s['queue_size']}"
+            for name, s in stats.items()]
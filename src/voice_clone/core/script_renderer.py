@@ -0,0 +1,333 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+import numpy as np
+from .batch_export import BatchExporter, ExportBundle
+from .render_pipeline import PipelineItem, Stage, StagedPipeline
+from ..modules.encoders import EXPORT_FORMATS, export_format
+from ..utils.helpers import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScriptLine:
+    """One line of a render script"""
+    index: int
+    voice: str
+    text: str
+    rate: float = 1.0
+    pitch: float = 0.0
+    tone: str = "neutral"
+    output: str = ""
+
+
+def load_script(script_path: Path, fmt: str = "wav") -> List[ScriptLine]:
+    """
+    Parse a CSV or JSONL render script with voice, text, rate, pitch, tone and output columns.
+
+    Output names get the extension of the export format ``fmt``, replacing
+    any audio extension the script gave them.
+    """
+    script_path = Path(script_path)
+    if script_path.suffix.lower() == ".jsonl":
+        with open(script_path, 'r', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(script_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    lines = []
+    for index, row in enumerate(rows):
+        output = sanitize_filename(row.get('output') or f"{index:05d}_{row['voice']}")
+        stem, extension = os.path.splitext(output)
+        if extension.lower() in EXPORT_FORMATS.values():
+            output = stem
+        output += EXPORT_FORMATS[fmt]
+        lines.append(ScriptLine(
+            index=index,
+            voice=row['voice'],
+            text=row['text'],
+            rate=float(row.get('rate') or 1.0),
+            pitch=float(row.get('pitch') or 0.0),
+            tone=(row.get('tone') or "neutral").lower(),
+            output=output,
+        ))
+    return lines
+
+
+class _Autosaver:
+    """Call save() every interval seconds on a background thread while the context is open"""
+
+    def __init__(self, interval: float, save):
+        self.interval = interval
+        self.save = save
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="render-autosave", daemon=True)
+
+    def __enter__(self) -> "_Autosaver":
+        self.save()
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+            except Exception as e:
+                logger.warning(f"Job state autosave failed: {e}")
+
+
+class ScriptRenderer:
+    """Render a script of (voice, text, parameters) lines to WAV files"""
+
+    STAGES = ("preprocess", "synthesize", "postprocess", "write")
+
+    def __init__(self, app, output_dir: Optional[Path] = None):
+        self.app = app
+        self.output_dir = Path(output_dir or app.config.exports_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._exporter: Optional[BatchExporter] = None
+
+    def render(self, script_path: Path, workers: Optional[int] = None, resume: bool = True,
+               ordered: Optional[bool] = None, target_lufs: Optional[float] = None,
+               fmt: Optional[str] = None, bundle: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Render every line of a script, recording each result in a manifest.
+
+        Lines flow through a staged pipeline (text preprocessing, synthesis,
+        post-processing, WAV writing) joined by bounded queues, with worker
+        counts per stage from ``config.pipeline``, so synthesis of one line
+        overlaps with writing the previous ones.
+
+        The manifest (``<script>.manifest.jsonl`` in the output directory) is
+        appended and fsynced after every line, so an interrupted render can be
+        resumed and skips lines already rendered. Job state with progress and
+        per-stage statistics is saved to ``<script>.job.json`` every
+        ``autosave_interval_s`` seconds and when the render ends.
+
+        Args:
+            script_path: CSV or JSONL script
+            workers: Synthesis workers (defaults to config.pipeline.synthesis_workers)
+            resume: Skip lines recorded as rendered in an existing manifest
+            ordered: Finish lines in script order (defaults to config.pipeline.ordered)
+            target_lufs: Loudness-normalize each line to this level (true-peak
+                limited to config.audio.true_peak_db) and export it at that
+                level instead of peak-normalizing it
+            fmt: Export format, "wav", "flac" or "opus" (defaults to
+                config.audio.export_format); FLAC and Opus are encoded in
+                ``config.pipeline.encode_processes`` worker processes
+            bundle: Move finished files into this tar archive, with a
+                manifest of durations, loudness and parameters
+
+        Returns:
+            Summary with counts, latency percentiles, realtime factor and
+            per-stage pipeline statistics
+        """
+        settings = self.app.config.pipeline
+        script_path = Path(script_path)
+        fmt = export_format(fmt or self.app.config.audio.export_format)
+        lines = load_script(script_path, fmt)
+        manifest_path = self.output_dir / f"{script_path.stem}.manifest.jsonl"
+        state_path = self.output_dir / f"{script_path.stem}.job.json"
+
+        export_bundle = ExportBundle(bundle, resume) if bundle else None
+        done = self._completed_lines(manifest_path, export_bundle) if resume else set()
+        if not resume:
+            for path in (manifest_path, state_path):
+                if path.exists():
+                    path.unlink()
+        elif state_path.exists():
+            previous = self._read_state(state_path)
+            logger.info(f"Resuming job {state_path} ({previous.get('status')}, "
+                        f"{previous.get('rendered', 0)} lines rendered last run)")
+        todo = [line for line in lines if line.index not in done]
+
+        stage_workers = [settings.preprocess_workers, workers or settings.synthesis_workers,
+                         settings.postprocess_workers, settings.write_workers]
+        stage_fns = [self._preprocess, self._synthesize,
+                     lambda job: self._postprocess(job, target_lufs), self._write]
+        pipeline = StagedPipeline(
+            [Stage(name, fn, n, settings.queue_size) for name, fn, n in zip(self.STAGES, stage_fns, stage_workers)],
+            ordered=settings.ordered if ordered is None else ordered,
+        )
+        logger.info(f"Rendering script {script_path}: {len(todo)} of {len(lines)} lines, "
+                    f"stage workers={dict(zip(self.STAGES, stage_workers))}")
+
+        records: List[Dict[str, Any]] = []
+        state = {
+            'script': str(script_path.resolve()),
+            'manifest': str(manifest_path),
+            'status': 'running',
+            'lines': len(lines),
+            'skipped': len(lines) - len(todo),
+            'started_at': time.time(),
+        }
+
+        def checkpoint(status: str = 'running'):
+            with self._state_lock:
+                ok = sum(record['success'] for record in records)
+                state.update(status=status, rendered=ok, failed=len(records) - ok,
+                             pending=len(todo) - len(records), updated_at=time.time(),
+                             stages=pipeline.stats())
+                self._write_state(state_path, state)
+
+        autosave = _Autosaver(settings.autosave_interval_s, checkpoint)
+        self._exporter = BatchExporter(self.app.config, fmt, settings.encode_processes,
+                                       export_bundle,
+                                       self.app.audio_handler, peak_normalize=target_lufs is None)
+        start = time.perf_counter()
+        status = 'interrupted'
+        try:
+            with open(manifest_path, 'a', encoding='utf-8') as manifest, autosave, self._exporter:
+                for item in pipeline.run({'line': line} for line in todo):
+                    record = self._finish(item)
+                    self._append_manifest(manifest, record)
+                    records.append(record)
+            status = 'complete'
+        finally:
+            checkpoint(status)
+        wall_time = time.perf_counter() - start
+
+        summary = self._summarize(records, wall_time)
+        summary['skipped'] = len(lines) - len(todo)
+        summary['manifest'] = str(manifest_path)
+        summary['job_state'] = str(state_path)
+        summary['stages'] = pipeline.stats()
+        summary['format'] = fmt
+        if bundle:
+            summary['bundle'] = str(bundle)
+        return summary
+
+    def _preprocess(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Check parameters, normalize the text and resolve the voice embedding"""
+        line: ScriptLine = job['line']
+        job['start'] = time.perf_counter()
+        if not self.app.synthesis_engine.validate_parameters(line.rate, line.pitch):
+            raise ValueError(f"Invalid parameters: rate={line.rate}, pitch={line.pitch}")
+        job['text'] = " ".join(line.text.split())
+        if not job['text']:
+            raise ValueError("Empty text")
+        job['embedding'] = self.app.voice_embedder.load_voice(line.voice)
+        return job
+
+    def _synthesize(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Render through the app, so lines match GUI exports and share their cache entries"""
+        line: ScriptLine = job['line']
+        job['audio'] = self.app.render_speech(job.pop('embedding'), job['text'], line.rate, line.pitch, line.tone)
+        return job
+
+    def _postprocess(self, job: Dict[str, Any], target_lufs: Optional[float]) -> Dict[str, Any]:
+        """Resample to the output rate and optionally loudness-normalize"""
+        handler = self.app.audio_handler
+        waveform, sr = handler.resample_audio(job['audio'], self.app.config.audio.sample_rate)
+        if target_lufs is not None:
+            waveform = handler.normalize_loudness(waveform, target_lufs, sr, self.app.config.audio.true_peak_db)
+        job['audio'] = (waveform, sr)
+        return job
+
+    def _write(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        line: ScriptLine = job['line']
+        info = {'index': line.index, 'voice': line.voice, 'text': line.text, 'rate': line.rate,
+                'pitch': line.pitch, 'tone': line.tone}
+        job['export'] = self._exporter.export(job.pop('audio'), self.output_dir / line.output, line.output, info)
+        return job
+
+    def _finish(self, item: PipelineItem) -> Dict[str, Any]:
+        """Manifest record of a line that has left the pipeline"""
+        job = item.payload
+        line: ScriptLine = job['line']
+        record: Dict[str, Any] = {'index': line.index, 'voice': line.voice,
+                                  'output': str(self.output_dir / line.output)}
+        latency = time.perf_counter() - job['start'] if 'start' in job else 0.0
+        if item.error is not None:
+            logger.error(f"Failed to render line {line.index} in {item.failed_stage}: {item.error}")
+            record.update(success=False, error=str(item.error), stage=item.failed_stage, latency=latency)
+        else:
+            export = job['export']
+            audio_seconds = export['duration']
+            record.update(success=True, latency=latency, audio_seconds=audio_seconds,
+                          rtf=latency / audio_seconds if audio_seconds else 0.0, format=export['format'],
+                          bytes=export['bytes'], loudness_lufs=export['loudness_lufs'])
+            if self._exporter.bundle is not None:
+                record['bundle'] = str(self._exporter.bundle.path)
+        return record
+
+    def _write_state(self, state_path: Path, state: Dict[str, Any]):
+        """Atomically replace the job state file"""
+        tmp_path = state_path.with_name(state_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, state_path)
+
+    def _read_state(self, state_path: Path) -> Dict[str, Any]:
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable job state {state_path}: {e}")
+            return {}
+
+    def _append_manifest(self, manifest, record: Dict[str, Any]):
+        """Durably append one record to the manifest"""
+        with self._manifest_lock:
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+
+    def _completed_lines(self, manifest_path: Path, bundle: Optional[ExportBundle] = None) -> Set[int]:
+        """Indices recorded as successfully rendered whose output still exists (on disk or in the bundle)"""
+        done: Set[int] = set()
+        if not manifest_path.exists():
+            return done
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                if not record.get('success'):
+                    continue
+                if 'bundle' in record:
+                    found = (bundle is not None and Path(record['bundle']) == bundle.path
+                             and Path(record['output']).name in bundle)
+                else:
+                    found = Path(record['output']).exists()
+                if found:
+                    done.add(record['index'])
+        return done
+
+    def _summarize(self, records: List[Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+        """Aggregate latency and realtime factor over rendered lines"""
+        ok = [record for record in records if record['success']]
+        latencies = np.array([record['latency'] for record in ok])
+        audio_seconds = sum(record['audio_seconds'] for record in ok)
+        summary: Dict[str, Any] = {
+            'rendered': len(ok),
+            'failed': len(records) - len(ok),
+            'wall_time': wall_time,
+            'audio_seconds': audio_seconds,
+            'throughput_rtf': wall_time / audio_seconds if audio_seconds else 0.0,
+        }
+        if len(latencies):
+            summary.update(
+                latency_p50=float(np.percentile(latencies, 50)),
+                latency_p95=float(np.percentile(latencies, 95)),
+                latency_max=float(latencies.max()),
+                mean_rtf=float(np.mean([record['rtf'] for record in ok])),
+            )
+        return summary
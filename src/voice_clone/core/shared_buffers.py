@@ -0,0 +1,224 @@
+import logging
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Buffers start on cache-line boundaries within a slab
+_ALIGNMENT = 64
+
+# Segments a worker process keeps mapped between tasks
+_MAX_ATTACHED = 32
+
+
+class SharedAudio(NamedTuple):
+    """Picklable reference to an array in a SharedBufferPool slab"""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+    offset: int
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+
+class _Slab:
+    """One shared-memory segment, carved into buffers by bumping an offset"""
+
+    def __init__(self, size: int, prefix: str):
+        self.shm = shared_memory.SharedMemory(name=f"{prefix}_{uuid.uuid4().hex[:12]}", create=True, size=size)
+        self.size = size
+        self.used = 0
+        self.refs = 0
+
+    def unlink(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # a view is still alive; the mapping goes with it
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _unlink_all(slabs: Dict[str, _Slab]):
+    for slab in list(slabs.values()):
+        slab.unlink()
+    slabs.clear()
+
+
+class SharedBufferPool:
+    """
+    Shared-memory arena for passing audio to worker processes without pickling.
+
+    Arrays are copied (or written directly, via ``allocate``) into slabs of
+    ``slab_bytes`` and referenced by SharedAudio handles of (segment name,
+    shape, dtype, byte offset), which pickle to a few dozen bytes. Small
+    buffers share a slab; larger ones get a dedicated slab rounded up to a
+    power of two. Each buffer holds one reference on its slab, ``acquire``
+    and ``release`` add and drop more, and a slab whose references reach
+    zero is reset and kept for reuse (the ``max_free_slabs`` most recently
+    freed) instead of being unmapped, so steady-state batches allocate no
+    new segments.
+
+    The pool's process owns every segment: workers only map them (see
+    ``attach``), so a crashed worker leaks nothing. ``close`` unlinks all
+    segments, as does garbage collection of the pool; if the owning process
+    itself dies, the multiprocessing resource tracker unlinks them.
+    """
+
+    def __init__(self, slab_bytes: int = 8 << 20, max_free_slabs: int = 4, prefix: str = "vc"):
+        self.slab_bytes = slab_bytes
+        self.max_free_slabs = max_free_slabs
+        self.prefix = prefix
+        self._slabs: Dict[str, _Slab] = {}
+        self._free: List[_Slab] = []
+        self._open: Optional[_Slab] = None  # shared slab new small buffers are carved from
+        self._lock = threading.Lock()
+        self.segments_created = 0
+        self._finalizer = weakref.finalize(self, _unlink_all, self._slabs)
+        # Workers started from here on share this tracker, which unlinks the
+        # segments if this process dies and must not be unlinked by a worker's own
+        resource_tracker.ensure_running()
+
+    def __enter__(self) -> "SharedBufferPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def allocate(self, shape, dtype=np.float32) -> Tuple[SharedAudio, np.ndarray]:
+        """Reserve a buffer; returns its handle and a writable view of it"""
+        shape = tuple(int(n) for n in np.atleast_1d(shape))
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        with self._lock:
+            slab, offset = self._reserve(nbytes)
+            slab.refs += 1
+        handle = SharedAudio(slab.shm.name, shape, dtype.str, offset)
+        return handle, self._view(slab, handle)
+
+    def put(self, array: np.ndarray) -> SharedAudio:
+        """Copy an array into the pool and return its handle"""
+        array = np.asarray(array)
+        handle, view = self.allocate(array.shape, array.dtype)
+        view[...] = array
+        return handle
+
+    def array(self, handle: SharedAudio) -> np.ndarray:
+        """View of a buffer held by this pool"""
+        with self._lock:
+            return self._view(self._slabs[handle.name], handle)
+
+    def acquire(self, handle: SharedAudio):
+        """Add a reference, e.g. for a second task reading the same buffer"""
+        with self._lock:
+            self._slabs[handle.name].refs += 1
+
+    def release(self, handle: SharedAudio):
+        """Drop a reference; the slab is recycled once nothing in it is referenced"""
+        with self._lock:
+            slab = self._slabs.get(handle.name)
+            if slab is None:
+                return  # pool already closed
+            slab.refs -= 1
+            if slab.refs > 0:
+                return
+            slab.used = 0
+            if slab is self._open:
+                return  # keeps taking new buffers from the start
+            self._free.append(slab)
+            if len(self._free) > self.max_free_slabs:
+                # Keep the most recently used sizes; the oldest free slab goes
+                stale = self._free.pop(0)
+                del self._slabs[stale.shm.name]
+                stale.unlink()
+
+    @property
+    def in_use(self) -> int:
+        """Segments holding at least one live buffer"""
+        with self._lock:
+            return sum(1 for slab in self._slabs.values() if slab.refs > 0)
+
+    def close(self):
+        """Unlink every segment; outstanding handles become invalid"""
+        with self._lock:
+            self._free.clear()
+            self._open = None
+            self._finalizer()
+
+    def _reserve(self, nbytes: int) -> Tuple[_Slab, int]:
+        size = max(nbytes, 1)
+        if size > self.slab_bytes // 2:
+            # Dedicated slab, sized to the next power of two so similar lengths can reuse it
+            size = 1 << (size - 1).bit_length()
+            for i in range(len(self._free) - 1, -1, -1):
+                if self._free[i].size >= size:
+                    return self._free.pop(i), 0
+            return self._new_slab(size), 0
+
+        aligned = (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        slab = self._open
+        if slab is None or slab.used + aligned > slab.size:
+            if slab is not None and slab.refs == 0:
+                slab.used = 0  # nothing in it is live; start over
+            else:
+                slab = self._open = self._take_shared_slab()
+        offset = slab.used
+        slab.used += aligned
+        return slab, offset
+
+    def _take_shared_slab(self) -> _Slab:
+        for i, slab in enumerate(self._free):
+            if slab.size == self.slab_bytes:
+                return self._free.pop(i)
+        return self._new_slab(self.slab_bytes)
+
+    def _new_slab(self, size: int) -> _Slab:
+        slab = _Slab(size, self.prefix)
+        self._slabs[slab.shm.name] = slab
+        self.segments_created += 1
+        logger.debug(f"Created shared-memory slab {slab.shm.name} ({size} bytes)")
+        return slab
+
+    @staticmethod
+    def _view(slab: _Slab, handle: SharedAudio) -> np.ndarray:
+        return np.ndarray(handle.shape, dtype=handle.dtype, buffer=slab.shm.buf, offset=handle.offset)
+
+
+# Segments mapped by this (worker) process, most recently used last
+_attached: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+_attached_lock = threading.Lock()
+
+
+def attach(handle: SharedAudio, writable: bool = False) -> np.ndarray:
+    """
+    View of a pooled buffer from any process; read-only unless ``writable``.
+
+    Mappings are cached per segment, so a worker handed buffers from
+    recycled slabs maps each segment once. The view is only valid until
+    the owner releases the handle. A writable view lets a worker return
+    results in a buffer the owner allocated for them.
+    """
+    with _attached_lock:
+        shm = _attached.get(handle.name)
+        if shm is None:
+            shm = _attached[handle.name] = shared_memory.SharedMemory(name=handle.name)
+            while len(_attached) > _MAX_ATTACHED:
+                _, old = _attached.popitem(last=False)
+                try:
+                    old.close()
+                except BufferError:
+                    pass  # still viewed by a running task; unmapped when that view goes
+        else:
+            _attached.move_to_end(handle.name)
+    view = np.ndarray(handle.shape, dtype=handle.dtype, buffer=shm.buf, offset=handle.offset)
+    view.flags.writeable = writable
+    return view
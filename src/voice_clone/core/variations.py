@@ -0,0 +1,154 @@
+import itertools
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+import numpy as np
+from .progress import ProgressCallback, report_progress
+from ..modules.render_cache import render_key
+from ..utils.helpers import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Variant:
+    """One (voice, speech_rate, pitch, tone) combination to render"""
+    voice: str
+    speech_rate: float = 1.0
+    pitch: float = 0.0
+    tone: str = "neutral"
+
+    @property
+    def filename(self) -> str:
+        """Path of the variant's WAV, relative to the export folder"""
+        voice = sanitize_filename(self.voice)
+        return f"{voice}/{voice}_rate{self.speech_rate:.2f}_pitch{self.pitch:+.1f}_{sanitize_filename(self.tone)}.wav"
+
+
+def variant_grid(voices: Sequence[str], speech_rates: Sequence[float] = (1.0,),
+                 pitches: Sequence[float] = (0.0,), tones: Sequence[str] = ("neutral",)) -> List[Variant]:
+    """Every combination of the given voices and parameters"""
+    return [Variant(voice, float(rate), float(pitch), tone)
+            for voice, rate, pitch, tone in itertools.product(voices, speech_rates, pitches, tones)]
+
+
+def _as_variant(item: Union[Variant, Mapping[str, Any], Sequence[Any]]) -> Variant:
+    if isinstance(item, Variant):
+        return item
+    if isinstance(item, Mapping):
+        return Variant(**item)
+    return Variant(*item)
+
+
+class VariationRenderer:
+    """Render one text across many voice/parameter variants into an export folder"""
+
+    def __init__(self, app, output_dir: Optional[Path] = None):
+        self.app = app
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.output_dir = Path(output_dir or app.config.exports_dir / f"variations_{timestamp}")
+
+    def render(self, text: str, variants: Iterable[Union[Variant, Mapping[str, Any], Sequence[Any]]],
+               progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Render every variant of text and write ``manifest.json`` alongside the WAVs.
+
+        Cache hits are exported straight from the render cache; the rest are
+        synthesized in batches of ``config.model.max_batch_size`` variants that
+        share one text segmentation.
+
+        Args:
+            text: Text to synthesize
+            variants: Variant objects, dicts or (voice, speech_rate, pitch, tone) tuples
+            progress_callback: Receives "synthesize" and "export" stages per variant
+
+        Returns:
+            Summary with counts, wall time and the manifest path
+        """
+        app = self.app
+        engine = app.synthesis_engine
+        cache = app.render_cache
+        sample_rate, bit_depth = app.config.audio.sample_rate, app.config.audio.bit_depth
+        variants = [_as_variant(item) for item in variants]
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+
+        entries: List[Dict[str, Any]] = [dict(asdict(v), file=v.filename, success=False) for v in variants]
+        embeddings: Dict[str, np.ndarray] = {}
+        pending: List[int] = []
+        keys: Dict[int, str] = {}
+        for i, variant in enumerate(variants):
+            try:
+                if variant.voice not in embeddings:
+                    embeddings[variant.voice] = app._load_voice(variant.voice)
+            except Exception as e:
+                entries[i]['error'] = f"Failed to load voice: {e}"
+                continue
+            if not engine.validate_parameters(variant.speech_rate, variant.pitch):
+                entries[i]['error'] = "Parameters out of range"
+                continue
+
+            output_path = self.output_dir / variant.filename
+            if cache is not None:
+                keys[i] = render_key(embeddings[variant.voice], text, variant.speech_rate,
+                                     variant.pitch, variant.tone, engine.version)
+                if cache.export_wav(keys[i], sample_rate, bit_depth, output_path):
+                    entries[i].update(success=True, cached=True)
+                    continue
+            pending.append(i)
+
+        # Keep variants that differ only in rate together so they share a render
+        pending.sort(key=lambda i: (variants[i].voice, variants[i].pitch, variants[i].tone))
+        done = len(variants) - len(pending)
+        report_progress(progress_callback, "synthesize", done, len(variants))
+        batch_size = max(app.config.model.max_batch_size, 1)
+        for offset in range(0, len(pending), batch_size):
+            batch = pending[offset:offset + batch_size]
+            rendered = engine.synthesize_variants(
+                text,
+                [embeddings[variants[i].voice] for i in batch],
+                [variants[i].speech_rate for i in batch],
+                [variants[i].pitch for i in batch],
+                [variants[i].tone for i in batch],
+            )
+            for i, audio_data in zip(batch, rendered):
+                output_path = self.output_dir / variants[i].filename
+                if app.audio_handler.export_wav(audio_data, str(output_path), bit_depth):
+                    entries[i].update(success=True, cached=False,
+                                      duration=len(audio_data[0]) / audio_data[1])
+                    if i in keys:
+                        cache.put_audio(keys[i], audio_data)
+                        cache.put_wav(keys[i], sample_rate, bit_depth, output_path)
+                else:
+                    entries[i]['error'] = "Export failed"
+            done += len(batch)
+            report_progress(progress_callback, "synthesize", done, len(variants))
+
+        wall_time = time.perf_counter() - start
+        manifest_path = self.output_dir / "manifest.json"
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'text': text,
+                'engine_version': engine.version,
+                'sample_rate': sample_rate,
+                'bit_depth': bit_depth,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'variants': entries,
+            }, f, indent=2)
+        report_progress(progress_callback, "export", 1, 1)
+
+        succeeded = sum(entry['success'] for entry in entries)
+        summary = {
+            'output_dir': str(self.output_dir),
+            'manifest': str(manifest_path),
+            'rendered': sum(entry.get('cached') is False for entry in entries),
+            'cached': sum(entry.get('cached') is True for entry in entries),
+            'failed': len(entries) - succeeded,
+            'wall_time': wall_time,
+        }
+        logger.info(f"Rendered {len(entries)} variants to {self.output_dir}: {summary}")
+        return summary
@@ -1,5 +1,15 @@
 from .audio_handler import AudioHandler
 from .voice_embedder import VoiceEmbedder
 from .synthesis_engine import SynthesisEngine
+from .batch_scheduler import BatchScheduler
+from .voice_cache import VoiceProfileCache
+from .voice_store import VoiceStore
+from .voice_search import VoiceIndex
+from .render_cache import RenderCache
+from .quality_analyzer import QualityAnalyzer
+from .wav_writer import WavWriter
+from .resampler import StreamingResampler
+from .prosody import ProsodyProcessor
+from .loudness import LoudnessMeter, TruePeakLimiter
 
-__all__ = ["AudioHandler", "VoiceEmbedder", "SynthesisEngine"]
+__all__ = ["AudioHandler", "VoiceEmbedder", "SynthesisEngine", "BatchScheduler", "VoiceProfileCache", "VoiceStore", "VoiceIndex", "RenderCache", "QualityAnalyzer", "WavWriter", "StreamingResampler", "ProsodyProcessor", "LoudnessMeter", "TruePeakLimiter"]
@@ -1,10 +1,16 @@
+import importlib
 import logging
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, Tuple
-import librosa
-import scipy.io.wavfile as wavfile
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
 from ..core.config import Config
+from ..utils.metrics import metrics
+from .audio_stats import StreamingAudioStats
+from .quality_analyzer import QualityAnalyzer, QualityReport
+from .loudness import normalize_waveform
+from .encoders import encode_waveform, format_for_path
+from .resampler import resample
+from .wav_writer import WavWriter
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,12 @@ class AudioHandler:
     def __init__(self, config: Config):
         self.config = config
         self.audio_config = config.audio
+        self.quality_analyzer = QualityAnalyzer()
+    
+    def warm_up(self):
+        """Import the audio decoding stack ahead of first use"""
+        for module in ("librosa", "soundfile"):
+            importlib.import_module(module)
     
     def load_audio(self, audio_path: str) -> Tuple[np.ndarray, int]:
         """Load audio file and return waveform and sample rate"""
@@ -23,36 +35,125 @@ class AudioHandler:
             if not audio_path.exists():
                 raise FileNotFoundError(f"Audio file not found: {audio_path}")
             
-            # Load audio using librosa
-            waveform, sr = librosa.load(str(audio_path), sr=None)
+            # Load audio using librosa (imported lazily; it is slow to import)
+            import librosa
+            with metrics.span("load") as span:
+                waveform, sr = librosa.load(str(audio_path), sr=None)
+                span.audio_seconds = len(waveform) / sr
             logger.info(f"Loaded audio: {audio_path}, sr={sr}, duration={len(waveform)/sr:.2f}s")
             return waveform, sr
         except Exception as e:
             logger.error(f"Failed to load audio: {e}")
             raise
     
+    def probe_audio(self, audio_path: str) -> Dict[str, Any]:
+        """Read sample rate, channel count and duration from the file header without decoding"""
+        audio_path = Path(audio_path)
+        if not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        
+        import soundfile as sf
+        try:
+            info = sf.info(str(audio_path))
+            return {'sample_rate': info.samplerate, 'channels': info.channels,
+                    'duration': info.duration, 'frames': info.frames, 'streamable': True}
+        except Exception:
+            # Formats libsndfile can't read (e.g. m4a) go through audioread
+            import audioread
+            with audioread.audio_open(str(audio_path)) as f:
+                return {'sample_rate': f.samplerate, 'channels': f.channels,
+                        'duration': f.duration, 'frames': int(f.duration * f.samplerate),
+                        'streamable': False}
+    
+    def load_and_validate(self, audio_path: str,
+                          block_size: int = 65536) -> Tuple[Tuple[np.ndarray, int], Dict[str, Any]]:
+        """
+        Load and validate a reference clip in one streaming pass.
+        
+        The duration is checked from the header first, so over-long files are
+        rejected without decoding. Otherwise the file is decoded block by
+        block, RMS, noise floor and peak are accumulated as it goes, and only
+        the first ``max_duration`` seconds are kept.
+        
+        Returns:
+            Tuple of ((waveform, sample_rate), validation result as returned
+            by validate_audio)
+        """
+        try:
+            with metrics.span("load") as span:
+                audio_path = Path(audio_path)
+                probe = self.probe_audio(audio_path)
+                sr = probe['sample_rate']
+            
+                if probe['duration'] > self.audio_config.max_duration:
+                    logger.info(f"Rejected from header: {audio_path}, duration={probe['duration']:.2f}s")
+                    empty = np.zeros(0, dtype=np.float32)
+                    span.audio_seconds = probe['duration']
+                    return (empty, sr), self._validation_result(probe['duration'], float('nan'), 0.0, sr)
+            
+                cap = int(self.audio_config.max_duration * sr)
+                stats = StreamingAudioStats()
+                if probe['streamable']:
+                    waveform = np.empty(min(probe['frames'], cap), dtype=np.float32)
+                    filled = 0
+                    import soundfile as sf
+                    for block in sf.blocks(str(audio_path), blocksize=block_size, dtype='float32', always_2d=True):
+                        mono = block[:, 0] if block.shape[1] == 1 else block.mean(axis=1)
+                        stats.update(mono)
+                        take = min(len(mono), len(waveform) - filled)
+                        waveform[filled:filled + take] = mono[:take]
+                        filled += take
+                    waveform = waveform[:filled]
+                else:
+                    import librosa
+                    waveform, sr = librosa.load(str(audio_path), sr=None, duration=self.audio_config.max_duration)
+                    for start in range(0, len(waveform), block_size):
+                        stats.update(waveform[start:start + block_size])
+            
+                duration = max(stats.samples / sr, len(waveform) / sr)
+                span.audio_seconds = duration
+                logger.info(f"Loaded audio: {audio_path}, sr={sr}, duration={duration:.2f}s")
+                return (waveform, sr), self._validation_result(duration, stats.snr_db, stats.peak, sr)
+        except Exception as e:
+            logger.error(f"Failed to load audio: {e}")
+            raise
+    
     def validate_audio(self, audio_data: Tuple[np.ndarray, int]) -> Dict[str, Any]:
         """Validate audio quality"""
         waveform, sr = audio_data
+        
+        with metrics.span("validate", len(waveform) / sr):
+            # Check signal-to-noise ratio (simplified)
+            rms = np.sqrt(np.mean(waveform**2))
+            noise_floor = np.percentile(np.abs(waveform), 5)
+            snr_db = 20 * np.log10(rms / (noise_floor + 1e-10))
+            peak = np.max(np.abs(waveform))
+        
+        return self._validation_result(len(waveform) / sr, snr_db, peak, sr)
+    
+    def analyze_quality(self, audio_data: Tuple[np.ndarray, int]) -> QualityReport:
+        """Frame-level quality report with voice activity and speech/non-speech SNR"""
+        with metrics.span("validate", len(audio_data[0]) / audio_data[1]):
+            report = self.quality_analyzer.analyze(audio_data)
+        logger.info(f"Quality analysis: frames={report.n_frames}, speech_ratio={report.speech_ratio:.2f}, "
+                    f"speech_snr={report.snr_db:.1f}dB")
+        return report
+    
+    def _validation_result(self, duration: float, snr_db: float, peak: float, sr: int) -> Dict[str, Any]:
+        """Turn measured statistics into a validation result"""
         issues = []
         
         # Check duration
-        duration = len(waveform) / sr
         if duration < self.audio_config.min_duration:
             issues.append(f"Duration too short: {duration:.1f}s (min {self.audio_config.min_duration}s)")
         if duration > self.audio_config.max_duration:
             issues.append(f"Duration too long: {duration:.1f}s (max {self.audio_config.max_duration}s)")
         
-        # Check signal-to-noise ratio (simplified)
-        rms = np.sqrt(np.mean(waveform**2))
-        noise_floor = np.percentile(np.abs(waveform), 5)
-        snr_db = 20 * np.log10(rms / (noise_floor + 1e-10))
-        
         if snr_db < self.audio_config.min_snr:
             issues.append(f"SNR too low: {snr_db:.1f}dB (min {self.audio_config.min_snr}dB)")
         
         # Check for clipping
-        if np.max(np.abs(waveform)) > 0.95:
+        if peak > 0.95:
             issues.append("Audio appears to be clipped")
         
         return {
@@ -63,59 +164,73 @@ class AudioHandler:
             'sample_rate': sr
         }
     
-    def export_wav(self, audio_data: Tuple[np.ndarray, int], output_path: str,
-                  bit_depth: int = 16, channels: int = 1):
-        """Export audio as WAV file"""
+    def export_wav(self, audio_data: Tuple[np.ndarray, int], output_path: Union[str, Path, BinaryIO],
+                  bit_depth: int = 16, channels: int = 1, dither: bool = False,
+                  chunk_frames: int = 65536):
+        """
+        Export audio as WAV to a file path or any writable binary stream.
+        
+        Peak normalization to 0.95 is folded into the writer's gain, and
+        samples are quantized chunk by chunk into reusable buffers, so no
+        full-length normalized or integer copy of the waveform is made.
+        """
+        return self.export_audio(audio_data, output_path, "wav", bit_depth, channels, dither, chunk_frames)
+    
+    def export_audio(self, audio_data: Tuple[np.ndarray, int], output_path: Union[str, Path, BinaryIO],
+                     fmt: Optional[str] = None, bit_depth: int = 16, channels: int = 1,
+                     dither: bool = False, chunk_frames: int = 65536,
+                     compression_level: Optional[float] = None, peak_normalize: bool = True) -> bool:
+        """
+        Export audio as WAV, FLAC or Ogg/Opus, encoding chunk by chunk.
+        
+        The format defaults to the one implied by the file extension (WAV
+        for streams). Audio is resampled to config.audio.sample_rate, except
+        that Opus is written at 48 kHz when the codec can't take that rate.
+        It is peak-normalized to 0.95 unless ``peak_normalize`` is False.
+        """
         try:
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
             waveform, sr = audio_data
+            if fmt is None:
+                fmt = format_for_path(output_path) if isinstance(output_path, (str, Path)) else "wav"
+            if compression_level is None:
+                compression_level = self.compression_level(fmt)
             
-            # Resample if needed
-            if sr != self.audio_config.sample_rate:
-                waveform = librosa.resample(waveform, orig_sr=sr, target_sr=self.audio_config.sample_rate)
-                sr = self.audio_config.sample_rate
-            
-            # Normalize audio
-            max_val = np.max(np.abs(waveform))
-            if max_val > 0:
-                waveform = waveform / max_val * 0.95
-            
-            # Convert to appropriate bit depth
-            if bit_depth == 16:
-                waveform_int = np.int16(waveform * 32767)
-            elif bit_depth == 24:
-                waveform_int = np.int32(waveform * 8388607)
-            else:
-                waveform_int = np.int16(waveform * 32767)
-            
-            # Write WAV file
-            wavfile.write(str(output_path), sr, waveform_int)
-            logger.info(f"Exported WAV: {output_path}")
+            with metrics.span("export", len(waveform) / sr):
+                encode_waveform(waveform, sr, output_path, fmt, self.audio_config.sample_rate, bit_depth,
+                                channels, dither, compression_level, self.audio_config.resample_quality,
+                                chunk_frames, peak_normalize)
+            logger.info(f"Exported {fmt.upper()}: {output_path}")
             return True
         except Exception as e:
-            logger.error(f"Failed to export WAV: {e}")
+            logger.error(f"Failed to export audio: {e}")
             return False
     
+    def compression_level(self, fmt: str) -> Optional[float]:
+        """Configured compression level for an export format (None for WAV)"""
+        return {"flac": self.audio_config.flac_compression_level,
+                "opus": self.audio_config.opus_compression_level}.get(fmt)
+    
+    def open_wav_writer(self, output_path: Union[str, Path, BinaryIO], sample_rate: Optional[int] = None,
+                        bit_depth: Optional[int] = None, gain: float = 1.0,
+                        dither: bool = False) -> WavWriter:
+        """Open an incremental WAV writer for streaming chunks; close it to finalize the header"""
+        return WavWriter(output_path, sample_rate or self.audio_config.sample_rate,
+                         bit_depth or self.audio_config.bit_depth, self.audio_config.channels,
+                         gain, dither)
+    
     def resample_audio(self, audio_data: Tuple[np.ndarray, int], target_sr: int) -> Tuple[np.ndarray, int]:
         """Resample audio to target sample rate"""
         waveform, sr = audio_data
         if sr == target_sr:
             return audio_data
         
-        resampled = librosa.resample(waveform, orig_sr=sr, target_sr=target_sr)
+        with metrics.span("resample", waveform.shape[-1] / sr):
+            resampled = resample(waveform, sr, target_sr, self.audio_config.resample_quality)
         return resampled, target_sr
     
-    def normalize_loudness(self, waveform: np.ndarray, target_lufs: float = -16.0) -> np.ndarray:
-        """Normalize audio loudness using LUFS"""
-        # Simplified loudness normalization
-        rms = np.sqrt(np.mean(waveform**2))
-        target_rms = 10 ** (target_lufs / 20)
-        
-        if rms > 0:
-            waveform = waveform * (target_rms / rms)
-        
-        # Soft clipping to prevent distortion
-        waveform = np.tanh(waveform)
-        return waveform
+    def normalize_loudness(self, waveform: np.ndarray, target_lufs: float = -16.0,
+                           sample_rate: Optional[int] = None, true_peak_db: float = -1.0) -> np.ndarray:
+        """Normalize to a BS.1770 integrated loudness, true-peak limited to true_peak_db"""
+        sample_rate = sample_rate or self.audio_config.sample_rate
+        with metrics.span("normalize", waveform.shape[-1] / sample_rate):
+            return normalize_waveform(waveform, sample_rate, target_lufs, true_peak_db)
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class AmplitudeSketch:
+    """
+    Streaming quantile sketch of absolute sample amplitude.
+
+    Amplitudes are counted in log-spaced bins spanning ``min_amplitude`` to
+    1.0 (plus underflow and overflow bins), so memory is constant and any
+    quantile is accurate to within one bin's relative width (~0.8% with the
+    defaults) regardless of how many samples are added.
+    """
+
+    def __init__(self, bins: int = 2048, min_amplitude: float = 1e-7):
+        self.bins = bins
+        self.log_min = np.log10(min_amplitude)
+        self.scale = bins / -self.log_min
+        self.counts = np.zeros(bins + 2, dtype=np.int64)  # [underflow, bins..., overflow]
+
+    def update(self, magnitude: np.ndarray):
+        """Add a block of absolute amplitudes"""
+        with np.errstate(divide='ignore'):
+            idx = (np.log10(magnitude) - self.log_min) * self.scale
+        idx = np.clip(np.floor(idx), -1, self.bins).astype(np.int64) + 1
+        self.counts += np.bincount(idx, minlength=self.bins + 2)
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0..1) of the amplitudes seen so far"""
+        total = self.counts.sum()
+        if total == 0:
+            return 0.0
+        b = int(np.searchsorted(np.cumsum(self.counts), q * total, side='left'))
+        if b == 0:
+            return 0.0
+        if b == self.bins + 1:
+            return 1.0
+        # Geometric centre of the bin
+        return float(10 ** (self.log_min + (b - 0.5) / self.scale))
+
+
+class StreamingAudioStats:
+    """Single-pass RMS, noise-floor and peak statistics over audio blocks"""
+
+    def __init__(self, noise_quantile: float = 0.05):
+        self.noise_quantile = noise_quantile
+        self.samples = 0
+        self.sum_squares = 0.0
+        self.peak = 0.0
+        self.sketch = AmplitudeSketch()
+
+    def update(self, block: np.ndarray):
+        """Add a block of mono samples"""
+        if len(block) == 0:
+            return
+        magnitude = np.abs(block)
+        self.samples += len(block)
+        self.sum_squares += float(np.dot(block, block))
+        self.peak = max(self.peak, float(magnitude.max()))
+        self.sketch.update(magnitude)
+
+    @property
+    def rms(self) -> float:
+        return float(np.sqrt(self.sum_squares / self.samples)) if self.samples else 0.0
+
+    @property
+    def noise_floor(self) -> float:
+        return self.sketch.quantile(self.noise_quantile)
+
+    @property
+    def snr_db(self) -> float:
+        """SNR estimate with the same definition as AudioHandler.validate_audio"""
+        return float(20 * np.log10(self.rms / (self.noise_floor + 1e-10) + 1e-20))
@@ -0,0 +1,136 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Longest request in a group may be at most this many times the shortest,
+# which bounds the padding wasted in a batched forward pass
+MAX_PADDING_RATIO = 2.0
+
+
+@dataclass
+class SynthesisRequest:
+    """A single queued synthesis request"""
+    text: str
+    voice_embedding: np.ndarray
+    speech_rate: float = 1.0
+    pitch: float = 0.0
+    tone: str = "neutral"
+    future: Future = field(default_factory=Future)
+
+
+class BatchScheduler:
+    """Collect concurrent synthesis requests and run them as batched forwards"""
+
+    def __init__(self, synthesis_engine, config):
+        self.synthesis_engine = synthesis_engine
+        self.max_batch_size = config.model.max_batch_size
+        self.max_wait = config.model.batch_max_wait_ms / 1000
+
+        self._queue: "queue.Queue[Optional[SynthesisRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, text: str, voice_embedding: np.ndarray, speech_rate: float = 1.0,
+               pitch: float = 0.0, tone: str = "neutral") -> "Future[Tuple[np.ndarray, int]]":
+        """Queue a request and return a future resolving to (waveform, sample_rate)"""
+        request = SynthesisRequest(text, voice_embedding, speech_rate, pitch, tone)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchScheduler is shut down")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+                self._thread.start()
+            self._queue.put(request)
+        return request.future
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting requests; queued requests are still processed"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            self._queue.put(None)
+        if wait and thread is not None:
+            thread.join()
+
+    def _run(self):
+        """Worker loop: gather a batch within the wait window, then dispatch it"""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        request = self._queue.get(timeout=remaining)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            for group in self._group_by_length(batch):
+                self._dispatch(group)
+
+        # Drain anything submitted before shutdown
+        leftover = []
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                leftover.append(request)
+        for start in range(0, len(leftover), self.max_batch_size):
+            for group in self._group_by_length(leftover[start:start + self.max_batch_size]):
+                self._dispatch(group)
+
+    def _group_by_length(self, batch: List[SynthesisRequest]) -> List[List[SynthesisRequest]]:
+        """Sort requests by text length and split where padding would exceed MAX_PADDING_RATIO"""
+        ordered = sorted(batch, key=lambda request: len(request.text))
+        groups: List[List[SynthesisRequest]] = []
+        for request in ordered:
+            if groups and len(request.text) <= MAX_PADDING_RATIO * max(len(groups[-1][0].text), 1):
+                groups[-1].append(request)
+            else:
+                groups.append([request])
+        return groups
+
+    def _dispatch(self, group: List[SynthesisRequest]):
+        """Run one batched forward and scatter results to the request futures"""
+        group = [request for request in group if request.future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        try:
+            results = self.synthesis_engine.synthesize_batch(
+                [request.text for request in group],
+                [request.voice_embedding for request in group],
+                [request.speech_rate for request in group],
+                [request.pitch for request in group],
+                [request.tone for request in group],
+            )
+        except Exception as e:
+            logger.error(f"Batched synthesis failed: {e}")
+            for request in group:
+                request.future.set_exception(e)
+            return
+
+        for request, result in zip(group, results):
+            request.future.set_result(result)
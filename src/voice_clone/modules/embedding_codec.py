@@ -0,0 +1,97 @@
+import logging
+from pathlib import Path
+from typing import Any, Mapping, Optional, Tuple, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# On-disk element type per storage option; int8 rows carry a float32 scale each
+STORAGE_DTYPES = {"fp32": np.float32, "fp16": np.float16, "int8": np.int8}
+PROFILE_FORMAT = "2.0"
+_INT8_MAX = 127
+_FP16_MAX = float(np.finfo(np.float16).max)
+
+
+def storage_dtype(name: str) -> np.dtype:
+    """numpy dtype for a storage option name"""
+    try:
+        return np.dtype(STORAGE_DTYPES[name])
+    except KeyError:
+        raise ValueError(f"Unknown embedding storage dtype: {name} "
+                         f"(expected one of {', '.join(STORAGE_DTYPES)})") from None
+
+
+def quantize_embeddings(embeddings: np.ndarray, dtype: str = "fp32") -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Encode one embedding or an (n, dim) matrix for storage.
+
+    int8 uses a symmetric per-vector scale (max |x| / 127), so each row keeps
+    its full 8-bit range whatever its norm.
+
+    Returns:
+        Tuple of (stored values, float32 scales or None); scales has one
+        entry per row (a 0-d array for a single vector) and only for int8
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    target = storage_dtype(dtype)
+    if dtype == "fp32":
+        return embeddings, None
+    if dtype == "fp16":
+        return np.clip(embeddings, -_FP16_MAX, _FP16_MAX).astype(target), None
+
+    scales = np.abs(embeddings).max(axis=-1) / _INT8_MAX
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    quantized = np.rint(embeddings / scales[..., None])
+    return np.clip(quantized, -_INT8_MAX, _INT8_MAX).astype(target), scales
+
+
+def dequantize_embeddings(values: np.ndarray, scales: Optional[np.ndarray] = None,
+                          out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Decode stored values back to float32 in one vectorized pass.
+
+    Args:
+        values: Stored vector or (n, dim) matrix of any storage dtype
+        scales: Per-row scales for int8 data
+        out: Optional preallocated float32 array of the same shape
+    """
+    if out is None:
+        out = np.empty(values.shape, dtype=np.float32)
+    np.copyto(out, values, casting='unsafe')
+    if scales is not None:
+        out *= np.asarray(scales, dtype=np.float32)[..., None]
+    return out
+
+
+def cosine_similarity_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two equally shaped (n, dim) matrices"""
+    a = np.atleast_2d(np.asarray(a, dtype=np.float64))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float64))
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    return np.einsum('ij,ij->i', a, b) / np.maximum(norms, 1e-30)
+
+
+def save_profile(output_path: Union[str, Path], embedding: np.ndarray, voice_name: str,
+                 dtype: str = "fp32"):
+    """Write a versioned .npz voice profile with the embedding in the given storage dtype"""
+    values, scale = quantize_embeddings(np.asarray(embedding).reshape(-1), dtype)
+    arrays = {'embedding': values, 'voice_name': voice_name, 'version': PROFILE_FORMAT, 'dtype': dtype}
+    if scale is not None:
+        arrays['scale'] = scale
+    np.savez(output_path, **arrays)
+
+
+def read_profile_embedding(data: Mapping[str, Any]) -> np.ndarray:
+    """
+    Float32 embedding from an opened profile, whatever its format.
+
+    Version 1 profiles hold a float32 ``embedding``; version 2 adds a
+    ``dtype`` entry and, for int8, the per-vector ``scale``.
+    """
+    values = data['embedding']
+    if 'dtype' not in data:
+        return np.asarray(values, dtype=np.float32)
+    dtype = str(data['dtype'])
+    if values.dtype != storage_dtype(dtype):
+        raise ValueError(f"Profile declares {dtype} but stores {values.dtype}")
+    return dequantize_embeddings(values, data['scale'] if dtype == "int8" else None)
@@ -0,0 +1,189 @@
+import logging
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+import numpy as np
+from .resampler import StreamingResampler
+from .wav_writer import SAMPLE_WIDTHS, WavWriter
+
+logger = logging.getLogger(__name__)
+
+# File extension of each export format
+EXPORT_FORMATS = {"wav": ".wav", "flac": ".flac", "opus": ".opus"}
+
+# libsndfile's Opus encoder only accepts these rates; anything else is resampled to 48 kHz
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+_FLAC_SUBTYPES = {16: 'PCM_16', 24: 'PCM_24'}
+
+
+def export_format(name: str) -> str:
+    """Validate an export format name"""
+    name = name.lower().lstrip('.')
+    if name not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {name} (expected one of {', '.join(EXPORT_FORMATS)})")
+    return name
+
+
+def format_for_path(path: Union[str, Path]) -> str:
+    """Export format implied by a file extension (WAV for unknown ones)"""
+    suffix = Path(path).suffix.lower()
+    for name, extension in EXPORT_FORMATS.items():
+        if suffix == extension:
+            return name
+    return "wav"
+
+
+def encoded_sample_rate(fmt: str, sample_rate: int) -> int:
+    """Sample rate a format will actually be written at"""
+    if fmt == "opus" and sample_rate not in OPUS_SAMPLE_RATES:
+        return 48000
+    return sample_rate
+
+
+class SoundFileEncoder:
+    """
+    Incremental FLAC or Ogg/Opus encoder through libsndfile.
+
+    Same interface as WavWriter: float chunks go in through ``write`` and
+    are scaled by ``gain`` in a reusable buffer, so a whole export never
+    holds more than one chunk beyond the source waveform. Opus input at
+    a rate the codec can't take is resampled to 48 kHz on the way in.
+    """
+
+    def __init__(self, target: Union[str, Path, BinaryIO], sample_rate: int, fmt: str = "flac",
+                 bit_depth: int = 16, channels: int = 1, gain: float = 1.0,
+                 compression_level: Optional[float] = None, resample_quality: str = "default"):
+        import soundfile as sf  # deferred; only needed for compressed exports
+
+        fmt = export_format(fmt)
+        if fmt == "wav":
+            raise ValueError("Use WavWriter for WAV output")
+        if isinstance(target, (str, Path)):
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            target = str(target)
+
+        self.format = fmt
+        self.channels = channels
+        self.gain = gain
+        self.input_sample_rate = sample_rate
+        self.sample_rate = encoded_sample_rate(fmt, sample_rate)
+        self.frames_written = 0
+        self.closed = False
+        self._resampler = (StreamingResampler(sample_rate, self.sample_rate, resample_quality)
+                           if self.sample_rate != sample_rate else None)
+        self._scratch = np.empty(0, dtype=np.float32)
+        if fmt == "flac":
+            sf_format, subtype = 'FLAC', _FLAC_SUBTYPES.get(bit_depth, 'PCM_16')
+        else:
+            sf_format, subtype = 'OGG', 'OPUS'
+        self._file = sf.SoundFile(target, 'w', self.sample_rate, channels, subtype=subtype,
+                                  format=sf_format, compression_level=compression_level)
+
+    def __enter__(self) -> "SoundFileEncoder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, chunk: np.ndarray):
+        """Encode a (frames,) or (frames, channels) float chunk"""
+        if self.closed:
+            raise ValueError("SoundFileEncoder is closed")
+        if self._resampler is not None:
+            # The resampler works on (channels, samples); frames stay (samples, channels) here
+            chunk = self._resampler.process(chunk if chunk.ndim == 1 else chunk.T)
+            chunk = chunk if chunk.ndim == 1 else chunk.T
+        self._encode(chunk)
+
+    def close(self):
+        """Flush the resampler and finish the stream"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._resampler is not None:
+                tail = self._resampler.flush()
+                self._encode(tail if tail.ndim == 1 else tail.T)
+        finally:
+            self._file.close()
+
+    def _encode(self, chunk: np.ndarray):
+        frames = chunk.shape[0]
+        if frames == 0:
+            return
+        n = frames * self.channels
+        if len(self._scratch) < n:
+            self._scratch = np.empty(n, dtype=np.float32)
+        scratch = self._scratch[:n].reshape(frames, self.channels)
+        np.multiply(chunk.reshape(frames, -1), self.gain, out=scratch, casting='unsafe')
+        # libsndfile wraps rather than clips out-of-range floats when converting to PCM
+        np.clip(scratch, -1.0, 1.0, out=scratch)
+        self._file.write(scratch)
+        self.frames_written += frames
+
+
+def open_encoder(target: Union[str, Path, BinaryIO], fmt: str, sample_rate: int, bit_depth: int = 16,
+                 channels: int = 1, gain: float = 1.0, dither: bool = False,
+                 total_frames: Optional[int] = None, compression_level: Optional[float] = None,
+                 resample_quality: str = "default"):
+    """
+    Open a chunk-by-chunk encoder for any export format.
+
+    Returns a WavWriter for "wav" (honouring ``dither`` and ``total_frames``)
+    or a SoundFileEncoder for "flac" and "opus" (honouring
+    ``compression_level``, 0 to 1); all of them take ``write(chunk)`` and
+    ``close()`` and work as context managers.
+    """
+    fmt = export_format(fmt)
+    if fmt == "wav":
+        if bit_depth not in SAMPLE_WIDTHS:
+            bit_depth = 16
+        return WavWriter(target, sample_rate, bit_depth, channels, gain, dither, total_frames=total_frames)
+    return SoundFileEncoder(target, sample_rate, fmt, bit_depth, channels, gain, compression_level,
+                            resample_quality)
+
+
+def export_gain(waveform: np.ndarray, peak_normalize: bool = True) -> float:
+    """Gain encode_waveform applies: 0.95 / peak when peak-normalizing, else 1.0"""
+    if not peak_normalize:
+        return 1.0
+    # Peak without materializing np.abs(waveform)
+    max_val = max(float(waveform.max()), -float(waveform.min())) if len(waveform) else 0.0
+    return 0.95 / max_val if max_val > 0 else 1.0
+
+
+def encode_waveform(waveform: np.ndarray, sample_rate: int, target: Union[str, Path, BinaryIO], fmt: str,
+                    output_rate: Optional[int] = None, bit_depth: int = 16, channels: int = 1,
+                    dither: bool = False, compression_level: Optional[float] = None,
+                    resample_quality: str = "default", chunk_frames: int = 65536,
+                    peak_normalize: bool = True) -> int:
+    """
+    Peak-normalize a waveform to 0.95 and encode it chunk by chunk.
+
+    The normalization is folded into the encoder's gain and resampling to
+    ``output_rate`` happens per chunk on the way in, so no full-length
+    normalized, resampled or quantized copy is ever made. With
+    ``peak_normalize=False`` the samples are written at their own level,
+    e.g. audio already loudness-normalized and true-peak limited.
+
+    Returns:
+        Frames written at the encoded sample rate
+    """
+    # Resample once, straight to the rate the format is written at
+    output_rate = encoded_sample_rate(export_format(fmt), output_rate or sample_rate)
+    gain = export_gain(waveform, peak_normalize)
+
+    resampler = None
+    total_frames = len(waveform)
+    if sample_rate != output_rate:
+        resampler = StreamingResampler(sample_rate, output_rate, resample_quality)
+        total_frames = resampler.bank.output_length(len(waveform))
+
+    with open_encoder(target, fmt, output_rate, bit_depth, channels, gain, dither, total_frames,
+                      compression_level, resample_quality) as encoder:
+        for start in range(0, len(waveform), chunk_frames):
+            chunk = waveform[start:start + chunk_frames]
+            encoder.write(resampler.process(chunk) if resampler else chunk)
+        if resampler:
+            encoder.write(resampler.flush())
+    return encoder.frames_written
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from .embedding_codec import dequantize_embeddings, quantize_embeddings
+
+logger = logging.getLogger(__name__)
+
+ENROLLMENT_FORMAT = 1
+
+
+def split_segments(waveform: np.ndarray, segment_samples: int) -> List[np.ndarray]:
+    """
+    Split a waveform into fixed-length segments (views, no copies).
+
+    A trailing remainder of at least half a segment becomes its own
+    shorter segment; a smaller one is dropped unless it is all there is.
+    """
+    if segment_samples <= 0:
+        raise ValueError(f"segment_samples must be positive: {segment_samples}")
+    full = len(waveform) // segment_samples
+    segments = list(waveform[:full * segment_samples].reshape(full, segment_samples)) if full else []
+    remainder = waveform[full * segment_samples:]
+    if len(remainder) and (len(remainder) * 2 >= segment_samples or not segments):
+        segments.append(remainder)
+    return segments
+
+
+def weighted_mean(embeddings: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Duration-weighted mean embedding of a clip's segments"""
+    weights = np.asarray(weights, dtype=np.float64)
+    return (weights @ np.asarray(embeddings, dtype=np.float64) / weights.sum()).astype(np.float32)
+
+
+def segment_weights(segments: List[np.ndarray], sr: int) -> np.ndarray:
+    """Segment durations in seconds"""
+    return np.array([len(segment) / sr for segment in segments], dtype=np.float32)
+
+
+class VoiceEnrollment:
+    """
+    Incremental enrollment state of one voice.
+
+    Keeps every reference segment's embedding, weighted by its duration,
+    plus running sums over them, so the voice embedding (the weighted
+    mean) can be updated as clips are added or removed in time
+    proportional to the change. ``rebuild`` recomputes the sums exactly
+    from the stored segment vectors; no audio is decoded again.
+    """
+
+    def __init__(self, dim: int = 512, dtype: str = "fp32"):
+        self.dim = dim
+        self.dtype = dtype  # storage dtype of the segment vectors on disk
+        self.segments = np.zeros((0, dim), dtype=np.float32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.segment_clips = np.zeros(0, dtype=np.int64)
+        self.clips: Dict[int, Dict[str, Any]] = {}
+        self.next_clip_id = 1
+        self.count = 0.0
+        self.sum = np.zeros(dim, dtype=np.float64)
+        self.sumsq = np.zeros(dim, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.clips)
+
+    @property
+    def embedding(self) -> np.ndarray:
+        """Duration-weighted mean of all segment embeddings"""
+        if self.count <= 0:
+            raise ValueError("Enrollment has no segments")
+        return (self.sum / self.count).astype(np.float32)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Per-dimension weighted variance of the segment embeddings"""
+        if self.count <= 0:
+            raise ValueError("Enrollment has no segments")
+        mean = self.sum / self.count
+        return np.maximum(self.sumsq / self.count - mean ** 2, 0.0).astype(np.float32)
+
+    def add_clip(self, embeddings: np.ndarray, weights: Optional[np.ndarray] = None,
+                 **info: Any) -> int:
+        """
+        Fold one clip's segment embeddings into the statistics.
+
+        Args:
+            embeddings: (segments, dim) embeddings of the clip
+            weights: Per-segment weight, normally duration in seconds (default 1)
+            **info: Extra metadata kept with the clip (e.g. source file)
+
+        Returns:
+            The new clip's id
+        """
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if embeddings.shape[1] != self.dim or len(embeddings) == 0:
+            raise ValueError(f"Expected (segments, {self.dim}) embeddings, got {embeddings.shape}")
+        weights = np.ones(len(embeddings), np.float32) if weights is None else np.asarray(weights, np.float32)
+        if weights.shape != (len(embeddings),) or np.any(weights <= 0):
+            raise ValueError("Need one positive weight per segment")
+
+        clip_id = self.next_clip_id
+        self.next_clip_id += 1
+        self.segments = np.concatenate([self.segments, embeddings])
+        self.weights = np.concatenate([self.weights, weights])
+        self.segment_clips = np.concatenate([self.segment_clips, np.full(len(embeddings), clip_id)])
+        self._accumulate(embeddings, weights, 1)
+        self.clips[clip_id] = dict(info, id=clip_id, segments=len(embeddings),
+                                   weight=float(weights.sum()), added=time.time())
+        return clip_id
+
+    def remove_clip(self, clip_id: int) -> bool:
+        """Subtract a clip's segments from the statistics and drop them"""
+        if clip_id not in self.clips:
+            return False
+        mask = self.segment_clips == clip_id
+        self._accumulate(self.segments[mask], self.weights[mask], -1)
+        keep = ~mask
+        self.segments, self.weights, self.segment_clips = \
+            self.segments[keep], self.weights[keep], self.segment_clips[keep]
+        del self.clips[clip_id]
+        if len(self.segments) == 0:
+            # Avoid carrying float residue from the subtraction into an empty state
+            self.count, self.sum[:], self.sumsq[:] = 0.0, 0.0, 0.0
+        return True
+
+    def rebuild(self):
+        """Recompute the statistics exactly from the stored segment vectors"""
+        self.count, self.sum[:], self.sumsq[:] = 0.0, 0.0, 0.0
+        self._accumulate(self.segments, self.weights, 1)
+
+    def _accumulate(self, embeddings: np.ndarray, weights: np.ndarray, sign: int):
+        w = weights.astype(np.float64)
+        x = embeddings.astype(np.float64)
+        self.count += sign * float(w.sum())
+        self.sum += sign * (w @ x)
+        self.sumsq += sign * (w @ (x * x))
+
+    def save(self, path: Union[str, Path]):
+        """Atomically write the state, with segment vectors in the storage dtype"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        values, scales = quantize_embeddings(self.segments, self.dtype)
+        arrays = {
+            'format': ENROLLMENT_FORMAT,
+            'dtype': self.dtype,
+            'segments': values,
+            'weights': self.weights,
+            'segment_clips': self.segment_clips,
+            'count': self.count,
+            'sum': self.sum,
+            'sumsq': self.sumsq,
+            'clips': json.dumps({'next_clip_id': self.next_clip_id, 'clips': list(self.clips.values())}),
+        }
+        if scales is not None:
+            arrays['segment_scales'] = scales
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "VoiceEnrollment":
+        """Read a state written by save()"""
+        with np.load(path) as data:
+            if int(data['format']) > ENROLLMENT_FORMAT:
+                raise ValueError(f"Unsupported enrollment format {int(data['format'])}: {path}")
+            segments = data['segments']
+            enrollment = cls(segments.shape[1], str(data['dtype']))
+            enrollment.segments = dequantize_embeddings(
+                segments, data['segment_scales'] if 'segment_scales' in data else None)
+            enrollment.weights = data['weights'].astype(np.float32)
+            enrollment.segment_clips = data['segment_clips'].astype(np.int64)
+            enrollment.count = float(data['count'])
+            enrollment.sum = data['sum'].astype(np.float64)
+            enrollment.sumsq = data['sumsq'].astype(np.float64)
+            clips = json.loads(str(data['clips']))
+        enrollment.next_clip_id = clips['next_clip_id']
+        enrollment.clips = {clip['id']: clip for clip in clips['clips']}
+        return enrollment
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Clip metadata in insertion order"""
+        return [dict(clip) for _, clip in sorted(self.clips.items())]
+
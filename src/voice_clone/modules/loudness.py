@@ -0,0 +1,383 @@
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+import numpy as np
+from ..utils.metrics import metrics
+from .encoders import EXPORT_FORMATS
+from .resampler import StreamingResampler
+
+logger = logging.getLogger(__name__)
+
+# BS.1770 gating: 400 ms blocks with 75% overlap, i.e. four 100 ms hops
+HOP_SECONDS = 0.1
+HOPS_PER_BLOCK = 4
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+# Channel weights for L, R, C, Ls, Rs
+_CHANNEL_WEIGHTS = (1.0, 1.0, 1.0, 1.41, 1.41)
+
+
+def k_weighting_sos(sample_rate: int) -> np.ndarray:
+    """
+    K-weighting pre-filter (high shelf + RLB high-pass) as second-order sections.
+
+    The analog prototypes are re-derived at ``sample_rate``, so the response
+    matches the BS.1770 48 kHz coefficients at any rate.
+    """
+    # Stage 1: high shelf modelling the acoustic effect of the head
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = np.tan(np.pi * f0 / sample_rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = [(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0,
+             1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+    # Stage 2: revised low-frequency B-curve high-pass
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = np.tan(np.pi * f0 / sample_rate)
+    a0 = 1 + k / q + k * k
+    highpass = [1.0, -2.0, 1.0, 1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+    return np.array([shelf, highpass])
+
+
+def _as_frames(chunk: np.ndarray, channels: int) -> np.ndarray:
+    """View a (frames,) or (frames, channels) chunk as 2-D"""
+    return np.asarray(chunk).reshape(-1, channels)
+
+
+class LoudnessMeter:
+    """
+    Incremental BS.1770 integrated loudness with absolute and relative gating.
+
+    Chunks are K-weighted with a stateful IIR filter and reduced to 100 ms
+    hop energies as they arrive; only those energies (10 values per second)
+    are kept, so a whole program can be measured without buffering it.
+    """
+
+    def __init__(self, sample_rate: int, channels: int = 1):
+        from scipy import signal  # deferred; scipy is slow to import
+        self._sosfilt = signal.sosfilt
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.hop_length = int(round(sample_rate * HOP_SECONDS))
+        self.sos = k_weighting_sos(sample_rate)
+        weights = _CHANNEL_WEIGHTS if channels <= len(_CHANNEL_WEIGHTS) else (1.0,) * channels
+        self._weights = np.asarray(weights[:channels])
+        self._zi = np.zeros((len(self.sos), 2, channels))
+        self._partial = np.zeros((0, channels))
+        self._hop_energy: List[np.ndarray] = []
+        self.samples = 0
+
+    def update(self, chunk: np.ndarray):
+        """Add the next chunk of (frames,) or (frames, channels) samples"""
+        frames = _as_frames(chunk, self.channels)
+        if len(frames) == 0:
+            return
+        self.samples += len(frames)
+        weighted, self._zi = self._sosfilt(self.sos, frames, axis=0, zi=self._zi)
+        if len(self._partial):
+            weighted = np.concatenate([self._partial, weighted])
+        n_hops = len(weighted) // self.hop_length
+        if n_hops:
+            hops = weighted[:n_hops * self.hop_length].reshape(n_hops, self.hop_length, self.channels)
+            energy = np.einsum('hsc,hsc->hc', hops, hops)
+            self._hop_energy.append(energy @ self._weights)
+        self._partial = weighted[n_hops * self.hop_length:]
+
+    def block_loudness(self) -> np.ndarray:
+        """Loudness of every complete 400 ms gating block, in LUFS"""
+        return -0.691 + 10 * np.log10(self._block_power() + 1e-20)
+
+    def integrated(self) -> float:
+        """Gated integrated loudness in LUFS; -inf if nothing passes the gates"""
+        power = self._block_power()
+        loudness = -0.691 + 10 * np.log10(power + 1e-20)
+        above_absolute = power[loudness > ABSOLUTE_GATE_LUFS]
+        if len(above_absolute) == 0:
+            return float('-inf')
+        relative_gate = -0.691 + 10 * np.log10(above_absolute.mean()) + RELATIVE_GATE_LU
+        gated = power[(loudness > ABSOLUTE_GATE_LUFS) & (loudness > relative_gate)]
+        return float(-0.691 + 10 * np.log10(gated.mean()))
+
+    def _block_power(self) -> np.ndarray:
+        if not self._hop_energy:
+            return np.zeros(0)
+        hops = np.concatenate(self._hop_energy)
+        if len(hops) < HOPS_PER_BLOCK:
+            return np.zeros(0)
+        windows = np.lib.stride_tricks.sliding_window_view(hops, HOPS_PER_BLOCK)
+        return windows.sum(axis=1) / (HOPS_PER_BLOCK * self.hop_length)
+
+
+class TruePeakMeter:
+    """Incremental true-peak level via 4x polyphase oversampling"""
+
+    OVERSAMPLING = 4
+
+    def __init__(self, channels: int = 1):
+        self.channels = channels
+        self._oversampler = StreamingResampler(1, self.OVERSAMPLING, 'fast')
+        self.peak = 0.0
+
+    def update(self, chunk: np.ndarray):
+        """Add the next chunk of (frames,) or (frames, channels) samples"""
+        frames = _as_frames(chunk, self.channels)
+        if len(frames):
+            self._track(self._oversampler.process(frames.T))
+
+    def finish(self) -> float:
+        """Flush the oversampling filter and return the true peak (linear)"""
+        self._track(self._oversampler.flush())
+        return self.peak
+
+    @property
+    def peak_db(self) -> float:
+        return float(20 * np.log10(self.peak)) if self.peak > 0 else float('-inf')
+
+    def _track(self, oversampled: np.ndarray):
+        if oversampled.size:
+            self.peak = max(self.peak, float(oversampled.max()), -float(oversampled.min()))
+
+
+class TruePeakLimiter:
+    """
+    Streaming look-ahead limiter that keeps the true peak under a ceiling.
+
+    Each sample's required gain comes from its 4x-oversampled peak. The gain
+    curve is the minimum over the look-ahead window, smoothed by a moving
+    average of the same length, so it ramps down before a peak and back up
+    after it without ever exceeding the required gain. Output lags the input
+    by the look-ahead; ``flush`` returns the tail.
+    """
+
+    def __init__(self, sample_rate: int, ceiling_db: float = -1.0, lookahead_ms: float = 5.0,
+                 channels: int = 1):
+        self.ceiling = 10 ** (ceiling_db / 20)
+        self.channels = channels
+        self.window = max(int(sample_rate * lookahead_ms / 1000), 1)
+        self._oversampler = StreamingResampler(1, TruePeakMeter.OVERSAMPLING, 'fast')
+        self._oversampled = np.zeros((channels, 0), dtype=np.float32)
+        self._audio = np.zeros((0, channels), dtype=np.float32)
+        # Required gain from (samples_out - window + 1) onwards; unity before the signal
+        self._required = np.ones(self.window - 1)
+        self.samples_out = 0
+        self.min_gain = 1.0
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Limit the next chunk; returns the samples that have cleared the look-ahead"""
+        frames = _as_frames(chunk, self.channels).astype(np.float32, copy=False)
+        self._audio = np.concatenate([self._audio, frames])
+        self._add_oversampled(self._oversampler.process(frames.T))
+        return self._emit(final=False)
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining limited samples"""
+        self._add_oversampled(self._oversampler.flush())
+        return self._emit(final=True)
+
+    def _add_oversampled(self, oversampled: np.ndarray):
+        """Turn complete groups of oversampled values into per-sample required gain"""
+        self._oversampled = np.concatenate([self._oversampled, oversampled], axis=-1)
+        n = self._oversampled.shape[-1] // TruePeakMeter.OVERSAMPLING
+        if n == 0:
+            return
+        groups = np.abs(self._oversampled[:, :n * TruePeakMeter.OVERSAMPLING])
+        peaks = groups.reshape(self.channels, n, TruePeakMeter.OVERSAMPLING).max(axis=(0, 2))
+        required = np.minimum(1.0, self.ceiling / np.maximum(peaks, 1e-12))
+        self._required = np.concatenate([self._required, required])
+        self._oversampled = self._oversampled[:, n * TruePeakMeter.OVERSAMPLING:]
+
+    def _emit(self, final: bool) -> np.ndarray:
+        from scipy.ndimage import minimum_filter1d
+        w = self.window
+        required = self._required
+        if final:
+            required = np.concatenate([required, np.ones(w - 1)])
+        # Outputs n need required gain over [n - w + 1, n + w - 1]
+        n_out = len(required) - 2 * (w - 1)
+        n_out = max(min(n_out, len(self._audio)), 0)
+        if n_out == 0:
+            out = self._audio[:0]
+            return out[:, 0] if self.channels == 1 else out
+
+        span = required[:n_out + 2 * (w - 1)]
+        minima = minimum_filter1d(span, w)[w // 2:w // 2 + n_out + w - 1]
+        sums = np.concatenate([[0.0], np.cumsum(minima)])
+        gain = ((sums[w:] - sums[:-w]) / w).astype(np.float32)
+        self.min_gain = min(self.min_gain, float(gain.min()))
+
+        out = self._audio[:n_out] * gain[:, None]
+        self._audio = self._audio[n_out:]
+        self._required = self._required[n_out:]
+        self.samples_out += n_out
+        return out[:, 0] if self.channels == 1 else out
+
+
+def loudness_gain(integrated_lufs: float, target_lufs: float) -> float:
+    """Linear gain taking a program from its integrated loudness to the target"""
+    if not np.isfinite(integrated_lufs):
+        return 1.0
+    return float(10 ** ((target_lufs - integrated_lufs) / 20))
+
+
+def normalize_stream(chunks: Iterable[np.ndarray], sample_rate: int, target_lufs: float = -16.0,
+                     true_peak_db: float = -1.0, channels: int = 1,
+                     spill_dir: Optional[Union[str, Path]] = None) -> Iterator[np.ndarray]:
+    """
+    Two-pass loudness normalization of a chunk stream in constant memory.
+
+    The first pass meters loudness and true peak while spilling float32
+    samples to a temporary file; the second replays the file with the gain
+    applied and, only if the gained true peak would exceed the ceiling,
+    through the limiter. Nothing is yielded until the input is exhausted.
+    """
+    meter = LoudnessMeter(sample_rate, channels)
+    peak_meter = TruePeakMeter(channels)
+    with tempfile.TemporaryFile(dir=spill_dir) as spill:
+        for chunk in chunks:
+            chunk = np.ascontiguousarray(chunk, dtype=np.float32)
+            meter.update(chunk)
+            peak_meter.update(chunk)
+            spill.write(memoryview(chunk).cast('B'))
+        integrated = meter.integrated()
+        gain = loudness_gain(integrated, target_lufs)
+        peak = peak_meter.finish()
+        limiter = None
+        if peak * gain > 10 ** (true_peak_db / 20):
+            limiter = TruePeakLimiter(sample_rate, true_peak_db, channels=channels)
+        logger.info(f"Loudness: {integrated:.1f} LUFS -> {target_lufs:.1f} LUFS "
+                    f"(gain {20 * np.log10(gain):+.1f} dB, limiter {'on' if limiter else 'off'})")
+
+        spill.seek(0)
+        block_bytes = 65536 * channels * 4
+        while True:
+            data = spill.read(block_bytes)
+            if not data:
+                break
+            block = np.frombuffer(data, dtype=np.float32) * np.float32(gain)
+            if channels > 1:
+                block = block.reshape(-1, channels)
+            yield limiter.process(block) if limiter else block
+        if limiter:
+            yield limiter.flush()
+
+
+def normalize_waveform(waveform: np.ndarray, sample_rate: int, target_lufs: float = -16.0,
+                       true_peak_db: float = -1.0) -> np.ndarray:
+    """In-memory loudness normalization of a mono or (frames, channels) waveform"""
+    channels = 1 if waveform.ndim == 1 else waveform.shape[1]
+    meter = LoudnessMeter(sample_rate, channels)
+    meter.update(waveform)
+    gain = loudness_gain(meter.integrated(), target_lufs)
+    peak_meter = TruePeakMeter(channels)
+    peak_meter.update(waveform)
+    gained = (waveform * gain).astype(np.float32)
+    if peak_meter.finish() * gain <= 10 ** (true_peak_db / 20):
+        return gained
+    limiter = TruePeakLimiter(sample_rate, true_peak_db, channels=channels)
+    return np.concatenate([limiter.process(gained), limiter.flush()])
+
+
+def normalize_file(input_path: Union[str, Path], output_path: Optional[Union[str, Path]] = None,
+                   target_lufs: float = -16.0, true_peak_db: float = -1.0,
+                   block_size: int = 65536) -> Dict[str, Any]:
+    """
+    Loudness-normalize an audio file block by block (in place if no output path).
+
+    The output keeps the input's container and sample format, so float
+    WAVs stay float and FLAC/Opus stay FLAC/Opus.
+
+    Returns a report with the measured loudness, applied gain and true peak.
+    """
+    import soundfile as sf
+
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else input_path
+    info = sf.info(str(input_path))
+    # libsndfile wraps rather than clips out-of-range floats when converting to PCM
+    clip = info.subtype not in ('FLOAT', 'DOUBLE')
+
+    with metrics.span("normalize", info.frames / info.samplerate):
+        meter = LoudnessMeter(info.samplerate, info.channels)
+        peak_meter = TruePeakMeter(info.channels)
+        for block in sf.blocks(str(input_path), blocksize=block_size, dtype='float32'):
+            meter.update(block)
+            peak_meter.update(block)
+        integrated = meter.integrated()
+        gain = loudness_gain(integrated, target_lufs)
+        peak = peak_meter.finish()
+        limiter = None
+        if peak * gain > 10 ** (true_peak_db / 20):
+            limiter = TruePeakLimiter(info.samplerate, true_peak_db, channels=info.channels)
+
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        with sf.SoundFile(str(tmp_path), 'w', info.samplerate, info.channels, subtype=info.subtype,
+                          format=info.format) as writer:
+            def write(block: np.ndarray):
+                writer.write(np.clip(block, -1.0, 1.0, out=block) if clip else block)
+
+            for block in sf.blocks(str(input_path), blocksize=block_size, dtype='float32'):
+                block *= np.float32(gain)
+                write(limiter.process(block) if limiter else block)
+            if limiter:
+                write(limiter.flush())
+        os.replace(tmp_path, output_path)
+
+    return {
+        'path': str(output_path),
+        'input_lufs': integrated,
+        'gain_db': float(20 * np.log10(gain)),
+        'input_true_peak_db': float(20 * np.log10(peak)) if peak > 0 else float('-inf'),
+        'limited': limiter is not None,
+        'limiter_min_gain_db': float(20 * np.log10(limiter.min_gain)) if limiter else 0.0,
+    }
+
+
+def _normalize_file_safe(input_path: str, output_path: Optional[str], target_lufs: float,
+                         true_peak_db: float) -> Dict[str, Any]:
+    """Pool task: normalize one file, reporting failure instead of raising"""
+    try:
+        report = normalize_file(input_path, output_path, target_lufs, true_peak_db)
+        report['success'] = True
+        return report
+    except Exception as e:
+        return {'path': input_path, 'success': False, 'error': str(e)}
+
+
+def normalize_folder(folder: Union[str, Path], target_lufs: float = -16.0, true_peak_db: float = -1.0,
+                     workers: Optional[int] = None, output_dir: Optional[Union[str, Path]] = None,
+                     pattern: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Loudness-normalize every audio file in a folder with a process pool.
+
+    Matches every export format (WAV, FLAC, Opus) unless a glob ``pattern``
+    is given. Files are rewritten in place unless ``output_dir`` is given.
+    Yields one report per file in completion order.
+    """
+    folder = Path(folder)
+    if pattern is None:
+        extensions = set(EXPORT_FORMATS.values())
+        paths = sorted(path for path in folder.iterdir() if path.is_file() and path.suffix.lower() in extensions)
+    else:
+        paths = sorted(folder.glob(pattern))
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    logger.info(f"Normalizing {len(paths)} files in {folder} to {target_lufs} LUFS")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_normalize_file_safe, str(path),
+                        str(Path(output_dir) / path.name) if output_dir is not None else None,
+                        target_lufs, true_peak_db)
+            for path in paths
+        ]
+        for future in as_completed(futures):
+            report = future.result()
+            if not report['success']:
+                logger.error(f"Failed to normalize {report['path']}: {report['error']}")
+            yield report
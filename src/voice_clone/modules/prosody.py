@@ -0,0 +1,314 @@
+import logging
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .resampler import StreamingResampler, filter_bank, stretch_ratio
+
+logger = logging.getLogger(__name__)
+
+# Sum of squared periodic Hann windows overlapping at a quarter-window hop
+_HANN_OLA_GAIN = 1.5
+
+# Input samples per row apply_prosody feeds the processor at a time
+_BLOCK_SAMPLES = 8192
+
+
+def pitch_ratio(semitones: float) -> float:
+    """Frequency ratio of a pitch offset in semitones"""
+    return 2.0 ** (semitones / 12.0)
+
+
+def percent_to_semitones(percent: float) -> float:
+    """Semitone offset of a pitch change given in percent of the frequency"""
+    return 12.0 * math.log2(1.0 + percent / 100.0)
+
+
+def default_fft_size(sample_rate: int) -> int:
+    """Power-of-two analysis window of about 23 ms (1024 samples at 44.1 kHz)"""
+    return 2 ** max(int(round(math.log2(sample_rate * 0.023))), 6)
+
+
+class PhaseVocoder:
+    """
+    Streaming phase-vocoder time stretch for one signal or a batch of them.
+
+    Synthesis frames are a fixed quarter-window apart and analysis frames
+    ``hop / stretch`` apart. Every frame a chunk makes available is
+    transformed in one batched FFT, the per-bin instantaneous frequencies
+    are accumulated into output phases with a cumulative sum over frames,
+    and the inverse frames are overlap-added four blocks at a time, so
+    there is no Python loop over frames. Between chunks only the previous
+    frame's phases, the unfinished overlap-add tail and the input the next
+    frames still need are kept.
+
+    Input is (samples,) or (clips, samples) with time on the last axis;
+    the outputs of ``process`` for every chunk plus ``flush`` have
+    ``round(samples * stretch)`` samples per clip.
+    """
+
+    def __init__(self, stretch: float, n_fft: int = 1024):
+        if stretch <= 0:
+            raise ValueError(f"Stretch factor must be positive: {stretch}")
+        if n_fft % 4:
+            raise ValueError(f"n_fft must be a multiple of 4: {n_fft}")
+        self.stretch = stretch
+        self.n_fft = n_fft
+        self.hop = n_fft // 4
+        self.analysis_hop = self.hop / stretch
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+        self._bins = np.arange(n_fft // 2 + 1)
+        # Nominal phase advance of each bin over one synthesis hop, reduced mod 2 pi: (pi / 2) * (bin mod 4)
+        self._synthesis_advance = (np.pi / 2 * (self._bins % 4)).astype(np.float32)
+        self._offsets = np.arange(n_fft)
+        self.reset()
+
+    def reset(self):
+        """Drop all state so the vocoder can start a new signal"""
+        self.samples_in = 0
+        self.samples_out = 0
+        self._buffer: Optional[np.ndarray] = None
+        self._buffer_start = 0  # input index of _buffer[..., 0]
+        self._frame = 0  # index of the next analysis frame
+        self._prev_phase: Optional[np.ndarray] = None
+        self._phase: Optional[np.ndarray] = None
+        self._tail: Optional[np.ndarray] = None  # overlap-add samples still receiving frames
+        self._discard = self.n_fft // 2  # output latency of the centred first frame
+        self._squeeze = False  # input was 1-D
+
+    def _frame_start(self, k: np.ndarray) -> np.ndarray:
+        """First input sample of analysis frames k (frames are centred on k * analysis_hop)"""
+        return np.rint(k * self.analysis_hop).astype(np.int64) - self.n_fft // 2
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Stretch the next chunk; returns every output sample that is now final"""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        self._squeeze = chunk.ndim == 1
+        self._append(np.atleast_2d(chunk))
+        self.samples_in += chunk.shape[-1]
+        return self._run(self.samples_in, self._squeeze)
+
+    def flush(self) -> np.ndarray:
+        """Zero-pad the end of the signal, return the remaining output and reset"""
+        if self._buffer is None:
+            return np.zeros(0, dtype=np.float32)
+        total = int(round(self.samples_in * self.stretch))
+        # Every frame overlapping the first `total` output samples, with zeros past the input
+        last = (total + self.n_fft // 2) // self.hop
+        needed = int(self._frame_start(np.array([last]))[0]) + self.n_fft
+        rows, squeeze, emitted = self._buffer.shape[0], self._squeeze, self.samples_out
+        if needed > self.samples_in:
+            self._append(np.zeros((rows, needed - self.samples_in), dtype=np.float32))
+        out = self._run(max(needed, self.samples_in), False)
+        tail = self._tail / _HANN_OLA_GAIN if self._tail is not None else np.zeros((rows, 0), dtype=np.float32)
+        out = np.concatenate([out, self._drop_latency(tail)], axis=-1)[:, :max(total - emitted, 0)]
+        self.reset()
+        return out[0] if squeeze else out
+
+    def output_length(self, n: int) -> int:
+        """Output samples for an n-sample input"""
+        return int(round(n * self.stretch))
+
+    def _append(self, chunk: np.ndarray):
+        if self._buffer is None:
+            # Zero history before the signal for the centred first frames
+            self._buffer = np.concatenate(
+                [np.zeros((chunk.shape[0], self.n_fft // 2), dtype=np.float32), chunk], axis=-1)
+            self._buffer_start = -self.n_fft // 2
+        else:
+            self._buffer = np.concatenate([self._buffer, chunk], axis=-1)
+
+    def _run(self, available: int, squeeze: bool) -> np.ndarray:
+        """Synthesize every frame whose input has fully arrived"""
+        rows = self._buffer.shape[0]
+        # Frames are monotonic in k, so count the ready ones with a bounded search
+        end = self._frame + int((available - self._frame_start(np.array([self._frame]))[0]) // self.analysis_hop) + 2
+        ks = np.arange(self._frame, max(end, self._frame))
+        ks = ks[self._frame_start(ks) + self.n_fft <= available]
+        if len(ks) == 0:
+            out = np.zeros((rows, 0), dtype=np.float32)
+            return out[0] if squeeze else out
+
+        starts = self._frame_start(ks)
+        frames = self._buffer[:, (starts - self._buffer_start)[:, None] + self._offsets]  # (rows, K, n_fft)
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)
+        magnitude = np.abs(spectrum)
+        phase = np.angle(spectrum)
+
+        # Phase advance of each bin between consecutive analysis frames. The
+        # nominal advance omega * hop is reduced mod 2 pi exactly in integers,
+        # so everything but the running sum can stay in float32.
+        positions = starts + self.n_fft // 2
+        previous_position = int(self._frame_start(np.array([ks[0] - 1]))[0]) + self.n_fft // 2
+        hops = np.diff(positions, prepend=previous_position)
+        nominal = ((self._bins * hops[:, None]) % self.n_fft).astype(np.float32) * np.float32(2 * np.pi / self.n_fft)
+        prev_phase = np.concatenate([self._prev_phase[:, None] if self._prev_phase is not None
+                                     else phase[:, :1], phase[:, :-1]], axis=1)
+        deviation = phase - prev_phase - nominal
+        deviation -= np.float32(2 * np.pi) * np.rint(deviation * np.float32(1 / (2 * np.pi)))
+        scale = (self.hop / np.maximum(hops, 1)).astype(np.float32)[:, None]
+        advance = (self._synthesis_advance + deviation * scale).astype(np.float64)
+        if self._phase is None:
+            # The first frame keeps its analysis phases
+            advance[:, 0] = phase[:, 0]
+            base = np.zeros((rows, 1, advance.shape[-1]))
+        else:
+            base = self._phase[:, None]
+        propagated = base + np.cumsum(advance, axis=1)
+        propagated -= 2 * np.pi * np.floor(propagated * (1 / (2 * np.pi)))
+        self._prev_phase, self._phase = phase[:, -1], propagated[:, -1]
+        out_phase = self._lock_phases(magnitude, phase, propagated.astype(np.float32))
+
+        np.multiply(magnitude, np.cos(out_phase), out=spectrum.real)
+        np.multiply(magnitude, np.sin(out_phase), out=spectrum.imag)
+        synthesized = np.fft.irfft(spectrum, n=self.n_fft, axis=-1)
+        synthesized = (synthesized * self.window).astype(np.float32, copy=False)
+
+        # Overlap-add: block j of frame k lands on output block k + j
+        n_frames, hop = len(ks), self.hop
+        acc = np.zeros((rows, (n_frames + 3) * hop), dtype=np.float32)
+        if self._tail is not None:
+            acc[:, :3 * hop] += self._tail
+        for j in range(4):
+            acc[:, j * hop:(j + n_frames) * hop] += \
+                synthesized[:, :, j * hop:(j + 1) * hop].reshape(rows, n_frames * hop)
+        self._tail = acc[:, n_frames * hop:]
+        out = self._drop_latency(acc[:, :n_frames * hop] / _HANN_OLA_GAIN)
+
+        self._frame = int(ks[-1]) + 1
+        keep_from = int(self._frame_start(np.array([self._frame]))[0]) - self._buffer_start
+        if keep_from > 0:
+            self._buffer = self._buffer[:, keep_from:]
+            self._buffer_start += keep_from
+        return out[0] if squeeze else out
+
+    def _lock_phases(self, magnitude: np.ndarray, phase: np.ndarray, propagated: np.ndarray) -> np.ndarray:
+        """
+        Identity phase locking: every bin takes the propagated phase of its
+        nearest spectral peak plus its analysis phase offset from that peak.
+
+        Propagating each bin on its own lets small errors in the bins'
+        frequency estimates pull the bins of one partial out of phase,
+        which is heard as phasiness and loses level at large stretches.
+        """
+        bins = self._bins
+        peaks = np.zeros(magnitude.shape, dtype=bool)
+        peaks[..., 1:-1] = (magnitude[..., 1:-1] > magnitude[..., :-2]) & (magnitude[..., 1:-1] >= magnitude[..., 2:])
+        last = len(bins) - 1
+        before = np.maximum.accumulate(np.where(peaks, bins, -1), axis=-1)
+        after = last - np.maximum.accumulate(np.where(peaks, last - bins, -1)[..., ::-1], axis=-1)[..., ::-1]
+        has_before, has_after = before >= 0, after <= last
+        nearest = np.where(has_before & (~has_after | (bins - before <= after - bins)), before, after)
+        nearest = np.where(has_before | has_after, nearest, bins)  # no peaks at all: keep each bin
+        propagated -= phase
+        return phase + np.take_along_axis(propagated, nearest, axis=-1)
+
+    def _drop_latency(self, out: np.ndarray) -> np.ndarray:
+        """Drop the first n_fft / 2 output samples (before the signal starts) and count the rest"""
+        if self._discard:
+            dropped = min(self._discard, out.shape[-1])
+            out = out[:, dropped:]
+            self._discard -= dropped
+        self.samples_out += out.shape[-1]
+        return out
+
+
+class ProsodyProcessor:
+    """
+    Independent speech-rate and pitch change, streaming or in one call.
+
+    A pitch shift by ratio p at rate r combines a phase-vocoder stretch by
+    p / r with polyphase resampling by 1 / p: the stretch sets the
+    duration, the resampling moves every frequency. Rate alone is a pure
+    stretch and keeps the pitch; pitch alone keeps the duration. Upward
+    shifts resample first so the vocoder runs at the (shorter) output
+    length rather than p times it.
+    """
+
+    def __init__(self, sample_rate: int, speech_rate: float = 1.0, semitones: float = 0.0,
+                 quality: str = "default", n_fft: Optional[int] = None):
+        if speech_rate <= 0:
+            raise ValueError(f"Speech rate must be positive: {speech_rate}")
+        self.sample_rate = sample_rate
+        self.speech_rate = speech_rate
+        self.semitones = semitones
+        # Resampling needs a rational ratio; the stretch absorbs the approximation
+        self.ratio = stretch_ratio(pitch_ratio(semitones)) if semitones else (1, 1)
+        self.quality = quality
+        stretch = self.ratio[0] / self.ratio[1] / speech_rate
+        self.vocoder = PhaseVocoder(stretch, n_fft or default_fft_size(sample_rate)) \
+            if abs(stretch - 1.0) > 1e-9 else None
+        self.resampler = StreamingResampler(*self.ratio, quality) if self.ratio[0] != self.ratio[1] else None
+        stages = [self.vocoder, self.resampler]
+        if self.ratio[0] > self.ratio[1]:
+            stages.reverse()
+        self._stages = [stage for stage in stages if stage is not None]
+
+    @property
+    def is_identity(self) -> bool:
+        return not self._stages
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Process the next chunk; returns the output samples that are now final"""
+        out = np.asarray(chunk, dtype=np.float32)
+        for stage in self._stages:
+            out = stage.process(out)
+        return out
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output and reset for a new signal"""
+        out: Optional[np.ndarray] = None
+        for stage in self._stages:
+            tail = stage.process(out) if out is not None and out.shape[-1] else None
+            rest = stage.flush()
+            out = rest if tail is None else np.concatenate([tail, rest.reshape(tail.shape[:-1] + (-1,))], axis=-1)
+        return out if out is not None else np.zeros(0, dtype=np.float32)
+
+    def output_length(self, n: int) -> int:
+        """Output samples for an n-sample input"""
+        for stage in self._stages:
+            n = stage.output_length(n) if stage is self.vocoder else \
+                filter_bank(*self.ratio, self.quality).output_length(n)
+        return n
+
+
+def apply_prosody(audio: np.ndarray, sample_rate: int, speech_rate: float = 1.0, semitones: float = 0.0,
+                  quality: str = "default") -> np.ndarray:
+    """Change rate and pitch of a (samples,) or (clips, samples) array in one call"""
+    processor = ProsodyProcessor(sample_rate, speech_rate, semitones, quality)
+    audio = np.asarray(audio, dtype=np.float32)
+    if processor.is_identity:
+        return audio
+    # Block by block keeps the per-frame spectra cache-sized however long the input is
+    parts = [processor.process(audio[..., start:start + _BLOCK_SAMPLES])
+             for start in range(0, audio.shape[-1], _BLOCK_SAMPLES)]
+    parts.append(processor.flush())
+    return np.concatenate(parts, axis=-1)
+
+
+def apply_prosody_batch(batch: np.ndarray, lengths: np.ndarray, sample_rate: int, speech_rates: Sequence[float],
+                        semitones: Sequence[float], quality: str = "default") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row rate and pitch for a zero-padded (clips, samples) batch.
+
+    Rows sharing (rate, pitch) are processed together in one batched call.
+
+    Returns:
+        Tuple of (padded float32 output batch, output length per row)
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    groups: Dict[Tuple[float, float], List[int]] = {}
+    for row, key in enumerate(zip(map(float, speech_rates), map(float, semitones))):
+        groups.setdefault(key, []).append(row)
+
+    processors = {key: ProsodyProcessor(sample_rate, key[0], key[1], quality) for key in groups}
+    new_lengths = np.zeros(len(batch), dtype=np.int64)
+    for key, rows in groups.items():
+        new_lengths[rows] = [processors[key].output_length(int(lengths[row])) for row in rows]
+
+    out = np.zeros((len(batch), int(new_lengths.max()) if len(batch) else 0), dtype=np.float32)
+    for key, rows in groups.items():
+        span = int(lengths[rows].max())
+        processed = apply_prosody(batch[rows, :span], sample_rate, key[0], key[1], quality)
+        for i, row in enumerate(rows):
+            out[row, :new_lengths[row]] = processed[i, :new_lengths[row]]
+    return out, new_lengths
@@ -0,0 +1,172 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def frame_signal(waveform: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """View a 1-D signal as overlapping (n_frames, frame_length) frames without copying"""
+    if len(waveform) < frame_length:
+        return np.zeros((0, frame_length), dtype=waveform.dtype)
+    return np.lib.stride_tricks.sliding_window_view(waveform, frame_length)[::hop_length]
+
+
+@dataclass
+class QualityReport:
+    """Per-frame quality features and summary for one clip"""
+    sample_rate: int
+    frame_length: int
+    hop_length: int
+    energy_db: np.ndarray
+    spectral_flatness: np.ndarray
+    zero_crossing_rate: np.ndarray
+    speech_mask: np.ndarray
+    snr_db: float
+    speech_ratio: float
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.energy_db)
+
+    def frame_times(self) -> np.ndarray:
+        """Start time of each frame in seconds"""
+        return np.arange(self.n_frames) * self.hop_length / self.sample_rate
+
+    def sample_mask(self, n_samples: int) -> np.ndarray:
+        """Expand the frame-level speech mask to a per-sample boolean mask"""
+        mask = np.zeros(n_samples, dtype=bool)
+        starts = np.flatnonzero(self.speech_mask) * self.hop_length
+        if len(starts) == 0:
+            return mask
+        # Mark speech spans with +1/-1 edges, then integrate
+        edges = np.zeros(n_samples + 1, dtype=np.int32)
+        np.add.at(edges, starts, 1)
+        np.add.at(edges, np.minimum(starts + self.frame_length, n_samples), -1)
+        return np.cumsum(edges[:-1]) > 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact, JSON-serializable form for plotting"""
+        return {
+            'sample_rate': self.sample_rate,
+            'hop_seconds': self.hop_length / self.sample_rate,
+            'energy_db': np.round(self.energy_db, 1).tolist(),
+            'spectral_flatness': np.round(self.spectral_flatness, 3).tolist(),
+            'zero_crossing_rate': np.round(self.zero_crossing_rate, 3).tolist(),
+            'speech_mask': self.speech_mask.astype(np.uint8).tolist(),
+            'snr_db': self.snr_db,
+            'speech_ratio': self.speech_ratio,
+        }
+
+
+class QualityAnalyzer:
+    """Vectorized frame-level audio quality analysis with energy-based VAD"""
+
+    def __init__(self, hop_ms: float = 16.0, hops_per_frame: int = 2,
+                 vad_margin_db: float = 9.0, hangover_frames: int = 6,
+                 block_frames: int = 256):
+        self.hop_ms = hop_ms
+        self.hops_per_frame = hops_per_frame
+        self.vad_margin_db = vad_margin_db
+        self.hangover_frames = hangover_frames
+        self.block_frames = block_frames
+
+    def analyze(self, audio_data: Tuple[np.ndarray, int]) -> QualityReport:
+        """
+        Compute per-frame energy, spectral flatness and zero-crossing rate,
+        detect speech frames and estimate SNR.
+        
+        Frames are ``hops_per_frame`` hops long and advance by one hop. Energy
+        and zero crossings are computed once per hop and summed into frames.
+        Spectral flatness is computed for every frame from a Welch-style
+        power spectrum: each hop is transformed once (the largest power of
+        two that fits in its centre) and a frame averages the power spectra
+        of its hops, so overlapping frames share FFTs and each sample is
+        transformed at most once at any sample rate.
+
+        Args:
+            audio_data: Tuple of (waveform, sample_rate)
+
+        Returns:
+            QualityReport with per-frame features and the speech mask
+        """
+        waveform, sr = audio_data
+        waveform = np.asarray(waveform, dtype=np.float32)
+        hop_length = max(int(sr * self.hop_ms / 1000), 8)
+        frame_length = hop_length * self.hops_per_frame
+        n_hops = len(waveform) // hop_length
+        n_frames = max(n_hops - self.hops_per_frame + 1, 0)
+
+        samples = waveform[:n_hops * hop_length]
+        hops = samples.reshape(n_hops, hop_length)
+        # Sums of one hop stay accurate in float32; frames are summed in float64 below
+        hop_energy = np.einsum('ij,ij->i', hops, hops)
+        # A crossing between two samples is counted in the hop of the later one
+        signs = np.signbit(samples)
+        crossings = np.zeros(len(samples), dtype=bool)
+        np.not_equal(signs[1:], signs[:-1], out=crossings[1:])
+        hop_crossings = crossings.view(np.uint8).reshape(n_hops, hop_length).sum(axis=1, dtype=np.int32)
+
+        energy = self._sum_hops(hop_energy, n_frames) / frame_length
+        energy_db = (10 * np.log10(energy + 1e-12)).astype(np.float32)
+        zcr = (self._sum_hops(hop_crossings, n_frames) / (frame_length - 1)).astype(np.float32)
+
+        n_fft = 1 << (hop_length.bit_length() - 1)
+        offset = (hop_length - n_fft) // 2
+        flatness = self._spectral_flatness(hops[:, offset:offset + n_fft], n_frames)
+        speech_mask = self._detect_speech(energy_db)
+
+        speech_energy = energy[speech_mask]
+        noise_energy = energy[~speech_mask]
+        if len(speech_energy) and len(noise_energy):
+            snr_db = float(10 * np.log10(speech_energy.mean() / (noise_energy.mean() + 1e-12) + 1e-12))
+        else:
+            snr_db = float('inf') if len(speech_energy) else 0.0
+
+        return QualityReport(
+            sample_rate=sr,
+            frame_length=frame_length,
+            hop_length=hop_length,
+            energy_db=energy_db,
+            spectral_flatness=flatness,
+            zero_crossing_rate=zcr,
+            speech_mask=speech_mask,
+            snr_db=snr_db,
+            speech_ratio=float(speech_mask.mean()) if n_frames else 0.0,
+        )
+
+    def _sum_hops(self, per_hop: np.ndarray, n_frames: int) -> np.ndarray:
+        """Sum per-hop values over the hops making up each frame"""
+        totals = per_hop[:n_frames].astype(np.float64)
+        for k in range(1, self.hops_per_frame):
+            totals += per_hop[k:k + n_frames]
+        return totals
+
+    def _spectral_flatness(self, hops: np.ndarray, n_frames: int) -> np.ndarray:
+        """Per-frame geometric over arithmetic mean of the hop-averaged power spectrum, in frame blocks"""
+        import scipy.fft  # keeps float32 precision, unlike np.fft
+        flatness = np.empty(n_frames, dtype=np.float32)
+        window = np.hanning(hops.shape[1]).astype(np.float32)
+        for start in range(0, n_frames, self.block_frames):
+            count = min(self.block_frames, n_frames - start)
+            # The block's frames span hops_per_frame - 1 hops beyond its last frame start
+            spectrum = scipy.fft.rfft(hops[start:start + count + self.hops_per_frame - 1] * window, axis=1)
+            hop_power = spectrum.real ** 2 + spectrum.imag ** 2
+            power = hop_power[:count] + np.float32(1e-12)
+            for k in range(1, self.hops_per_frame):
+                power += hop_power[k:k + count]
+            flatness[start:start + count] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return flatness
+
+    def _detect_speech(self, energy_db: np.ndarray) -> np.ndarray:
+        """Energy-based VAD: threshold above the estimated noise floor, with hangover"""
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool)
+        noise_floor_db = np.percentile(energy_db, 10)
+        active = energy_db > noise_floor_db + self.vad_margin_db
+        if self.hangover_frames > 0:
+            # Extend each active run by the hangover so word endings aren't clipped
+            kernel = np.ones(self.hangover_frames + 1)
+            active = np.convolve(active.astype(np.float32), kernel)[:len(active)] > 0
+        return active
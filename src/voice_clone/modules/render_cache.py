@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of text for cache keys: NFC, collapsed whitespace"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def render_key(voice_embedding: np.ndarray, text: str, speech_rate: float, pitch: float,
+               tone: str, engine_version: str) -> str:
+    """Content hash of everything that determines rendered audio"""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(voice_embedding, dtype=np.float32).tobytes())
+    h.update(b"\0" + normalize_text(text).encode("utf-8"))
+    h.update(f"\0{float(speech_rate)!r}\0{float(pitch)!r}\0{tone}\0{engine_version}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class RenderCache:
+    """
+    Size-bounded memory + disk cache of rendered audio.
+
+    The memory tier holds float32 waveforms for preview; the disk tier holds
+    encoded WAV files so an export is a hardlink or copy. Both tiers evict in
+    least-recently-used order once their byte budget is exceeded.
+    """
+
+    def __init__(self, cache_dir: Path, memory_budget: int, disk_budget: int,
+                 export_mode: str = "hardlink"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self.export_mode = export_mode
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        # Rebuild the disk LRU from mtimes (touched on every hit)
+        entries = sorted(self.cache_dir.glob("*.wav"), key=lambda path: path.stat().st_mtime)
+        for path in entries:
+            size = path.stat().st_size
+            self._disk[path.name] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def get_audio(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Return a cached (waveform, sample_rate) from memory, or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put_audio(self, key: str, audio_data: Tuple[np.ndarray, int]):
+        """Cache a rendered waveform in memory"""
+        waveform, sr = audio_data
+        if waveform.nbytes > self.memory_budget:
+            return
+        waveform = np.ascontiguousarray(waveform, dtype=np.float32)
+        waveform.setflags(write=False)
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous[0].nbytes
+            self._memory[key] = (waveform, sr)
+            self._memory_bytes += waveform.nbytes
+            while self._memory_bytes > self.memory_budget and self._memory:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+
+    def wav_name(self, key: str, sample_rate: int, bit_depth: int) -> str:
+        """Disk entry name; encoded output also depends on export format"""
+        return f"{key}_{sample_rate}_{bit_depth}.wav"
+
+    def export_wav(self, key: str, sample_rate: int, bit_depth: int, output_path: Path,
+                   count_miss: bool = True) -> bool:
+        """
+        Serve an export from the disk tier; returns False on a miss.
+
+        Pass ``count_miss=False`` when a miss falls through to ``get_audio``,
+        so one lookup is counted once.
+        """
+        name = self.wav_name(key, sample_rate, bit_depth)
+        with self._lock:
+            if name not in self._disk:
+                self.misses += count_miss
+                return False
+            self._disk.move_to_end(name)
+        source = self.cache_dir / name
+        try:
+            os.utime(source)
+            self._place(source, Path(output_path))
+        except OSError as e:
+            logger.warning(f"Render cache entry unusable, dropping: {e}")
+            self._drop_disk(name)
+            with self._lock:
+                self.misses += count_miss
+            return False
+        with self._lock:
+            self.hits += 1
+        logger.info(f"Served export from render cache: {output_path}")
+        return True
+
+    def put_wav(self, key: str, sample_rate: int, bit_depth: int, wav_path: Path):
+        """Add an exported WAV file to the disk tier"""
+        name = self.wav_name(key, sample_rate, bit_depth)
+        target = self.cache_dir / name
+        size = Path(wav_path).stat().st_size
+        if size > self.disk_budget:
+            return
+        tmp_path = target.with_suffix(".tmp")
+        try:
+            self._place(Path(wav_path), tmp_path)
+            os.replace(tmp_path, target)
+        except OSError as e:
+            logger.warning(f"Failed to add render cache entry: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += size - self._disk.pop(name, 0)
+            self._disk[name] = size
+        self._evict_disk()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+            }
+
+    def _place(self, source: Path, target: Path):
+        """Hardlink (falling back to copy) or copy source to target"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            target.unlink()
+        if self.export_mode == "hardlink":
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass  # cross-device or unsupported; copy instead
+        shutil.copyfile(source, target)
+
+    def _drop_disk(self, name: str):
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(name, 0)
+        (self.cache_dir / name).unlink(missing_ok=True)
+
+    def _evict_disk(self):
+        """Delete least recently used WAVs until within the disk budget"""
+        while True:
+            with self._lock:
+                if self._disk_bytes <= self.disk_budget or not self._disk:
+                    return
+                name, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+            (self.cache_dir / name).unlink(missing_ok=True)
+            logger.debug(f"Evicted render cache entry: {name}")
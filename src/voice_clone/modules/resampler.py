@@ -0,0 +1,201 @@
+import logging
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# quality -> (zero crossings per side, cutoff as a fraction of the lower Nyquist, Kaiser beta)
+QUALITY_PRESETS = {
+    'fast': (8, 0.85, 6.0),
+    'default': (16, 0.92, 8.6),
+    'high': (32, 0.95, 12.0),
+}
+
+
+@dataclass(frozen=True)
+class FilterBank:
+    """
+    Polyphase decomposition of a windowed-sinc lowpass for an up/down ratio.
+
+    Outputs repeat their filter phases every ``group`` samples while the input
+    advances by ``advance`` samples, so each run of consecutive outputs in a
+    group is one matrix product of a strided input window view with a
+    precomputed (width, outputs) matrix.
+    """
+    up: int
+    down: int
+    delay: int            # filter centre, in samples at up * orig_sr
+    taps_per_phase: int
+    group: int
+    advance: int
+    offsets: np.ndarray   # newest input index of each output in a group, relative to the group start
+    blocks: Tuple[Tuple[int, int, np.ndarray], ...]  # (first output, window offset, (width, outputs) matrix)
+
+    def output_length(self, n_samples: int) -> int:
+        """Number of output samples for n_samples of input"""
+        return -(-n_samples * self.up // self.down)
+
+
+@lru_cache(maxsize=64)
+def filter_bank(orig_sr: int, target_sr: int, quality: str = 'default') -> FilterBank:
+    """Design (once per rate pair and quality) the polyphase filter bank"""
+    if quality not in QUALITY_PRESETS:
+        raise ValueError(f"Unknown resampling quality: {quality}")
+    if orig_sr <= 0 or target_sr <= 0:
+        raise ValueError(f"Sample rates must be positive: {orig_sr} -> {target_sr}")
+    g = gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    zero_crossings, rolloff, beta = QUALITY_PRESETS[quality]
+
+    # Lowpass at the lower of the two Nyquist rates, designed at up * orig_sr
+    factor = max(up, down)
+    half = zero_crossings * factor
+    cutoff = rolloff / factor
+    n = np.arange(-half, half + 1, dtype=np.float64)
+    h = up * cutoff * np.sinc(cutoff * n) * np.kaiser(2 * half + 1, beta)
+
+    # taps[p] is phase p, reversed so it dots directly with a window of input
+    k = -(-len(h) // up)
+    padded = np.zeros(k * up)
+    padded[:len(h)] = h
+    taps = padded.reshape(k, up).T[:, ::-1]
+
+    # Output m uses phase (m * down + half) % up ending at input (m * down + half) // up.
+    # Runs of about k * up / down consecutive outputs span ~2k inputs, which keeps
+    # the zero padding in each block matrix to roughly half of its entries.
+    run = max(1, round(k * up / down))
+    group = up * -(-run // up)
+    positions = np.arange(group) * down + half
+    offsets, phases = positions // up, positions % up
+    blocks = []
+    for first in range(0, group, run):
+        last = min(first + run, group)
+        width = int(offsets[last - 1] - offsets[first]) + k
+        matrix = np.zeros((width, last - first), dtype=np.float32)
+        for i in range(first, last):
+            shift = int(offsets[i] - offsets[first])
+            matrix[shift:shift + k, i - first] = taps[phases[i]]
+        matrix.setflags(write=False)
+        blocks.append((first, int(offsets[first]) - (k - 1), matrix))
+
+    logger.debug(f"Designed resampling filter {orig_sr}->{target_sr} ({quality}): "
+                 f"{up} phases x {k} taps in {len(blocks)} blocks")
+    return FilterBank(up=up, down=down, delay=half, taps_per_phase=k, group=group,
+                      advance=group * down // up, offsets=offsets, blocks=tuple(blocks))
+
+
+class StreamingResampler:
+    """
+    Rational-ratio polyphase resampler that carries filter state between chunks.
+
+    Accepts 1-D chunks or 2-D (clips, samples) blocks. Concatenating the
+    outputs of ``process`` for every chunk and then ``flush`` gives exactly
+    the same samples as resampling the whole signal at once.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int, quality: str = 'default'):
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self.bank = filter_bank(orig_sr, target_sr, quality)
+        self.reset()
+
+    def reset(self):
+        """Drop all buffered input so the resampler can start a new signal"""
+        self.samples_in = 0
+        self.samples_out = 0
+        self._buffer = None
+        self._buffer_start = 1 - self.bank.taps_per_phase  # zero history before the signal
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Resample the next chunk; returns every output sample that is now complete"""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        self._append(chunk)
+        self.samples_in += chunk.shape[-1]
+        # Output m is complete once input index (m * down + delay) // up has arrived
+        bank = self.bank
+        ready = (self.samples_in * bank.up - 1 - bank.delay) // bank.down + 1
+        return self._render(max(ready, self.samples_out))
+
+    def flush(self) -> np.ndarray:
+        """Zero-pad the end of the signal, return the remaining output and reset"""
+        if self._buffer is None:
+            return np.zeros(0, dtype=np.float32)
+        out = self._render(self.bank.output_length(self.samples_in))
+        self.reset()
+        return out
+
+    def _append(self, chunk: np.ndarray):
+        if self._buffer is None:
+            history = np.zeros(chunk.shape[:-1] + (self.bank.taps_per_phase - 1,), dtype=np.float32)
+            self._buffer = np.concatenate([history, chunk], axis=-1)
+        else:
+            self._buffer = np.concatenate([self._buffer, chunk], axis=-1)
+
+    def _render(self, end: int) -> np.ndarray:
+        """Compute outputs samples_out..end-1 and trim consumed input"""
+        bank = self.bank
+        start = self.samples_out
+        first_group = start // bank.group
+        origin = first_group * bank.advance - self._buffer_start
+        if end <= start:
+            return np.zeros(self._buffer.shape[:-1] + (0,), dtype=np.float32)
+
+        # Whole groups are computed; inputs past the buffered signal only feed
+        # outputs beyond `end`, which are discarded, so zero-fill them
+        n_groups = -(-end // bank.group) - first_group
+        needed = origin + (n_groups - 1) * bank.advance + max(
+            offset + matrix.shape[0] for _, offset, matrix in bank.blocks)
+        buffer = self._buffer
+        if needed > buffer.shape[-1]:
+            pad = np.zeros(buffer.shape[:-1] + (needed - buffer.shape[-1],), dtype=np.float32)
+            buffer = np.concatenate([buffer, pad], axis=-1)
+
+        out = np.empty(buffer.shape[:-1] + (n_groups, bank.group), dtype=np.float32)
+        for first, offset, matrix in bank.blocks:
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, matrix.shape[0], axis=-1)
+            frames = windows[..., origin + offset::bank.advance, :][..., :n_groups, :]
+            out[..., first:first + matrix.shape[1]] = frames @ matrix
+        out = out.reshape(buffer.shape[:-1] + (-1,))
+        skip = start - first_group * bank.group
+        result = out[..., skip:skip + end - start]
+        self.samples_out = end
+
+        # Keep only the input the next group still needs
+        oldest = (end // bank.group) * bank.advance + bank.blocks[0][1]
+        drop = min(oldest - self._buffer_start, self._buffer.shape[-1])
+        if drop > 0:
+            self._buffer = self._buffer[..., drop:]
+            self._buffer_start += drop
+        return result
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int, quality: str = 'default') -> np.ndarray:
+    """
+    Resample a clip, or a 2-D (clips, samples) batch of equal-length clips.
+
+    Args:
+        audio: Waveform(s) with time on the last axis
+        orig_sr: Input sample rate (or any integer proportional to it)
+        target_sr: Output sample rate (or any integer proportional to it)
+        quality: One of QUALITY_PRESETS
+
+    Returns:
+        float32 array with ``ceil(n * target_sr / orig_sr)`` samples per clip
+    """
+    if orig_sr == target_sr:
+        return np.asarray(audio, dtype=np.float32)
+    resampler = StreamingResampler(orig_sr, target_sr, quality)
+    head = resampler.process(audio)
+    return np.concatenate([head, resampler.flush()], axis=-1)
+
+
+def stretch_ratio(speech_rate: float, max_denominator: int = 50) -> Tuple[int, int]:
+    """(orig, target) integer rate pair that shortens audio by ``speech_rate``"""
+    ratio = Fraction(speech_rate).limit_denominator(max_denominator)
+    if ratio <= 0:
+        raise ValueError(f"Speech rate must be positive: {speech_rate}")
+    return ratio.numerator, ratio.denominator
@@ -1,50 +1,322 @@
 import logging
+import re
+import threading
 import numpy as np
-from typing import Tuple
-import torch
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+from ..utils.helpers import resolve_device
+from ..utils.metrics import metrics
+from .prosody import ProsodyProcessor, apply_prosody, apply_prosody_batch, percent_to_semitones
 
 logger = logging.getLogger(__name__)
 
+# Sentence and clause boundaries used to split text into streaming units
+_UNIT_BOUNDARY = re.compile(r'(?<=[.!?;:,])\s+|\n+')
+
+
+def split_text_units(text: str) -> List[str]:
+    """Split text into sentence/clause units for streaming synthesis"""
+    return [unit.strip() for unit in _UNIT_BOUNDARY.split(text) if unit.strip()]
+
+
+class _UnitJoiner:
+    """Join consecutive unit renders with a linear crossfade, holding back the overlap"""
+    
+    def __init__(self, overlap: int):
+        self.overlap = overlap
+        self.fade_in = np.linspace(0.0, 1.0, overlap, endpoint=False, dtype=np.float32)
+        self.fade_out = 1.0 - self.fade_in
+        self.tail = np.zeros(0, dtype=np.float32)
+    
+    def push(self, segment: np.ndarray) -> np.ndarray:
+        """Add the next unit (modified in place); returns the samples that are now final"""
+        # Blend the held-back tail of the previous unit into this one
+        if len(self.tail) and len(segment) > len(self.tail):
+            n = len(self.tail)
+            segment[:n] = self.tail * self.fade_out[:n] + segment[:n] * self.fade_in[:n]
+        elif len(self.tail):
+            segment = np.concatenate([self.tail, segment])
+        
+        # Hold back the overlap region so the next unit can crossfade into it
+        if self.overlap and len(segment) > self.overlap:
+            body, self.tail = segment[:-self.overlap], segment[-self.overlap:].copy()
+        else:
+            body, self.tail = np.zeros(0, dtype=np.float32), segment
+        return body
+    
+    def finish(self) -> np.ndarray:
+        """Return the held-back tail of the last unit"""
+        tail, self.tail = self.tail, np.zeros(0, dtype=np.float32)
+        return tail
+
 
 class SynthesisEngine:
     """Text-to-speech synthesis engine"""
     
+    # Bump whenever rendered output changes for the same inputs (invalidates render caches)
+    VERSION = "4"
+    
+    # Placeholder model's voice frequency in Hz, before any pitch shift
+    BASE_FREQUENCY = 440.0
+    
     def __init__(self, config):
         self.config = config
-        self.device = torch.device('cuda' if torch.cuda.is_available() and config.model.device == 'cuda' else 'cpu')
-        logger.info(f"SynthesisEngine initialized on device: {self.device}")
+        self.device = None
+        self._model_lock = threading.Lock()
+        logger.info("SynthesisEngine created; model loads on first use")
+    
+    def load_model(self):
+        """Resolve the device and load the model; no-op after the first call"""
+        if self.device is not None:
+            return
+        with self._model_lock:
+            if self.device is None:
+                self.device = resolve_device(self.config.model.device)
+                logger.info(f"SynthesisEngine initialized on device: {self.device}")
     
     def synthesize(self, text: str, voice_embedding: np.ndarray,
                   speech_rate: float = 1.0, pitch: float = 0.0,
                   tone: str = "neutral") -> Tuple[np.ndarray, int]:
         """Synthesize speech with cloned voice"""
         
+        self.load_model()
         logger.info(f"Synthesizing: text_length={len(text)}, speech_rate={speech_rate}, pitch={pitch}, tone={tone}")
         
-        # Placeholder: Generate synthetic audio
-        # In production, this would use Fish Speech V1.5 or similar model
+        with metrics.span("synthesize") as span:
+            # Placeholder: Generate synthetic audio
+            # In production, this would use Fish Speech V1.5 or similar model
+            sr = self.config.audio.sample_rate
+            duration = max(len(text) * 0.1, 1.0)  # Rough estimate
+            t = np.arange(int(sr * duration)) / sr
+            
+            # Generate a simple sine wave as placeholder
+            waveform = 0.1 * np.sin(2 * np.pi * self.BASE_FREQUENCY * t)
+            
+            # Rate and pitch are applied to the rendered speech
+            waveform = self._apply_prosody(waveform, speech_rate, pitch)
+            span.audio_seconds = len(waveform) / sr
+        
+        return waveform.astype(np.float32), sr
+    
+    def synthesize_batch(self, texts: Sequence[str], voice_embeddings: Sequence[np.ndarray],
+                         speech_rates: Sequence[float], pitches: Sequence[float],
+                         tones: Sequence[str]) -> List[Tuple[np.ndarray, int]]:
+        """
+        Synthesize several requests in one padded, vectorized forward pass.
+        
+        Args:
+            texts: Texts to synthesize
+            voice_embeddings: Speaker embedding vector per request
+            speech_rates: Speech rate multiplier per request
+            pitches: Pitch change in percent per request
+            tones: Emotional tone per request
+            
+        Returns:
+            List of (waveform, sample_rate) in request order
+        """
+        if not texts:
+            return []
+        
+        self.load_model()
+        logger.info(f"Batch synthesizing: batch_size={len(texts)}")
+        
+        with metrics.span("synthesize") as span:
+            # Placeholder: same sine model as synthesize(), evaluated for the whole batch
+            sr = self.config.audio.sample_rate
+            lengths = np.array([int(sr * max(len(text) * 0.1, 1.0)) for text in texts])
+            t = np.arange(lengths.max()) / sr
+            batch = np.repeat((0.1 * np.sin(2 * np.pi * self.BASE_FREQUENCY * t))[None, :].astype(np.float32),
+                              len(texts), axis=0)
+            
+            if any(rate != 1.0 for rate in speech_rates) or any(pitches):
+                with metrics.span("prosody", lengths.sum() / sr):
+                    batch, lengths = apply_prosody_batch(batch, lengths, sr, speech_rates,
+                                                         [percent_to_semitones(p) for p in pitches],
+                                                         self.config.audio.resample_quality)
+            span.audio_seconds = lengths.sum() / sr
+        return [(batch[i, :lengths[i]].copy(), sr) for i in range(len(texts))]
+    
+    def synthesize_stream(self, text: str, voice_embedding: np.ndarray,
+                          speech_rate: float = 1.0, pitch: float = 0.0,
+                          tone: str = "neutral", chunk_size: int = 4096,
+                          crossfade_ms: float = 10.0,
+                          progress_callback: Optional[Callable[[int, int], None]] = None
+                          ) -> Iterator[np.ndarray]:
+        """
+        Synthesize speech incrementally, one sentence/clause unit at a time.
+        
+        Units are rendered in order and joined with a short linear crossfade.
+        Speech rate and pitch are applied to the joined audio by a streaming
+        prosody processor, so the first chunk is available as soon as the
+        first unit finishes rendering.
+        
+        Args:
+            text: Text to synthesize
+            voice_embedding: Speaker embedding vector
+            speech_rate: Speech rate multiplier (0.8-1.5)
+            pitch: Pitch change in percent (-15 to +15)
+            tone: Emotional tone
+            chunk_size: Number of samples per yielded chunk
+            crossfade_ms: Overlap between consecutive units in milliseconds
+            progress_callback: Called with (units_done, units_total) after each unit
+            
+        Yields:
+            float32 chunks of ``chunk_size`` samples at ``config.audio.sample_rate``;
+            the final chunk may be shorter
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive: {chunk_size}")
+        
+        self.load_model()
+        units = split_text_units(text)
+        logger.info(f"Streaming synthesis: units={len(units)}, chunk_size={chunk_size}, "
+                    f"speech_rate={speech_rate}, pitch={pitch}, tone={tone}")
+        
         sr = self.config.audio.sample_rate
-        duration = max(len(text) * 0.1, 1.0)  # Rough estimate
-        t = np.arange(int(sr * duration)) / sr
+        joiner = _UnitJoiner(int(sr * crossfade_ms / 1000))
+        prosody = ProsodyProcessor(sr, speech_rate, percent_to_semitones(pitch), self.config.audio.resample_quality)
+        pending = np.zeros(0, dtype=np.float32)
+        phases = np.zeros(1)
+        
+        for i, unit in enumerate(units):
+            # Timed per unit so time spent by the consumer between chunks is excluded
+            with metrics.span("synthesize_unit") as span:
+                segments, phases = self._render_unit_batch(unit, phases)
+                body = joiner.push(segments[0])
+                if not prosody.is_identity:
+                    body = prosody.process(body)
+                span.audio_seconds = len(body) / sr
+            
+            pending = np.concatenate([pending, body]) if len(pending) else body
+            if progress_callback is not None:
+                progress_callback(i + 1, len(units))
+            while len(pending) >= chunk_size:
+                yield np.ascontiguousarray(pending[:chunk_size])
+                pending = pending[chunk_size:]
         
-        # Generate a simple sine wave as placeholder
-        frequency = 440 + pitch * 10  # Adjust based on pitch
-        waveform = 0.1 * np.sin(2 * np.pi * frequency * t)
+        tail = joiner.finish()
+        if not prosody.is_identity:
+            tail = np.concatenate([prosody.process(tail), prosody.flush()])
+        remainder = np.concatenate([pending, tail])
+        for start in range(0, len(remainder), chunk_size):
+            yield np.ascontiguousarray(remainder[start:start + chunk_size])
+    
+    def synthesize_variants(self, text: str, voice_embeddings: Sequence[np.ndarray],
+                            speech_rates: Sequence[float], pitches: Sequence[float],
+                            tones: Sequence[str], crossfade_ms: float = 10.0,
+                            progress_callback: Optional[Callable[[int, int], None]] = None
+                            ) -> List[Tuple[np.ndarray, int]]:
+        """
+        Render one text for many (voice, rate, pitch, tone) variants at once.
         
-        # Apply speech rate by resampling
-        if speech_rate != 1.0:
-            new_length = int(len(waveform) / speech_rate)
-            waveform = np.interp(np.linspace(0, len(waveform)-1, new_length), 
-                                np.arange(len(waveform)), waveform)
+        The text is segmented once. Rate and pitch are applied after
+        rendering, so variants differing only in those share one render:
+        each unit is rendered and joined once per distinct (voice, tone),
+        then variants sharing (rate, pitch) are run through one batched
+        streaming prosody processor. The output of each variant is
+        identical to joining ``synthesize_stream``.
         
-        return waveform.astype(np.float32), sr
+        Args:
+            text: Text to synthesize
+            voice_embeddings: Speaker embedding vector per variant
+            speech_rates: Speech rate multiplier per variant
+            pitches: Pitch change in percent per variant
+            tones: Emotional tone per variant
+            crossfade_ms: Overlap between consecutive units in milliseconds
+            progress_callback: Called with (units_done, units_total) after each unit
+            
+        Returns:
+            List of (waveform, sample_rate) in variant order
+        """
+        n_variants = len(voice_embeddings)
+        if n_variants == 0:
+            return []
+        
+        self.load_model()
+        units = split_text_units(text)
+        logger.info(f"Synthesizing variants: variants={n_variants}, units={len(units)}")
+        
+        sr = self.config.audio.sample_rate
+        overlap = int(sr * crossfade_ms / 1000)
+        parts: List[List[np.ndarray]] = [[] for _ in range(n_variants)]
+        
+        # Map each variant to its distinct render
+        renders: dict = {}
+        source = np.array([
+            renders.setdefault((np.asarray(embedding, dtype=np.float32).tobytes(), tone), len(renders))
+            for embedding, tone in zip(voice_embeddings, tones)
+        ])
+        joiners = [_UnitJoiner(overlap) for _ in renders]
+        phases = np.zeros(len(renders))
+        logger.info(f"Distinct renders per unit: {len(renders)}")
+        
+        # One batched prosody stream per (rate, pitch), over the renders its variants use
+        groups: dict = {}
+        for v, key in enumerate(zip(map(float, speech_rates), map(float, pitches))):
+            groups.setdefault(key, []).append(v)
+        quality = self.config.audio.resample_quality
+        streams = [(ProsodyProcessor(sr, rate, percent_to_semitones(pitch), quality), variants,
+                    np.unique(source[variants]))
+                   for (rate, pitch), variants in groups.items()]
+        
+        def emit(bodies: np.ndarray, final: bool):
+            for prosody, variants, rows in streams:
+                out = bodies[rows]
+                if not prosody.is_identity:
+                    out = prosody.process(out)
+                    if final:
+                        out = np.concatenate([out, prosody.flush()], axis=-1)
+                for v in variants:
+                    parts[v].append(out[np.searchsorted(rows, source[v])])
+        
+        for i, unit in enumerate(units):
+            with metrics.span("synthesize_unit") as span:
+                rendered, phases = self._render_unit_batch(unit, phases)
+                emit(np.stack([joiner.push(segment) for joiner, segment in zip(joiners, rendered)]), False)
+                span.audio_seconds = sum(part[-1].shape[-1] for part in parts) / sr
+            if progress_callback is not None:
+                progress_callback(i + 1, len(units))
+        
+        emit(np.stack([joiner.finish() for joiner in joiners]), True)
+        return [(np.concatenate(part).astype(np.float32, copy=False), sr) for part in parts]
+    
+    def _render_unit_batch(self, unit: str, phases: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Render one text unit for a batch of voices, continuing each oscillator phase"""
+        # Placeholder: per-unit sine segment, same model as synthesize()
+        sr = self.config.audio.sample_rate
+        duration = max(len(unit) * 0.1, 0.2)
+        n = int(sr * duration)
+        step = 2 * np.pi * self.BASE_FREQUENCY / sr
+        t = np.arange(n, dtype=np.float64)
+        scratch = np.empty(n, dtype=np.float64)
+        segments = np.empty((len(phases), n), dtype=np.float32)
+        # Row by row through one scratch buffer keeps the working set cache-sized
+        for row, phase in enumerate(phases):
+            np.multiply(t, step, out=scratch)
+            scratch += phase
+            np.sin(scratch, out=scratch)
+            scratch *= 0.1
+            segments[row] = scratch
+        return segments, (phases + step * n) % (2 * np.pi)
+    
+    def _apply_prosody(self, waveform: np.ndarray, speech_rate: float, pitch: float) -> np.ndarray:
+        """Change speech rate and pitch (in percent) independently"""
+        if speech_rate == 1.0 and not pitch:
+            return waveform
+        with metrics.span("prosody", len(waveform) / self.config.audio.sample_rate):
+            return apply_prosody(waveform, self.config.audio.sample_rate, speech_rate,
+                                 percent_to_semitones(pitch), self.config.audio.resample_quality)
+    
+    @property
+    def version(self) -> str:
+        """Identifier of the model and rendering code producing the audio"""
+        return f"{self.config.model.tts_model}/{self.VERSION}"
     
     def get_available_tones(self) -> list[str]:
         """Get list of available emotional tones"""
         return ["neutral", "warm", "energetic"]
     
     def validate_parameters(self, speech_rate: float, pitch: float) -> bool:
-        """Validate synthesis parameters"""
+        """Validate synthesis parameters (rate multiplier, pitch in percent)"""
         if not (0.8 <= speech_rate <= 1.5):
             logger.warning(f"Speech rate out of range: {speech_rate}")
             return False
@@ -0,0 +1,83 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Set, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceProfileCache:
+    """In-process LRU cache of loaded voice embeddings keyed by voice name and file mtime"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[int, np.ndarray]]" = OrderedDict()
+        self._pinned: Set[str] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, voice_name: str, mtime_ns: int,
+            loader: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return the cached embedding, calling loader on a miss or stale mtime"""
+        with self._lock:
+            entry = self._entries.get(voice_name)
+            if entry is not None and entry[0] == mtime_ns:
+                self._entries.move_to_end(voice_name)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        embedding = loader()
+        embedding.setflags(write=False)
+
+        with self._lock:
+            self._entries[voice_name] = (mtime_ns, embedding)
+            self._entries.move_to_end(voice_name)
+            self._evict()
+        return embedding
+
+    def invalidate(self, voice_name: str):
+        """Drop a voice from the cache (pin status is kept)"""
+        with self._lock:
+            self._entries.pop(voice_name, None)
+
+    def clear(self):
+        """Drop all cached entries and pins"""
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+
+    def pin(self, voice_name: str):
+        """Exempt a voice from LRU eviction"""
+        with self._lock:
+            self._pinned.add(voice_name)
+
+    def unpin(self, voice_name: str):
+        """Make a pinned voice evictable again"""
+        with self._lock:
+            self._pinned.discard(voice_name)
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'pinned': len(self._pinned),
+            }
+
+    def _evict(self):
+        """Evict least recently used unpinned entries until within max_size"""
+        while len(self._entries) > self.max_size:
+            victim = next((name for name in self._entries if name not in self._pinned), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            self.evictions += 1
+            logger.debug(f"Evicted voice profile from cache: {victim}")
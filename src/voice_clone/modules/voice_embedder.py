@@ -1,8 +1,15 @@
 import logging
+import threading
 import numpy as np
 from pathlib import Path
-from typing import Tuple
-import torch
+from typing import Any, Dict, List, Optional, Tuple
+from ..utils.helpers import resolve_device
+from ..utils.metrics import metrics
+from .embedding_codec import read_profile_embedding, save_profile
+from .enrollment import VoiceEnrollment, segment_weights, split_segments, weighted_mean
+from .voice_cache import VoiceProfileCache
+from .voice_store import VoiceStore
+from .voice_search import VoiceIndex
 
 logger = logging.getLogger(__name__)
 
@@ -12,29 +19,181 @@ class VoiceEmbedder:
     
     def __init__(self, config):
         self.config = config
-        self.device = torch.device('cuda' if torch.cuda.is_available() and config.model.device == 'cuda' else 'cpu')
-        logger.info(f"VoiceEmbedder initialized on device: {self.device}")
+        self.device = None
+        self._model_lock = threading.Lock()
+        self.profile_cache = VoiceProfileCache(config.model.max_cache_size)
+        self.voice_store = VoiceStore(config.voices_dir, dtype=config.embedding_storage_dtype) \
+            if config.voice_store_backend == "mmap" else None
+        self._voice_index: Optional[VoiceIndex] = None
+        logger.info("VoiceEmbedder created; model loads on first use")
     
-    def extract_embedding(self, audio_data: Tuple[np.ndarray, int]) -> np.ndarray:
-        """Extract speaker embedding from audio"""
-        waveform, sr = audio_data
+    def load_model(self):
+        """Resolve the device and load the model; no-op after the first call"""
+        if self.device is not None:
+            return
+        with self._model_lock:
+            if self.device is None:
+                self.device = resolve_device(self.config.model.device)
+                logger.info(f"VoiceEmbedder initialized on device: {self.device}")
+    
+    def extract_embedding(self, audio_data: Tuple[np.ndarray, int],
+                          speech_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Extract speaker embedding from audio, optionally from speech samples only.
         
-        # Placeholder: In production, this would use a speaker verification model
-        # For now, return a random embedding (512 dimensions like Fish Speech)
+        The clip is embedded as fixed-length segments (see
+        extract_segment_embeddings) and the duration-weighted mean returned.
+        """
         logger.info("Extracting voice embedding...")
-        embedding = np.random.randn(512).astype(np.float32)
-        return embedding
+        embeddings, weights = self.extract_segment_embeddings(audio_data, speech_mask)
+        return weighted_mean(embeddings, weights)
+    
+    def extract_segment_embeddings(self, audio_data: Tuple[np.ndarray, int],
+                                   speech_mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Embed a clip as ``model.embedding_segment_seconds`` segments.
+        
+        Segments are views into the (speech-only) waveform and go through
+        the model ``model.embedding_batch_size`` at a time, so a long clip never
+        becomes one huge forward pass.
+        
+        Returns:
+            Tuple of ((segments, 512) embeddings, segment durations in seconds)
+        """
+        waveform, sr = audio_data
+        if speech_mask is not None and speech_mask.any():
+            waveform = waveform[speech_mask]
+        segments = split_segments(waveform, max(int(self.config.model.embedding_segment_seconds * sr), 1))
+        if not segments:
+            raise ValueError("Cannot embed an empty clip")
+        
+        batch_size = max(self.config.model.embedding_batch_size, 1)
+        embeddings = np.concatenate([
+            self.extract_embeddings([(segment, sr) for segment in segments[start:start + batch_size]])
+            for start in range(0, len(segments), batch_size)
+        ])
+        return embeddings, segment_weights(segments, sr)
+    
+    def extract_embeddings(self, audio_batch: List[Tuple[np.ndarray, int]]) -> np.ndarray:
+        """Extract speaker embeddings for a batch of clips as an (n, 512) array"""
+        self.load_model()
+        
+        # Placeholder: one random 512-dim embedding per clip, as in extract_embedding
+        logger.info(f"Extracting voice embeddings: batch_size={len(audio_batch)}")
+        with metrics.span("embed", sum(len(waveform) / sr for waveform, sr in audio_batch)):
+            return np.random.randn(len(audio_batch), 512).astype(np.float32)
+    
+    def store_voice(self, voice_name: str, embedding: np.ndarray,
+                    source_stats: Optional[Dict[str, Any]] = None):
+        """
+        Store a voice in the configured library backend.
+        
+        Any enrollment state of an earlier voice with this name is dropped,
+        so later clip additions start from this embedding rather than the
+        old clips; ``store_enrollment`` writes the new state afterwards.
+        """
+        self._enrollment_path(voice_name).unlink(missing_ok=True)
+        with metrics.span("save"):
+            if self.voice_store is not None:
+                self.voice_store.append(voice_name, embedding, source_stats)
+            else:
+                self.save_voice_profile(embedding, self._profile_path(voice_name), voice_name)
+        self._voice_index = None
+    
+    def load_voice(self, voice_name: str) -> np.ndarray:
+        """Load a voice embedding by name from the configured library backend"""
+        if self.voice_store is not None:
+            if voice_name not in self.voice_store:
+                raise FileNotFoundError(f"Voice not found: {voice_name}")
+            return self.voice_store.get(voice_name)
+        return self.load_voice_profile(self._profile_path(voice_name))
+    
+    def remove_voice(self, voice_name: str) -> bool:
+        """Remove a voice by name from the configured library backend"""
+        self._voice_index = None
+        self._enrollment_path(voice_name).unlink(missing_ok=True)
+        if self.voice_store is not None:
+            return self.voice_store.delete(voice_name)
+        return self.delete_voice_profile(self._profile_path(voice_name))
+    
+    def list_voices(self) -> List[str]:
+        """List stored voice names without loading embeddings"""
+        if self.voice_store is not None:
+            return self.voice_store.list_voices()
+        return sorted(path.stem for path in self.config.voices_dir.glob("*.npz"))
     
-    def save_voice_profile(self, embedding: np.ndarray, output_path: str, voice_name: str):
-        """Save voice profile with metadata"""
+    def find_similar_voices(self, embedding: np.ndarray, k: int = 5,
+                            approximate: Optional[bool] = None) -> List[Tuple[str, float]]:
+        """
+        Find the stored voices closest to an embedding by cosine similarity.
+        
+        Args:
+            embedding: Query embedding vector
+            k: Number of results
+            approximate: Use the IVF index; defaults to True for libraries of
+                at least ``model.ann_min_library_size`` voices
+            
+        Returns:
+            List of (voice_name, similarity), most similar first
+        """
+        index = self.voice_index()
+        if approximate is None:
+            approximate = len(index) >= self.config.model.ann_min_library_size
+        
+        if approximate:
+            if index.centroids is None:
+                index.build_ivf()
+            return index.search(embedding, k, nprobe=self.config.model.ann_nprobe)
+        return index.search(embedding, k)
+    
+    def find_duplicate_voices(self, threshold: float = 0.95) -> List[Tuple[str, str, float]]:
+        """Report pairs of stored voices with cosine similarity at or above threshold"""
+        return self.voice_index().find_duplicates(threshold)
+    
+    def voice_index(self) -> VoiceIndex:
+        """Build (or reuse) the similarity index over the whole voice library"""
+        if self._voice_index is None:
+            if self.voice_store is not None:
+                rows = self.voice_store.live_rows()
+                names = sorted(rows, key=rows.get)
+                matrix = self.voice_store.matrix()[[rows[name] for name in names]]
+            else:
+                names = self.list_voices()
+                matrix = np.stack([self.load_voice(name) for name in names]) if names else np.zeros((0, 512))
+            self._voice_index = VoiceIndex(names, matrix)
+        return self._voice_index
+    
+    def load_enrollment(self, voice_name: str) -> Optional[VoiceEnrollment]:
+        """Enrollment state of a voice, or None if it was stored without one"""
+        path = self._enrollment_path(voice_name)
+        if not path.exists():
+            return None
+        return VoiceEnrollment.load(path)
+    
+    def store_enrollment(self, voice_name: str, enrollment: VoiceEnrollment,
+                         source_stats: Optional[Dict[str, Any]] = None):
+        """Persist enrollment state and store its mean as the voice's embedding"""
+        enrollment.dtype = self.config.embedding_storage_dtype
+        self.store_voice(voice_name, enrollment.embedding, source_stats)
+        enrollment.save(self._enrollment_path(voice_name))
+    
+    def _enrollment_path(self, voice_name: str) -> Path:
+        """Path of the voice's enrollment state (segment vectors and running statistics)"""
+        return self.config.voices_dir / "enrollment" / f"{voice_name}.npz"
+    
+    def _profile_path(self, voice_name: str) -> Path:
+        """Path of the per-voice .npz profile"""
+        return self.config.voices_dir / f"{voice_name}.npz"
+    
+    def save_voice_profile(self, embedding: np.ndarray, output_path: str, voice_name: str,
+                           dtype: Optional[str] = None):
+        """Save voice profile with metadata, stored as dtype (defaults to embedding_storage_dtype)"""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Save embedding and metadata
-        np.savez(output_path, 
-                 embedding=embedding,
-                 voice_name=voice_name,
-                 version='1.0')
+        save_profile(output_path, embedding, voice_name, dtype or self.config.embedding_storage_dtype)
+        self.profile_cache.invalidate(output_path.stem)
         
         logger.info(f"Voice profile saved: {output_path}")
     
@@ -45,7 +204,26 @@ class VoiceEmbedder:
         if not profile_path.exists():
             raise FileNotFoundError(f"Voice profile not found: {profile_path}")
         
-        data = np.load(profile_path)
-        embedding = data['embedding']
+        # Cached by voice name; a rewritten profile gets a new mtime and misses
+        mtime_ns = profile_path.stat().st_mtime_ns
+        return self.profile_cache.get(profile_path.stem, mtime_ns,
+                                      lambda: self._read_voice_profile(profile_path))
+    
+    def delete_voice_profile(self, profile_path: str) -> bool:
+        """Delete a voice profile and drop it from the cache"""
+        profile_path = Path(profile_path)
+        self.profile_cache.invalidate(profile_path.stem)
+        
+        if not profile_path.exists():
+            return False
+        
+        profile_path.unlink()
+        logger.info(f"Voice profile deleted: {profile_path}")
+        return True
+    
+    def _read_voice_profile(self, profile_path: Path) -> np.ndarray:
+        """Read the embedding from a profile file on disk, decoding fp16/int8 storage"""
+        with np.load(profile_path) as data:
+            embedding = read_profile_embedding(data)
         logger.info(f"Loaded voice profile: {profile_path}")
         return embedding
@@ -0,0 +1,118 @@
+import logging
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return a float32 copy of matrix with unit-length rows"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class VoiceIndex:
+    """Cosine-similarity index over voice embeddings with an optional IVF approximation"""
+
+    def __init__(self, names: Sequence[str], embeddings: np.ndarray):
+        self.names = list(names)
+        self.vectors = normalize_rows(embeddings).reshape(len(self.names), -1)
+
+        # Inverted-file structure, built on demand by build_ivf()
+        self.centroids: Optional[np.ndarray] = None
+        self.list_offsets: Optional[np.ndarray] = None
+        self.list_members: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: np.ndarray, k: int = 5, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Find the k voices most similar to query.
+
+        Args:
+            query: Embedding vector to search for
+            k: Number of results
+            nprobe: Number of IVF lists to scan; None searches exhaustively
+
+        Returns:
+            List of (voice_name, cosine_similarity), most similar first
+        """
+        if len(self) == 0:
+            return []
+        q = normalize_rows(query.reshape(1, -1))[0]
+
+        if nprobe is None or self.centroids is None:
+            scores = self.vectors @ q
+            order = top_k(scores, k)
+            return [(self.names[i], float(scores[i])) for i in order]
+
+        probe = top_k(self.centroids @ q, nprobe)
+        candidates = np.concatenate([
+            self.list_members[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probe
+        ])
+        scores = self.vectors[candidates] @ q
+        order = top_k(scores, k)
+        return [(self.names[candidates[i]], float(scores[i])) for i in order]
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10,
+                  sample_size: int = 50000, seed: int = 0):
+        """Cluster vectors with spherical k-means and build inverted lists"""
+        n = len(self)
+        if n == 0:
+            return
+        n_lists = min(n_lists or max(int(4 * np.sqrt(n)), 1), n)
+        rng = np.random.default_rng(seed)
+
+        sample = self.vectors[rng.choice(n, size=min(sample_size, n), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = normalize_rows(sums)
+
+        # Assign all vectors in blocks to keep the score matrix bounded
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 8192):
+            assign[start:start + 8192] = np.argmax(self.vectors[start:start + 8192] @ centroids.T, axis=1)
+
+        self.centroids = centroids
+        self.list_members = np.argsort(assign, kind='stable')
+        self.list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+        logger.info(f"Built IVF voice index: voices={n}, lists={n_lists}")
+
+    def find_duplicates(self, threshold: float = 0.95, block_size: int = 2048) -> List[Tuple[str, str, float]]:
+        """
+        Report every pair of voices whose cosine similarity is at least threshold.
+
+        Similarities are computed over the upper triangle in square tiles,
+        so memory stays at ``block_size ** 2`` floats (16 MB by default)
+        regardless of library size.
+        """
+        pairs = []
+        n = len(self)
+        for row_start in range(0, n, block_size):
+            rows_block = self.vectors[row_start:row_start + block_size]
+            for col_start in range(row_start, n, block_size):
+                tile = rows_block @ self.vectors[col_start:col_start + block_size].T
+                rows, cols = np.nonzero(tile >= threshold)
+                if col_start == row_start:
+                    keep = cols > rows  # diagonal tile: upper triangle only, excluding self-matches
+                    rows, cols = rows[keep], cols[keep]
+                for r, c in zip(rows, cols):
+                    pairs.append((self.names[row_start + r], self.names[col_start + c], float(tile[r, c])))
+        pairs.sort(key=lambda pair: -pair[2])
+        return pairs
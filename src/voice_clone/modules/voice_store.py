@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+from .embedding_codec import dequantize_embeddings, quantize_embeddings, read_profile_embedding, storage_dtype
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 512
+INDEX_FORMAT = 2  # format 1 stores had no dtype and are always fp32
+
+# Data files of any generation: library[_scales][.<generation>].<ext>
+_DATA_FILE = re.compile(r"library(_scales)?(\.\d+)?\.(f32|f16|i8)")
+
+
+class VoiceStore:
+    """
+    Voice library backed by one memory-mapped embedding matrix.
+
+    Embeddings live as consecutive rows of ``library.f32`` (``library.f16``
+    or ``library.i8`` for half-precision and int8 stores, the latter with
+    per-row scales in ``library_scales.f32``); the sidecar
+    ``library_index.json`` maps voice names to rows plus metadata. Deletes
+    and overwrites tombstone the old row, and ``compact`` rewrites the
+    matrix without them. The storage dtype is fixed when the store is
+    created.
+
+    Compaction writes the live rows to a new generation of data files
+    (``library.<n>.f32``, ...) and switches to it by atomically replacing
+    the index, which names the generation in use, so a crash at any point
+    leaves either the old or the new library intact. Data files are never
+    replaced while mapped, which Windows does not allow; superseded
+    generations are deleted once unmapped, or on the next open.
+    """
+
+    MATRIX_FILES = {"fp32": "library.f32", "fp16": "library.f16", "int8": "library.i8"}
+    SCALES_FILE = "library_scales.f32"
+    INDEX_FILE = "library_index.json"
+
+    def __init__(self, store_dir: Path, dim: int = EMBEDDING_DIM, dtype: str = "fp32"):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.store_dir / self.INDEX_FILE
+        self.dim = dim
+        storage_dtype(dtype)
+
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._decoded: Optional[np.ndarray] = None
+        self._index = self._read_index(dtype)
+        self.dtype = self._index['dtype']
+        if self.dtype != dtype:
+            logger.warning(f"Voice store at {self.store_dir} holds {self.dtype} embeddings; ignoring requested {dtype}")
+        self._remove_stale_generations()
+
+    @property
+    def matrix_path(self) -> Path:
+        """Embedding matrix file of the current generation"""
+        return self._data_path(self.MATRIX_FILES[self.dtype], self._index['generation'])
+
+    @property
+    def scales_path(self) -> Path:
+        """Per-row scales file of the current generation (int8 stores only)"""
+        return self._data_path(self.SCALES_FILE, self._index['generation'])
+
+    def __len__(self) -> int:
+        return len(self._index['voices'])
+
+    def __contains__(self, voice_name: str) -> bool:
+        return voice_name in self._index['voices']
+
+    def list_voices(self) -> List[str]:
+        """List voice names from the index without touching embedding data"""
+        return sorted(self._index['voices'])
+
+    def get_metadata(self, voice_name: str) -> Dict[str, Any]:
+        """Return the index record for a voice"""
+        try:
+            return dict(self._index['voices'][voice_name])
+        except KeyError:
+            raise KeyError(f"Voice not found in store: {voice_name}") from None
+
+    def get(self, voice_name: str) -> np.ndarray:
+        """Return the voice's float32 embedding (a zero-copy view for fp32 stores)"""
+        with self._lock:
+            row = self.get_metadata(voice_name)['row']
+            if self.dtype == "fp32":
+                return self.raw_matrix()[row]
+            if self._decoded is not None and row < self._decoded.shape[0]:
+                return self._decoded[row]
+            # Rows appended since the last matrix() call are decoded one at a time
+            scales = self.scales()
+            return dequantize_embeddings(self.raw_matrix()[row], scales[row] if scales is not None else None)
+
+    def matrix(self) -> np.ndarray:
+        """
+        Return the full (rows, dim) float32 matrix, tombstoned rows included.
+
+        fp32 stores return the memory map itself; fp16/int8 stores are
+        decoded in one vectorized pass and the result kept. Rows are only
+        ever appended between compactions, so later calls decode just the
+        new rows.
+        """
+        with self._lock:
+            if self.dtype == "fp32":
+                return self.raw_matrix()
+            rows = self._index['rows']
+            decoded = 0 if self._decoded is None else self._decoded.shape[0]
+            if decoded != rows:
+                scales = self.scales()
+                new = dequantize_embeddings(self.raw_matrix()[decoded:],
+                                            scales[decoded:] if scales is not None else None)
+                self._decoded = new if self._decoded is None else np.concatenate([self._decoded, new])
+            return self._decoded
+
+    def raw_matrix(self) -> np.ndarray:
+        """Return the (rows, dim) memory map in the storage dtype"""
+        with self._lock:
+            rows = self._index['rows']
+            if self._matrix is None or self._matrix.shape[0] != rows:
+                if rows == 0:
+                    return np.zeros((0, self.dim), dtype=storage_dtype(self.dtype))
+                self._matrix = np.memmap(self.matrix_path, dtype=storage_dtype(self.dtype), mode='r',
+                                         shape=(rows, self.dim))
+            return self._matrix
+
+    def scales(self) -> Optional[np.ndarray]:
+        """Per-row float32 scales of an int8 store (None for other dtypes)"""
+        if self.dtype != "int8":
+            return None
+        with self._lock:
+            rows = self._index['rows']
+            if self._scales is None or self._scales.shape[0] != rows:
+                if rows == 0:
+                    return np.zeros(0, dtype=np.float32)
+                self._scales = np.memmap(self.scales_path, dtype=np.float32, mode='r', shape=(rows,))
+            return self._scales
+
+    def live_rows(self) -> Dict[str, int]:
+        """Map each live voice name to its matrix row"""
+        return {name: record['row'] for name, record in self._index['voices'].items()}
+
+    def append(self, voice_name: str, embedding: np.ndarray,
+               source_stats: Optional[Dict[str, Any]] = None) -> int:
+        """Append an embedding, tombstoning any previous row for the same voice"""
+        embedding = np.ascontiguousarray(embedding, dtype=np.float32).reshape(-1)
+        if embedding.shape[0] != self.dim:
+            raise ValueError(f"Embedding must have {self.dim} dimensions, got {embedding.shape[0]}")
+        values, scale = quantize_embeddings(embedding, self.dtype)
+
+        with self._lock:
+            if scale is not None:
+                self._append_bytes(self.scales_path, scale.tobytes())
+            self._append_bytes(self.matrix_path, values.tobytes())
+
+            row = self._index['rows']
+            self._index['rows'] = row + 1
+            previous = self._index['voices'].get(voice_name)
+            if previous is not None:
+                self._index['tombstones'].append(previous['row'])
+
+            self._index['voices'][voice_name] = {
+                'row': row,
+                'version': previous['version'] + 1 if previous else 1,
+                'created': time.time(),
+                'source': source_stats or {},
+            }
+            self._write_index()
+
+        logger.info(f"Voice stored: {voice_name} (row {row})")
+        return row
+
+    def delete(self, voice_name: str) -> bool:
+        """Tombstone a voice; its row is reclaimed by compact()"""
+        with self._lock:
+            record = self._index['voices'].pop(voice_name, None)
+            if record is None:
+                return False
+            self._index['tombstones'].append(record['row'])
+            self._write_index()
+
+        logger.info(f"Voice deleted from store: {voice_name}")
+        return True
+
+    def compact(self) -> int:
+        """Rewrite the matrix with live rows only; returns the number of rows reclaimed"""
+        with self._lock:
+            reclaimed = len(self._index['tombstones'])
+            if reclaimed == 0:
+                return 0
+
+            names = sorted(self._index['voices'], key=lambda name: self._index['voices'][name]['row'])
+            old_rows = np.array([self._index['voices'][name]['row'] for name in names], dtype=np.int64)
+            generation = self._index['generation'] + 1
+            self._write_data(self._data_path(self.MATRIX_FILES[self.dtype], generation),
+                             self.raw_matrix()[old_rows])
+            if self.dtype == "int8":
+                self._write_data(self._data_path(self.SCALES_FILE, generation), self.scales()[old_rows])
+
+            # The index swap is the commit point; until then the old generation is current
+            index = json.loads(json.dumps(self._index))
+            for new_row, name in enumerate(names):
+                index['voices'][name]['row'] = new_row
+            index['rows'] = len(names)
+            index['tombstones'] = []
+            index['generation'] = generation
+            self._write_index(index)
+            self._index = index
+
+            self._matrix = self._scales = self._decoded = None
+            self._remove_stale_generations()
+
+        logger.info(f"Voice store compacted: reclaimed {reclaimed} rows")
+        return reclaimed
+
+    def import_npz(self, voices_dir: Path, overwrite: bool = False) -> int:
+        """Import existing per-voice .npz profiles; returns the number imported"""
+        imported = 0
+        for profile_path in sorted(Path(voices_dir).glob("*.npz")):
+            voice_name = profile_path.stem
+            if voice_name in self and not overwrite:
+                continue
+            with np.load(profile_path) as data:
+                embedding = read_profile_embedding(data)
+                version = str(data['version']) if 'version' in data else None
+            stat = profile_path.stat()
+            self.append(voice_name, embedding, {
+                'imported_from': profile_path.name,
+                'profile_version': version,
+                'profile_mtime': stat.st_mtime,
+            })
+            imported += 1
+
+        logger.info(f"Imported {imported} voice profiles from {voices_dir}")
+        return imported
+
+    def _read_index(self, dtype: str) -> Dict[str, Any]:
+        """Load the sidecar index, or start an empty one storing dtype"""
+        if not self.index_path.exists():
+            return {'format': INDEX_FORMAT, 'dim': self.dim, 'dtype': dtype, 'rows': 0,
+                    'generation': 0, 'tombstones': [], 'voices': {}}
+
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('dim') != self.dim:
+            raise ValueError(f"Voice store dimension mismatch: {index.get('dim')} != {self.dim}")
+        index.setdefault('dtype', "fp32")
+        index.setdefault('generation', 0)
+        index['format'] = INDEX_FORMAT
+
+        # Rows appended after the last index write are orphaned; ignore them
+        generation = index['generation']
+        sizes = [(self._data_path(self.MATRIX_FILES[index['dtype']], generation),
+                  self.dim * storage_dtype(index['dtype']).itemsize)]
+        if index['dtype'] == "int8":
+            sizes.append((self._data_path(self.SCALES_FILE, generation), 4))
+        for path, row_bytes in sizes:
+            expected = index['rows'] * row_bytes
+            if path.exists() and path.stat().st_size > expected:
+                with open(path, 'r+b') as f:
+                    f.truncate(expected)
+        return index
+
+    @staticmethod
+    def _append_bytes(path: Path, data: bytes):
+        """Append and fsync, so a row is durable before the index points at it"""
+        with open(path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _data_path(self, file_name: str, generation: int) -> Path:
+        """Path of a data file in the given generation (generation 0 keeps the plain name)"""
+        if generation == 0:
+            return self.store_dir / file_name
+        stem, ext = file_name.rsplit('.', 1)
+        return self.store_dir / f"{stem}.{generation}.{ext}"
+
+    @staticmethod
+    def _write_data(path: Path, array: np.ndarray):
+        """Write a new data file and fsync it, so it is durable before the index names it"""
+        with open(path, 'wb') as f:
+            f.write(np.ascontiguousarray(array).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _remove_stale_generations(self):
+        """Delete data files the index doesn't use: superseded or half-written generations"""
+        current = {self.matrix_path.name, self.scales_path.name}
+        for path in self.store_dir.iterdir():
+            if path.name in current or not _DATA_FILE.fullmatch(path.name):
+                continue
+            try:
+                path.unlink()
+            except OSError as e:
+                # Still mapped here (rows from get()) or by another process; retried on next open
+                logger.debug(f"Keeping stale voice store file {path.name}: {e}")
+
+    def _write_index(self, index: Optional[Dict[str, Any]] = None):
+        """Atomically persist the sidecar index"""
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index if index is None else index, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,148 @@
+import logging
+import struct
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bytes per sample for each supported PCM bit depth
+SAMPLE_WIDTHS = {16: 2, 24: 3}
+
+# Placeholder size used when a non-seekable stream can't be patched at close
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def wav_header(sample_rate: int, bit_depth: int, channels: int, data_bytes: int) -> bytes:
+    """Canonical 44-byte PCM WAV header"""
+    width = SAMPLE_WIDTHS[bit_depth]
+    riff_size = _UNKNOWN_SIZE if data_bytes == _UNKNOWN_SIZE else 36 + data_bytes
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', riff_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * channels * width, channels * width, bit_depth,
+        b'data', data_bytes,
+    )
+
+
+class WavWriter:
+    """
+    Incremental PCM WAV writer for files and binary streams.
+
+    Float chunks are scaled, optionally TPDF-dithered, rounded and clipped
+    in place in a reusable scratch buffer, then packed into a reusable
+    integer buffer and written straight from memory; 24-bit output is true
+    packed 3-byte PCM. When ``total_frames`` is known the header is exact
+    from the start, otherwise it is patched on close (seekable targets) or
+    left with the conventional 0xFFFFFFFF "unknown" sizes (pipes, sockets).
+    """
+
+    def __init__(self, target: Union[str, Path, BinaryIO], sample_rate: int,
+                 bit_depth: int = 16, channels: int = 1, gain: float = 1.0,
+                 dither: bool = False, total_frames: Optional[int] = None, seed: Optional[int] = None):
+        if bit_depth not in SAMPLE_WIDTHS:
+            raise ValueError(f"Unsupported bit depth: {bit_depth}")
+
+        if isinstance(target, (str, Path)):
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            self._stream: BinaryIO = open(target, 'wb')
+            self._owns_stream = True
+        else:
+            self._stream = target
+            self._owns_stream = False
+
+        self.sample_rate = sample_rate
+        self.bit_depth = bit_depth
+        self.channels = channels
+        self.gain = gain
+        self.dither = dither
+        self.frames_written = 0
+        self.closed = False
+
+        self._width = SAMPLE_WIDTHS[bit_depth]
+        self._full_scale = float(2 ** (bit_depth - 1) - 1)
+        self._int_dtype = np.int16 if bit_depth == 16 else np.int32
+        self._rng = np.random.default_rng(seed) if dither else None
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._noise = np.empty(0, dtype=np.float32)
+        self._ints = np.empty(0, dtype=self._int_dtype)
+        self._packed = np.empty(0, dtype=np.uint8)
+
+        try:
+            self._start = self._stream.tell() if self._stream.seekable() else None
+        except (AttributeError, OSError):
+            self._start = None
+        self._declared_frames = total_frames
+        data_bytes = total_frames * channels * self._width if total_frames is not None else _UNKNOWN_SIZE
+        self._stream.write(wav_header(sample_rate, bit_depth, channels, data_bytes))
+
+    def __enter__(self) -> "WavWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, chunk: np.ndarray):
+        """Quantize and append a (frames,) or (frames, channels) float chunk"""
+        if self.closed:
+            raise ValueError("WavWriter is closed")
+        frames = chunk.shape[0]
+        if frames == 0:
+            return
+        n = frames * self.channels
+        self._reserve(n)
+
+        scratch = self._scratch[:n].reshape(frames, self.channels)
+        source = chunk.reshape(frames, -1)
+        np.multiply(source, self.gain * self._full_scale, out=scratch, casting='unsafe')
+        if self._rng is not None:
+            # Triangular (TPDF) dither of +/-1 LSB
+            noise = self._noise[:n].reshape(frames, self.channels)
+            self._rng.random(out=noise, dtype=np.float32)
+            scratch += noise
+            self._rng.random(out=noise, dtype=np.float32)
+            scratch -= noise
+        np.rint(scratch, out=scratch)
+        np.clip(scratch, -self._full_scale - 1, self._full_scale, out=scratch)
+
+        ints = self._ints[:n]
+        ints[:] = self._scratch[:n]
+        if self.bit_depth == 24:
+            # Low three bytes of each little-endian int32
+            packed = self._packed[:n * 3].reshape(n, 3)
+            packed[:] = ints.view(np.uint8).reshape(n, 4)[:, :3]
+            self._stream.write(memoryview(packed).cast('B'))
+        else:
+            self._stream.write(memoryview(ints).cast('B'))
+        self.frames_written += frames
+
+    def close(self):
+        """Finish the file, patching the RIFF/data sizes when possible"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            data_bytes = self.frames_written * self.channels * self._width
+            if self._declared_frames != self.frames_written and self._start is not None:
+                end = self._stream.tell()
+                self._stream.seek(self._start)
+                self._stream.write(wav_header(self.sample_rate, self.bit_depth, self.channels, data_bytes))
+                self._stream.seek(end)
+            elif self._declared_frames not in (None, self.frames_written):
+                logger.warning("WAV header size mismatch on non-seekable stream")
+            self._stream.flush()
+        finally:
+            if self._owns_stream:
+                self._stream.close()
+
+    def _reserve(self, n: int):
+        """Grow scratch buffers to hold n samples"""
+        if len(self._scratch) >= n:
+            return
+        self._scratch = np.empty(n, dtype=np.float32)
+        self._ints = np.empty(n, dtype=self._int_dtype)
+        if self._rng is not None:
+            self._noise = np.empty(n, dtype=np.float32)
+        if self.bit_depth == 24:
+            self._packed = np.empty(n * 3, dtype=np.uint8)
@@ -0,0 +1,3 @@
+from .service import SynthesisServer, run_server
+
+__all__ = ["SynthesisServer", "run_server"]
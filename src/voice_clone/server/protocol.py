@@ -0,0 +1,188 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {
+    101: "Switching Protocols",
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+# WebSocket opcodes and close codes (RFC 6455)
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+CLOSE_NORMAL, CLOSE_INTERNAL_ERROR, CLOSE_TRY_AGAIN_LATER = 1000, 1011, 1013
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class HttpError(Exception):
+    """Request failure mapped to an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    """A parsed HTTP/1.1 request"""
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes = b""
+    version: str = "HTTP/1.1"
+    _json: Any = field(default=None, repr=False)
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    @property
+    def is_websocket(self) -> bool:
+        return self.headers.get("upgrade", "").lower() == "websocket"
+
+    def json(self) -> Any:
+        """Decoded JSON body; raises HttpError(400) if malformed"""
+        if self._json is None:
+            try:
+                self._json = json.loads(self.body or b"{}")
+            except ValueError as e:
+                raise HttpError(400, f"Invalid JSON body: {e}")
+        return self._json
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int = MAX_BODY_BYTES) -> Optional[Request]:
+    """Read one request from a connection; None when the client closed it"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HttpError(400, "Truncated request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, "Request header too large")
+    if len(head) > MAX_HEADER_BYTES:
+        raise HttpError(413, "Request header too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, f"Malformed request line: {lines[0]!r}")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length")
+    if length > max_body:
+        raise HttpError(413, f"Request body exceeds {max_body} bytes")
+    body = await reader.readexactly(length) if length else b""
+
+    url = urlsplit(target)
+    return Request(method=method.upper(), path=url.path, query=dict(parse_qsl(url.query)),
+                   headers=headers, body=body, version=version)
+
+
+def encode_response(status: int, body: bytes = b"", content_type: str = "application/json",
+                    keep_alive: bool = True, headers: Optional[Dict[str, str]] = None) -> bytes:
+    """Serialize a complete HTTP/1.1 response"""
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+             f"Content-Type: {content_type}",
+             f"Content-Length: {len(body)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def json_response(status: int, payload: Any, keep_alive: bool = True,
+                  headers: Optional[Dict[str, str]] = None) -> bytes:
+    return encode_response(status, json.dumps(payload).encode("utf-8"), keep_alive=keep_alive,
+                           headers=headers)
+
+
+def websocket_handshake(request: Request) -> bytes:
+    """101 response accepting a WebSocket upgrade"""
+    key = request.headers.get("sec-websocket-key")
+    if not key or request.headers.get("sec-websocket-version") != "13":
+        raise HttpError(400, "Invalid WebSocket handshake")
+    accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+    return ("HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("ascii")
+
+
+def encode_frame(opcode: int, payload: bytes = b"", mask: bool = False) -> bytes:
+    """Serialize one final WebSocket frame (clients must mask, servers must not)"""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, (0x80 if mask else 0) | n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, (0x80 if mask else 0) | 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, (0x80 if mask else 0) | 127, n)
+    if not mask:
+        return header + payload
+    key = os.urandom(4)
+    return header + key + _apply_mask(payload, key)
+
+
+def close_frame(code: int = CLOSE_NORMAL, reason: str = "") -> bytes:
+    return encode_frame(OP_CLOSE, struct.pack("!H", code) + reason.encode("utf-8")[:120])
+
+
+async def read_message(reader: asyncio.StreamReader, max_size: int = MAX_BODY_BYTES) -> Tuple[int, bytes]:
+    """Read one (possibly fragmented) WebSocket message as (opcode, payload)"""
+    opcode, chunks, size = None, [], 0
+    while True:
+        first, second = await reader.readexactly(2)
+        frame_opcode, fin = first & 0x0F, bool(first & 0x80)
+        n = second & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await reader.readexactly(8))[0]
+        key = await reader.readexactly(4) if second & 0x80 else None
+        size += n
+        if size > max_size:
+            raise HttpError(413, "WebSocket message too large")
+        payload = await reader.readexactly(n)
+        if key:
+            payload = _apply_mask(payload, key)
+        if frame_opcode >= OP_CLOSE:
+            return frame_opcode, payload  # control frames are never fragmented
+        if frame_opcode != OP_CONTINUATION:
+            opcode = frame_opcode
+        chunks.append(payload)
+        if fin:
+            return opcode, b"".join(chunks)
+
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    """XOR payload with the repeating 4-byte mask key"""
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, "little") ^ int.from_bytes(repeated, "little")).to_bytes(len(payload), "little")
@@ -0,0 +1,407 @@
+import asyncio
+import ipaddress
+import io
+import json
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Set
+import numpy as np
+from ..core.config import Config
+from ..core.progress import JobCancelled
+from ..utils.metrics import metrics
+from .protocol import (
+    CLOSE_INTERNAL_ERROR, CLOSE_NORMAL, CLOSE_TRY_AGAIN_LATER, OP_BINARY, OP_TEXT,
+    HttpError, Request, close_frame, encode_frame, encode_response, json_response,
+    read_message, read_request, websocket_handshake,
+)
+
+logger = logging.getLogger(__name__)
+
+# Chunks buffered between a streaming synthesis thread and its WebSocket
+STREAM_QUEUE_CHUNKS = 8
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class SynthesisServer:
+    """
+    Long-lived local synthesis service owning one VoiceCloneApp.
+
+    Endpoints (JSON bodies; loopback interface only):
+        GET  /health      - status, queue depth and counters
+        GET  /voices      - stored voice names
+        POST /synthesize  - {voice, text, speech_rate, pitch, tone, deadline_ms} -> audio/wav
+        GET  /stream      - WebSocket; send the same JSON as a text message, receive a
+                            JSON header, 16-bit PCM binary frames, then a JSON trailer
+
+    Synthesis runs on a thread pool of ``server.workers``. At most
+    ``workers + max_queue`` requests are admitted at once; the rest are
+    rejected immediately with 503 (HTTP) or close code 1013 (WebSocket)
+    rather than queueing without bound. Every request carries a deadline
+    covering queueing and synthesis; on expiry the worker is told to stop
+    at its next chunk and the client gets 504.
+    """
+
+    def __init__(self, config: Optional[Config] = None, app=None):
+        self.config = config or (app.config if app is not None else Config.load_config())
+        self.server_config = self.config.server
+        if not _is_loopback(self.server_config.host):
+            raise ValueError(f"Refusing to bind to non-loopback host: {self.server_config.host}")
+        if app is None:
+            from ..core.application import VoiceCloneApp
+            app = VoiceCloneApp(self.config)
+        self.app = app
+
+        self._executor = ThreadPoolExecutor(max_workers=self.server_config.workers,
+                                            thread_name_prefix="synthesis")
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._cancel_events: Set[threading.Event] = set()
+        self.admitted = 0
+        self.running = 0
+        self.draining = False
+        self.counters = {'completed': 0, 'rejected': 0, 'timed_out': 0, 'failed': 0}
+
+    @property
+    def port(self) -> int:
+        """Bound port (useful when configured with port 0)"""
+        return self._server.sockets[0].getsockname()[1] if self._server else self.server_config.port
+
+    async def start(self):
+        """Bind the listening socket and warm the engine up in the background"""
+        self._slots = asyncio.Semaphore(self.server_config.workers)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._stopped = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.server_config.host, self.server_config.port)
+        asyncio.get_running_loop().run_in_executor(self._executor, self.app.warm_up, False)
+        logger.info(f"Synthesis server listening on http://{self.server_config.host}:{self.port}")
+
+    async def serve_forever(self):
+        """Run until SIGINT/SIGTERM (or shutdown()), then drain gracefully"""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.shutdown()))
+            except (NotImplementedError, RuntimeError):
+                pass  # e.g. Windows or not on the main thread
+        await self._stopped.wait()
+
+    async def shutdown(self, drain_timeout: Optional[float] = None):
+        """
+        Stop accepting work, wait for admitted requests, then release the engine.
+
+        Requests still running after ``drain_timeout`` are cancelled at their
+        next chunk.
+        """
+        if self.draining:
+            return
+        self.draining = True
+        drain_timeout = self.server_config.drain_timeout_s if drain_timeout is None else drain_timeout
+        logger.info(f"Draining synthesis server: {self.admitted} requests in flight")
+        if self._server is not None:
+            self._server.close()
+        try:
+            await asyncio.wait_for(self._idle.wait(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Drain timed out; cancelling {self.admitted} requests")
+            for event in list(self._cancel_events):
+                event.set()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+        self.app.shutdown()
+        self._stopped.set()
+        logger.info("Synthesis server stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'status': 'draining' if self.draining else 'ok',
+            'admitted': self.admitted,
+            'running': self.running,
+            'queued': self.admitted - self.running,
+            'capacity': self.server_config.workers + self.server_config.max_queue,
+            **self.counters,
+        }
+
+    # Connection handling
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    writer.write(json_response(e.status, {'error': e.message}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+                if request.is_websocket:
+                    await self._handle_websocket(request, reader, writer)
+                    break
+                response = await self._dispatch(request)
+                writer.write(response)
+                await writer.drain()
+                if not request.keep_alive or self.draining:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    async def _dispatch(self, request: Request) -> bytes:
+        keep_alive = request.keep_alive and not self.draining
+        try:
+            if request.path == "/health" and request.method == "GET":
+                return json_response(200, self.stats(), keep_alive)
+            if request.path == "/voices" and request.method == "GET":
+                return json_response(200, {'voices': self.app.get_voice_list()}, keep_alive)
+            if request.path == "/metrics" and request.method == "GET":
+                return encode_response(200, metrics.to_prometheus().encode("utf-8"),
+                                       "text/plain; version=0.0.4", keep_alive)
+            if request.path == "/synthesize":
+                if request.method != "POST":
+                    raise HttpError(405, "Use POST")
+                params = self._parse_params(request.json())
+                wav = await self._admit_and_run(params, self._render_wav)
+                return encode_response(200, wav, "audio/wav", keep_alive)
+            raise HttpError(404, f"No route for {request.method} {request.path}")
+        except HttpError as e:
+            headers = {'Retry-After': '1'} if e.status == 503 else None
+            return json_response(e.status, {'error': e.message}, keep_alive, headers)
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            self.counters['failed'] += 1
+            return json_response(500, {'error': str(e)}, keep_alive)
+
+    async def _handle_websocket(self, request: Request, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter):
+        if request.path != "/stream":
+            writer.write(json_response(404, {'error': f"No WebSocket route {request.path}"}, False))
+            return
+        try:
+            writer.write(websocket_handshake(request))
+        except HttpError as e:
+            writer.write(json_response(e.status, {'error': e.message}, False))
+            return
+
+        try:
+            opcode, payload = await read_message(reader)
+            if opcode != OP_TEXT:
+                raise HttpError(400, "Expected a JSON text message")
+            try:
+                params = self._parse_params(json.loads(payload))
+            except ValueError as e:
+                raise HttpError(400, f"Invalid JSON message: {e}")
+
+            start = time.perf_counter()
+            samples = await self._admit_and_run(params, self._stream_pcm, writer)
+            trailer = {'done': True, 'samples': samples, 'elapsed': time.perf_counter() - start}
+            writer.write(encode_frame(OP_TEXT, json.dumps(trailer).encode("utf-8")))
+            writer.write(close_frame(CLOSE_NORMAL))
+        except HttpError as e:
+            code = CLOSE_TRY_AGAIN_LATER if e.status == 503 else CLOSE_INTERNAL_ERROR
+            writer.write(encode_frame(OP_TEXT, json.dumps({'error': e.message, 'status': e.status}).encode("utf-8")))
+            writer.write(close_frame(code, e.message))
+        except Exception as e:
+            logger.error(f"Stream failed: {e}")
+            self.counters['failed'] += 1
+            writer.write(close_frame(CLOSE_INTERNAL_ERROR, str(e)))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    # Admission, deadlines and execution
+
+    def _parse_params(self, body: Any) -> Dict[str, Any]:
+        if not isinstance(body, dict):
+            raise HttpError(400, "Expected a JSON object")
+        try:
+            params = {
+                'voice': str(body['voice']),
+                'text': str(body['text']),
+                'speech_rate': float(body.get('speech_rate', 1.0)),
+                'pitch': float(body.get('pitch', 0.0)),
+                'tone': str(body.get('tone', 'neutral')),
+                'deadline': min(float(body.get('deadline_ms', 1000 * self.server_config.default_deadline_s)) / 1000,
+                                self.server_config.max_deadline_s),
+            }
+        except KeyError as e:
+            raise HttpError(400, f"Missing field: {e.args[0]}")
+        except (TypeError, ValueError) as e:
+            raise HttpError(400, f"Invalid field: {e}")
+        if not params['text'].strip():
+            raise HttpError(400, "Text is empty")
+        if len(params['text']) > self.server_config.max_text_chars:
+            raise HttpError(413, f"Text exceeds {self.server_config.max_text_chars} characters")
+        if not self.app.synthesis_engine.validate_parameters(params['speech_rate'], params['pitch']):
+            raise HttpError(400, "speech_rate or pitch out of range")
+        if params['tone'] not in self.app.synthesis_engine.get_available_tones():
+            raise HttpError(400, f"Unknown tone: {params['tone']}")
+        return params
+
+    async def _admit_and_run(self, params: Dict[str, Any], handler: Callable, *args) -> Any:
+        """Admit a request (or reject with 503), then run handler under its deadline"""
+        capacity = self.server_config.workers + self.server_config.max_queue
+        if self.draining or self.admitted >= capacity:
+            self.counters['rejected'] += 1
+            raise HttpError(503, "Server is draining" if self.draining else "Server busy; retry later")
+        self.admitted += 1
+        self._idle.clear()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + params['deadline']
+        cancel = threading.Event()
+        self._cancel_events.add(cancel)
+        try:
+            result = await handler(params, cancel, deadline, *args)
+            self.counters['completed'] += 1
+            return result
+        except asyncio.TimeoutError:
+            cancel.set()
+            self.counters['timed_out'] += 1
+            raise HttpError(504, f"Deadline of {params['deadline']:.1f}s exceeded")
+        except BaseException:
+            cancel.set()
+            raise
+        finally:
+            self._cancel_events.discard(cancel)
+            self.admitted -= 1
+            if self.admitted == 0:
+                self._idle.set()
+
+    async def _acquire_slot(self, deadline: float):
+        loop = asyncio.get_running_loop()
+        await asyncio.wait_for(self._slots.acquire(), max(deadline - loop.time(), 0))
+
+    def _start_job(self, fn: Callable, *args) -> asyncio.Future:
+        """Run fn on the synthesis pool; the slot is released when the thread finishes"""
+        self.running += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+        def _release(done: asyncio.Future):
+            self.running -= 1
+            self._slots.release()
+            if not done.cancelled():
+                done.exception()  # abandoned after a timeout; don't log it as unretrieved
+        future.add_done_callback(_release)
+        return future
+
+    async def _render_wav(self, params: Dict[str, Any], cancel: threading.Event, deadline: float) -> bytes:
+        await self._acquire_slot(deadline)
+        future = self._start_job(self._synthesize_wav, params, cancel)
+        loop = asyncio.get_running_loop()
+        # shield: on timeout the thread keeps its slot until it notices `cancel`
+        return await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+
+    def _synthesize_wav(self, params: Dict[str, Any], cancel: threading.Event) -> bytes:
+        """Worker thread: render the full clip and encode it as an in-memory WAV"""
+        try:
+            chunks = []
+            for chunk in self.app.synthesize_speech_stream(params['voice'], params['text'], params['speech_rate'],
+                                                           params['pitch'], params['tone'],
+                                                           self.server_config.stream_chunk_size):
+                if cancel.is_set():
+                    raise JobCancelled(params['voice'])
+                chunks.append(chunk)
+        except FileNotFoundError:
+            raise HttpError(404, f"Voice not found: {params['voice']}")
+        waveform = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        buffer = io.BytesIO()
+        if not self.app.audio_handler.export_wav((waveform, self.config.audio.sample_rate), buffer,
+                                                 self.config.audio.bit_depth):
+            raise RuntimeError("WAV encoding failed")
+        return buffer.getvalue()
+
+    async def _stream_pcm(self, params: Dict[str, Any], cancel: threading.Event, deadline: float,
+                          writer: asyncio.StreamWriter) -> int:
+        """Pump PCM chunks from a worker thread to the socket through a bounded queue"""
+        # Only admitted requests get a header; a rejected one sees just the error
+        header = {'sample_rate': self.config.audio.sample_rate, 'channels': 1, 'format': 'pcm_s16le'}
+        writer.write(encode_frame(OP_TEXT, json.dumps(header).encode("utf-8")))
+        loop = asyncio.get_running_loop()
+        await self._acquire_slot(deadline)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+        producer = self._start_job(self._produce_pcm, params, cancel, queue, loop)
+        samples = 0
+        try:
+            while True:
+                get = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({get, producer}, timeout=max(deadline - loop.time(), 0),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if get not in done:
+                    if not done:
+                        get.cancel()
+                        raise asyncio.TimeoutError()
+                    if producer.exception() is not None:
+                        get.cancel()
+                        raise producer.exception()
+                    await get  # producer finished cleanly, so its end marker is queued
+                item = get.result()
+                if item is None:
+                    break
+                writer.write(encode_frame(OP_BINARY, item))
+                samples += len(item) // 2
+                # Socket backpressure, bounded by the deadline so a stalled client can't hold a slot
+                await asyncio.wait_for(writer.drain(), max(deadline - loop.time(), 0))
+            await producer
+            return samples
+        finally:
+            cancel.set()
+
+    def _produce_pcm(self, params: Dict[str, Any], cancel: threading.Event, queue: asyncio.Queue,
+                     loop: asyncio.AbstractEventLoop):
+        """Worker thread: synthesize and convert chunks, blocking while the queue is full"""
+        try:
+            for chunk in self.app.synthesize_speech_stream(params['voice'], params['text'], params['speech_rate'],
+                                                           params['pitch'], params['tone'],
+                                                           self.server_config.stream_chunk_size):
+                pcm = (np.clip(chunk, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+                if not self._put(queue, pcm, cancel, loop):
+                    return
+        except FileNotFoundError:
+            raise HttpError(404, f"Voice not found: {params['voice']}")
+        self._put(queue, None, cancel, loop)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, item: Any, cancel: threading.Event, loop: asyncio.AbstractEventLoop) -> bool:
+        """Blocking put from a worker thread; gives up once the request is cancelled"""
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except FutureTimeout:
+                if cancel.is_set():
+                    future.cancel()
+                    return False
+
+
+def run_server(config: Optional[Config] = None):
+    """Run a SynthesisServer on the current thread until interrupted"""
+    asyncio.run(SynthesisServer(config).serve_forever())
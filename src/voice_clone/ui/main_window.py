@@ -3,12 +3,16 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QLineEdit, QTextEdit, QSlider,
     QListWidget, QListWidgetItem, QFileDialog, QSpinBox,
-    QDoubleSpinBox, QComboBox, QProgressBar, QMessageBox
+    QDoubleSpinBox, QComboBox, QProgressBar, QMessageBox,
+    QDockWidget, QPlainTextEdit
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
+from PyQt6.QtGui import QFontDatabase
 from pathlib import Path
 from ..core.application import VoiceCloneApp
 from ..core.config import Config
+from ..utils.metrics import format_snapshot, metrics
+from .workers import Job, JobQueue
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +24,20 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.config = Config.load_config()
         self.app = VoiceCloneApp(self.config)
+        self.job_queue = JobQueue(self)
+        self.job_queue.queue_changed.connect(self.on_queue_changed)
+        # Previews play on their own thread so they never wait behind queued exports
+        self.preview_pool = QThreadPool(self)
+        self.preview_pool.setMaxThreadCount(1)
+        self.preview_job = None
         
         self.setWindowTitle("Voice Clone - Professional Voice Synthesis")
         self.setGeometry(100, 100, self.config.ui.window_width, self.config.ui.window_height)
         
         self.init_ui()
+        
+        # Load models in the background so the window appears immediately
+        self.app.warm_up(background=True)
         logger.info("Main window initialized")
     
     def init_ui(self):
@@ -87,9 +100,9 @@ class MainWindow(QMainWindow):
         
         # Buttons
         button_layout = QHBoxLayout()
-        preview_btn = QPushButton("Preview")
-        preview_btn.clicked.connect(self.on_preview)
-        button_layout.addWidget(preview_btn)
+        self.preview_btn = QPushButton("Preview")
+        self.preview_btn.clicked.connect(self.on_preview)
+        button_layout.addWidget(self.preview_btn)
         
         export_btn = QPushButton("Export as WAV")
         export_btn.clicked.connect(self.on_export)
@@ -98,9 +111,19 @@ class MainWindow(QMainWindow):
         center_panel.addLayout(button_layout)
         
         # Progress bar
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
-        center_panel.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(self.on_cancel)
+        progress_layout.addWidget(self.cancel_btn)
+        center_panel.addLayout(progress_layout)
+        
+        self.queue_label = QLabel("")
+        center_panel.addWidget(self.queue_label)
         
         # Main layout
         main_layout.addLayout(left_panel, 1)
@@ -108,6 +131,28 @@ class MainWindow(QMainWindow):
         
         central_widget.setLayout(main_layout)
         self.refresh_voice_list()
+        
+        if self.config.ui.show_debug_panel:
+            self.init_debug_panel()
+    
+    def init_debug_panel(self):
+        """Dockable panel with live per-stage timings"""
+        self.debug_view = QPlainTextEdit()
+        self.debug_view.setReadOnly(True)
+        self.debug_view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        
+        dock = QDockWidget("Performance", self)
+        dock.setWidget(self.debug_view)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, dock)
+        
+        self.debug_timer = QTimer(self)
+        self.debug_timer.timeout.connect(self.refresh_debug_panel)
+        self.debug_timer.start(1000)
+        self.refresh_debug_panel()
+    
+    def refresh_debug_panel(self):
+        """Redraw the debug panel from the current metrics snapshot"""
+        self.debug_view.setPlainText(format_snapshot(metrics.snapshot()))
     
     def refresh_voice_list(self):
         """Refresh list of available voices"""
@@ -136,7 +181,13 @@ class MainWindow(QMainWindow):
         if not ok or not voice_name:
             return
         
-        success = self.app.clone_voice(file_path, voice_name)
+        job = Job(f"Clone '{voice_name}'",
+                  lambda progress: self.app.clone_voice(file_path, voice_name, progress))
+        job.signals.finished.connect(lambda success: self.on_clone_finished(voice_name, success))
+        self._submit_job(job)
+    
+    def on_clone_finished(self, voice_name: str, success: bool):
+        """Handle completion of a background clone job"""
         if success:
             QMessageBox.information(self, "Success", f"Voice '{voice_name}' cloned successfully!")
             self.refresh_voice_list()
@@ -174,8 +225,51 @@ class MainWindow(QMainWindow):
         pitch = self.pitch_slider.value()
         tone = self.tone_combo.currentText().lower()
         
-        self.progress_bar.setVisible(True)
         logger.info(f"Generating preview for voice: {voice_name}")
+        
+        job = Job(f"Preview '{voice_name}'",
+                  lambda progress: self._play_preview(voice_name, text, speech_rate, pitch, tone, progress))
+        job.signals.finished.connect(self.on_preview_done)
+        job.signals.cancelled.connect(self.on_preview_done)
+        job.signals.failed.connect(self.on_preview_failed)
+        self.preview_job = job
+        self.preview_btn.setEnabled(False)
+        self.preview_btn.setText("Playing...")
+        self.preview_pool.start(job)
+    
+    def _play_preview(self, voice_name: str, text: str, speech_rate: float, pitch: float, tone: str,
+                      progress) -> None:
+        """Synthesize and play a preview; runs on the preview thread"""
+        import sounddevice as sd
+        
+        # Playback starts on the first synthesized chunk rather than after the full preview
+        stream = None
+        played = 0
+        try:
+            for chunk in self.app.synthesize_speech_stream(voice_name, text, speech_rate, pitch, tone):
+                if stream is None:
+                    stream = sd.OutputStream(samplerate=self.config.audio.sample_rate,
+                                             channels=1, dtype='float32')
+                    stream.start()
+                stream.write(chunk.reshape(-1, 1))
+                played += len(chunk)
+                progress("preview", played, 0)  # raises JobCancelled once cancelled
+        finally:
+            if stream is not None:
+                stream.stop()
+                stream.close()
+    
+    def on_preview_done(self, *_):
+        """Re-enable Preview once playback has ended"""
+        self.preview_job = None
+        self.preview_btn.setEnabled(True)
+        self.preview_btn.setText("Preview")
+    
+    def on_preview_failed(self, message: str):
+        """Report a failed preview"""
+        self.on_preview_done()
+        logger.error(f"Preview failed: {message}")
+        QMessageBox.critical(self, "Error", "Failed to generate preview.")
     
     def on_export(self):
         """Handle WAV export"""
@@ -194,15 +288,56 @@ class MainWindow(QMainWindow):
         pitch = self.pitch_slider.value()
         tone = self.tone_combo.currentText().lower()
         
-        self.progress_bar.setVisible(True)
-        output_path = self.app.synthesize_speech(voice_name, text, speech_rate, pitch, tone)
-        
+        job = Job(f"Export '{voice_name}'",
+                  lambda progress: self.app.synthesize_speech(voice_name, text, speech_rate,
+                                                              pitch, tone, progress))
+        job.signals.finished.connect(self.on_export_finished)
+        self._submit_job(job)
+    
+    def on_export_finished(self, output_path):
+        """Handle completion of a background export job"""
         if output_path:
             QMessageBox.information(self, "Success", f"Exported to: {output_path}")
         else:
             QMessageBox.critical(self, "Error", "Failed to synthesize speech.")
-        
-        self.progress_bar.setVisible(False)
+    
+    def on_cancel(self):
+        """Cancel the running job"""
+        self.job_queue.cancel_current()
+    
+    def on_job_progress(self, stage: str, done: int, total: int):
+        """Update the progress bar from pipeline stage reports"""
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f"{stage.capitalize()} {done}/{total}")
+    
+    def on_job_failed(self, message: str):
+        """Report an unexpected job failure"""
+        QMessageBox.critical(self, "Error", f"Job failed: {message}")
+    
+    def on_queue_changed(self, queued: int):
+        """Show or hide job progress controls"""
+        self.progress_bar.setVisible(queued > 0)
+        self.cancel_btn.setVisible(queued > 0)
+        self.queue_label.setText(f"{queued - 1} job(s) waiting" if queued > 1 else "")
+        if queued == 0:
+            self.progress_bar.reset()
+    
+    def _submit_job(self, job: Job):
+        """Queue a background job with progress reporting"""
+        job.signals.progress.connect(self.on_job_progress)
+        job.signals.failed.connect(self.on_job_failed)
+        self.job_queue.submit(job)
+    
+    def closeEvent(self, event):
+        """Cancel outstanding jobs before closing"""
+        self.job_queue.cancel_all()
+        if self.preview_job is not None:
+            self.preview_job.cancel()
+        self.job_queue.wait()
+        self.preview_pool.waitForDone()
+        self.app.shutdown()
+        super().closeEvent(event)
     
     def _get_voice_name_dialog(self) -> tuple:
         """Get voice name from user"""
@@ -0,0 +1,112 @@
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ..core.progress import JobCancelled, ProgressCallback
+
+logger = logging.getLogger(__name__)
+
+
+class JobSignals(QObject):
+    """Signals emitted by a Job; delivered on the GUI thread"""
+    started = pyqtSignal()
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """Run a pipeline function off the GUI thread with progress and cooperative cancellation"""
+
+    def __init__(self, description: str, fn: Callable[[ProgressCallback], Any]):
+        super().__init__()
+        self.description = description
+        self.fn = fn
+        self.signals = JobSignals()
+        self._cancel_event = threading.Event()
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        """Request cancellation; takes effect at the next progress report"""
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def _report(self, stage: str, done: int, total: int):
+        """Progress callback handed to the pipeline"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.description)
+        self.signals.progress.emit(stage, done, total)
+
+    def run(self):
+        if self._cancel_event.is_set():
+            self.signals.cancelled.emit()
+            return
+        self.signals.started.emit()
+        try:
+            result = self.fn(self._report)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            logger.error(f"Job failed: {self.description}: {e}")
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+class JobQueue(QObject):
+    """Serial queue of background jobs so exports and clones run back to back"""
+
+    queue_changed = pyqtSignal(int)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.current: Optional[Job] = None
+        self._pending: Deque[Job] = deque()
+
+    def __len__(self) -> int:
+        return len(self._pending) + (1 if self.current else 0)
+
+    def submit(self, job: Job) -> Job:
+        """Queue a job; it starts when all earlier jobs have finished"""
+        self._pending.append(job)
+        job.signals.started.connect(lambda: self._on_started(job))
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *_: self._on_done(job))
+        self.pool.start(job)
+        self.queue_changed.emit(len(self))
+        return job
+
+    def cancel_current(self):
+        """Cancel the running job"""
+        if self.current is not None:
+            self.current.cancel()
+
+    def cancel_all(self):
+        """Cancel the running job and every pending job"""
+        for job in self._pending:
+            job.cancel()
+        self.cancel_current()
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until all queued jobs have finished"""
+        return self.pool.waitForDone(msecs)
+
+    def _on_started(self, job: Job):
+        if job in self._pending:
+            self._pending.remove(job)
+        self.current = job
+        self.queue_changed.emit(len(self))
+
+    def _on_done(self, job: Job):
+        if job in self._pending:
+            self._pending.remove(job)
+        if self.current is job:
+            self.current = None
+        self.queue_changed.emit(len(self))
@@ -1,3 +1,4 @@
-from .helpers import sanitize_filename, format_duration
+from .helpers import sanitize_filename, format_duration, resolve_device
+from .metrics import metrics
 
-__all__ = ["sanitize_filename", "format_duration"]
+__all__ = ["sanitize_filename", "format_duration", "resolve_device", "metrics"]
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -26,3 +27,10 @@ def get_file_size_mb(file_path: Path) -> float:
     if file_path.exists():
         return file_path.stat().st_size / (1024 * 1024)
     return 0.0
+
+
+@lru_cache(maxsize=None)
+def resolve_device(preferred: str = "cuda"):
+    """Resolve the torch device to use, importing torch on first call"""
+    import torch
+    return torch.device('cuda' if torch.cuda.is_available() and preferred == 'cuda' else 'cpu')
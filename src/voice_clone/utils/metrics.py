@@ -0,0 +1,241 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Union
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ru_maxrss is reported in bytes on macOS and KiB elsewhere
+_RSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+PROMETHEUS_PREFIX = "voice_clone"
+
+
+def peak_rss_bytes() -> int:
+    """High-water mark of the process resident set size (0 where unavailable)"""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_SCALE
+
+
+class _StageStats:
+    """Running totals for one stage"""
+    __slots__ = ('calls', 'errors', 'wall', 'cpu', 'wall_max', 'rss_delta_max', 'audio_seconds',
+                 'audio_wall', 'recent')
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.errors = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.wall_max = 0.0
+        self.rss_delta_max = 0
+        self.audio_seconds = 0.0
+        self.audio_wall = 0.0  # wall time of the calls that reported audio seconds
+        self.recent: Deque[float] = deque(maxlen=window)
+
+
+class Span:
+    """
+    Timing of one stage invocation, used as a context manager.
+
+    Records wall time, CPU time of the calling thread and growth of the
+    process peak RSS. Set ``audio_seconds`` before the block exits to get a
+    realtime factor (wall time / audio seconds; below 1 is faster than realtime).
+    """
+    __slots__ = ('name', 'audio_seconds', '_registry', '_wall', '_cpu', '_rss')
+
+    def __init__(self, registry: "Metrics", name: str, audio_seconds: Optional[float] = None):
+        self.name = name
+        self.audio_seconds = audio_seconds
+        self._registry = registry
+
+    def __enter__(self) -> "Span":
+        self._rss = peak_rss_bytes()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        self._registry._record(self.name, wall, cpu, peak_rss_bytes() - self._rss,
+                               self.audio_seconds, exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while metrics are disabled"""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def __setattr__(self, name: str, value: Any):
+        pass  # swallow span.audio_seconds = ...
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """
+    Thread-safe registry of per-stage spans and named counters.
+
+    Disabled by default: ``span()`` then returns a shared no-op context
+    manager and ``count()`` returns immediately, so instrumented code pays
+    one attribute check per call.
+    """
+
+    def __init__(self, enabled: bool = False, window: int = 512):
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _StageStats] = {}
+        self._counters: Dict[str, float] = {}
+        self._started = time.time()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def span(self, name: str, audio_seconds: Optional[float] = None) -> Union[Span, _NullSpan]:
+        """Context manager timing one invocation of stage ``name``"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, audio_seconds)
+
+    def count(self, name: str, value: float = 1):
+        """Increment counter ``name``"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._started = time.time()
+
+    def _record(self, name: str, wall: float, cpu: float, rss_delta: int,
+                audio_seconds: Optional[float], failed: bool):
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats(self.window)
+            stats.calls += 1
+            stats.errors += failed
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.wall_max = max(stats.wall_max, wall)
+            stats.rss_delta_max = max(stats.rss_delta_max, rss_delta)
+            if audio_seconds:
+                stats.audio_seconds += audio_seconds
+                stats.audio_wall += wall
+            stats.recent.append(wall)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current totals as plain data; latency percentiles cover the last ``window`` calls"""
+        with self._lock:
+            stages = {}
+            for name, stats in sorted(self._stages.items()):
+                p50, p95, p99 = np.percentile(stats.recent, [50, 95, 99]) if stats.recent else (0.0, 0.0, 0.0)
+                stages[name] = {
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'wall_seconds': stats.wall,
+                    'cpu_seconds': stats.cpu,
+                    'wall_max_seconds': stats.wall_max,
+                    'wall_p50_seconds': float(p50),
+                    'wall_p95_seconds': float(p95),
+                    'wall_p99_seconds': float(p99),
+                    'peak_rss_delta_bytes': stats.rss_delta_max,
+                    'audio_seconds': stats.audio_seconds,
+                    'rtf': stats.audio_wall / stats.audio_seconds if stats.audio_seconds else None,
+                }
+            return {
+                'enabled': self.enabled,
+                'started': self._started,
+                'uptime_seconds': time.time() - self._started,
+                'peak_rss_bytes': peak_rss_bytes(),
+                'stages': stages,
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_process_peak_rss_bytes Peak resident set size of the process",
+            f"# TYPE {p}_process_peak_rss_bytes gauge",
+            f"{p}_process_peak_rss_bytes {snapshot['peak_rss_bytes']}",
+        ]
+        stage_metrics = [
+            ('calls', 'calls_total', 'counter', 'Stage invocations'),
+            ('errors', 'errors_total', 'counter', 'Stage invocations that raised'),
+            ('wall_seconds', 'wall_seconds_total', 'counter', 'Wall time spent in the stage'),
+            ('cpu_seconds', 'cpu_seconds_total', 'counter', 'CPU time of the calling thread in the stage'),
+            ('audio_seconds', 'audio_seconds_total', 'counter', 'Audio processed or produced by the stage'),
+            ('wall_max_seconds', 'wall_max_seconds', 'gauge', 'Slowest single invocation'),
+            ('wall_p95_seconds', 'wall_p95_seconds', 'gauge', '95th percentile wall time over recent calls'),
+            ('peak_rss_delta_bytes', 'peak_rss_delta_bytes', 'gauge', 'Largest peak RSS growth in one call'),
+            ('rtf', 'rtf', 'gauge', 'Wall time per audio second'),
+        ]
+        for key, suffix, kind, help_text in stage_metrics:
+            lines.append(f"# HELP {p}_stage_{suffix} {help_text}")
+            lines.append(f"# TYPE {p}_stage_{suffix} {kind}")
+            for name, stats in snapshot['stages'].items():
+                if stats[key] is not None:
+                    lines.append(f'{p}_stage_{suffix}{{stage="{name}"}} {stats[key]:.9g}')
+        for name, value in snapshot['counters'].items():
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value:.9g}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Union[str, Path]) -> Path:
+        """Write the snapshot to path: Prometheus text for .prom/.txt, JSON otherwise"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix.lower() in (".prom", ".txt"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        # Scrapers (e.g. node_exporter's textfile collector) must never see a partial file
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(content, encoding='utf-8')
+        os.replace(tmp_path, path)
+        return path
+
+
+def format_snapshot(snapshot: Dict[str, Any]) -> str:
+    """Fixed-width text table of a snapshot, for the debug panel and logs"""
+    lines = [f"{'stage':<16}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+             f"{'cpu s':>9}{'rss MB':>9}{'audio s':>10}{'rtf':>8}"]
+    for name, s in snapshot['stages'].items():
+        rtf = f"{s['rtf']:.3f}" if s['rtf'] is not None else "-"
+        lines.append(f"{name:<16}{s['calls']:>7}{1000 * s['wall_p50_seconds']:>10.1f}"
+                     f"{1000 * s['wall_p95_seconds']:>10.1f}{1000 * s['wall_max_seconds']:>10.1f}"
+                     f"{s['cpu_seconds']:>9.2f}{s['peak_rss_delta_bytes'] / 2 ** 20:>9.1f}"
+                     f"{s['audio_seconds']:>10.1f}{rtf:>8}")
+    if snapshot['counters']:
+        lines.append("")
+        lines.extend(f"{name}: {value:g}" for name, value in snapshot['counters'].items())
+    lines.append("")
+    lines.append(f"peak RSS: {snapshot['peak_rss_bytes'] / 2 ** 20:.1f} MB")
+    return "\n".join(lines)
+
+
+# Process-wide registry used by all instrumented modules
+metrics = Metrics()
@@ -0,0 +1,113 @@
+# Tests for single-pass loading and validation of reference clips
+import numpy as np
+import pytest
+from voice_clone.core.config import Config
+from voice_clone.modules.audio_handler import AudioHandler
+from voice_clone.modules.audio_stats import StreamingAudioStats
+
+sf = pytest.importorskip("soundfile")
+
+SR = 16000
+
+
+def _handler(max_duration: float = 120.0) -> AudioHandler:
+    config = Config()
+    config.audio.min_duration = 1.0
+    config.audio.max_duration = max_duration
+    return AudioHandler(config)
+
+
+def _speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """Gated tone over a low noise floor"""
+    t = np.arange(int(SR * seconds)) / SR
+    rng = np.random.default_rng(seed)
+    gate = np.sin(2 * np.pi * 0.7 * t) > 0
+    return (0.5 * np.sin(2 * np.pi * 180 * t) * gate + 0.002 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def test_over_long_file_is_rejected_from_header(tmp_path, monkeypatch):
+    """A clip longer than max_duration is rejected without decoding any audio"""
+    path = tmp_path / "long.wav"
+    sf.write(str(path), _speech(3.0), SR)
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("decoded an over-long file")
+    monkeypatch.setattr(sf, "blocks", no_decode)
+
+    (waveform, sr), result = _handler(max_duration=2.0).load_and_validate(str(path))
+    assert len(waveform) == 0 and sr == SR
+    assert not result['is_valid']
+    assert result['duration'] == pytest.approx(3.0)
+    assert result['issues'][0].startswith("Duration too long")
+
+
+def test_streamed_statistics_match_validate_audio(tmp_path):
+    """Block-wise SNR and peak agree with the whole-array validate_audio"""
+    waveform = _speech(5.0)
+    waveform[1234] = 0.97
+    path = tmp_path / "clip.wav"
+    sf.write(str(path), waveform, SR, subtype="FLOAT")
+    handler = _handler()
+
+    (loaded, sr), streamed = handler.load_and_validate(str(path), block_size=4096)
+    whole = handler.validate_audio((loaded, sr))
+    np.testing.assert_array_equal(loaded, waveform)
+    assert streamed['snr_db'] == pytest.approx(whole['snr_db'], abs=0.1)
+    assert streamed['issues'] == whole['issues'] == ["Audio appears to be clipped"]
+
+    stats = StreamingAudioStats()
+    for start in range(0, len(waveform), 1000):
+        stats.update(waveform[start:start + 1000])
+    assert stats.peak == pytest.approx(float(np.max(np.abs(waveform))))
+    assert stats.rms == pytest.approx(float(np.sqrt(np.mean(waveform.astype(np.float64) ** 2))), rel=1e-5)
+
+
+def test_stereo_is_downmixed(tmp_path):
+    """Stereo clips are averaged to mono while streaming"""
+    left, right = _speech(2.0, seed=1), _speech(2.0, seed=2)
+    path = tmp_path / "stereo.wav"
+    sf.write(str(path), np.stack([left, right], axis=1), SR, subtype="FLOAT")
+
+    (waveform, sr), result = _handler().load_and_validate(str(path), block_size=3000)
+    assert sr == SR and result['duration'] == pytest.approx(2.0)
+    np.testing.assert_allclose(waveform, (left + right) / 2, atol=1e-6)
+
+
+@pytest.mark.parametrize("streamable", [True, False])
+def test_decoding_stops_keeping_audio_at_max_duration(tmp_path, monkeypatch, streamable):
+    """A header that understates the length still never yields more than max_duration seconds"""
+    waveform = _speech(3.0)
+    path = tmp_path / "clip.wav"
+    sf.write(str(path), waveform, SR, subtype="FLOAT")
+    handler = _handler(max_duration=2.0)
+    monkeypatch.setattr(handler, "probe_audio", lambda audio_path: {
+        'sample_rate': SR, 'channels': 1, 'duration': 1.5, 'frames': len(waveform), 'streamable': streamable})
+
+    (loaded, sr), result = handler.load_and_validate(str(path))
+    assert len(loaded) == 2 * SR
+    np.testing.assert_allclose(loaded, waveform[:2 * SR], atol=1e-6)
+    if streamable:
+        # Every block is still measured, so the true length is reported
+        assert result['duration'] == pytest.approx(3.0)
+        assert not result['is_valid']
+
+
+def test_audioread_fallback(tmp_path, monkeypatch):
+    """Files libsndfile can't probe are probed with audioread and decoded in one call"""
+    pytest.importorskip("audioread")
+    pytest.importorskip("librosa")
+    waveform = _speech(2.0)
+    path = tmp_path / "clip.wav"
+    sf.write(str(path), waveform, SR)
+
+    def unsupported(*args, **kwargs):
+        raise RuntimeError("Format not recognised")
+    monkeypatch.setattr(sf, "info", unsupported)
+    handler = _handler()
+
+    probe = handler.probe_audio(str(path))
+    assert not probe['streamable'] and probe['sample_rate'] == SR
+    (loaded, sr), result = handler.load_and_validate(str(path))
+    assert sr == SR and result['duration'] == pytest.approx(2.0)
+    np.testing.assert_allclose(loaded, waveform, atol=1e-4)
+    assert result['snr_db'] == pytest.approx(handler.validate_audio((loaded, sr))['snr_db'], abs=0.1)
@@ -0,0 +1,24 @@
+# Tests for the dynamic batching scheduler
+import numpy as np
+from voice_clone.core.config import Config
+from voice_clone.modules.batch_scheduler import BatchScheduler
+from voice_clone.modules.synthesis_engine import SynthesisEngine
+
+
+def test_batched_results_match_single_requests():
+    """Test batched synthesis scatters the same audio back to each request"""
+    config = Config()
+    engine = SynthesisEngine(config)
+    scheduler = BatchScheduler(engine, config)
+    embedding = np.zeros(512, dtype=np.float32)
+    
+    requests = [("short", 1.0, 0.0), ("a much longer line of text", 1.2, 5.0), ("mid length", 0.8, -3.0)]
+    futures = [scheduler.submit(text, embedding, rate, pitch) for text, rate, pitch in requests]
+    scheduler.shutdown()
+    
+    for future, (text, rate, pitch) in zip(futures, requests):
+        waveform, sr = future.result(timeout=5)
+        expected, expected_sr = engine.synthesize(text, embedding, rate, pitch)
+        assert sr == expected_sr
+        assert waveform.shape == expected.shape
+        np.testing.assert_allclose(waveform, expected, atol=1e-4)
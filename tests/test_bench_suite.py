@@ -0,0 +1,51 @@
+# Tests for the benchmark suite's regression gate
+import importlib.util
+import json
+import sys
+from pathlib import Path
+import pytest
+
+SUITE = Path(__file__).resolve().parent.parent / "benchmarks" / "bench_suite.py"
+
+
+@pytest.fixture
+def bench_suite():
+    spec = importlib.util.spec_from_file_location("bench_suite", SUITE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _results(p50_ms: float, peak_mem_mb: float = 10.0) -> dict:
+    return {
+        'meta': {'platform': 'test'},
+        'results': {'resample_audio[30s_44k]': {'p50_ms': p50_ms, 'peak_mem_mb': peak_mem_mb}},
+    }
+
+
+def _compare(bench_suite, monkeypatch, tmp_path, current: dict, threshold: str = "0.25"):
+    """Run compare mode against a 100 ms baseline with the suite itself replaced by ``current``"""
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_results(100.0)), encoding='utf-8')
+    monkeypatch.setattr(bench_suite, "run_suite", lambda repeats, name_filter, trace_memory: current)
+    monkeypatch.setattr(sys, "argv", ["bench_suite.py", "compare", str(baseline), "--threshold", threshold])
+    bench_suite.main()
+
+
+def test_compare_passes_within_threshold(bench_suite, monkeypatch, tmp_path, capsys):
+    """A 20% slowdown under a 25% threshold is not a regression"""
+    _compare(bench_suite, monkeypatch, tmp_path, _results(120.0))
+    assert "No regressions" in capsys.readouterr().out
+
+
+def test_compare_fails_past_threshold(bench_suite, monkeypatch, tmp_path, capsys):
+    """A 40% slowdown, or a 50% memory increase, exits non-zero and names the case"""
+    for current in (_results(140.0), _results(100.0, peak_mem_mb=15.0)):
+        with pytest.raises(SystemExit) as exit_info:
+            _compare(bench_suite, monkeypatch, tmp_path, current)
+        assert exit_info.value.code == 1
+        assert "resample_audio[30s_44k]" in capsys.readouterr().out.split("regression(s)")[1]
+
+    # The same slowdown passes once the threshold allows it
+    _compare(bench_suite, monkeypatch, tmp_path, _results(140.0), threshold="0.5")
+    assert "No regressions" in capsys.readouterr().out
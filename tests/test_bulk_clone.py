@@ -0,0 +1,80 @@
+# Tests for bulk voice cloning
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from voice_clone.core import bulk_clone
+from voice_clone.core.config import Config
+
+sf = pytest.importorskip("soundfile")
+
+_decode_and_validate = bulk_clone._decode_and_validate
+
+
+def _crash_on_bad(audio_path: str, voice_name: str, buffer=None):
+    """Decode task that kills its worker process for one clip"""
+    if voice_name == "bad":
+        os._exit(1)
+    return _decode_and_validate(audio_path, voice_name, buffer)
+
+
+def _decode_into_shared_memory(audio_path: str, voice_name: str, buffer=None):
+    """Decode task that fails the clip if its audio would be pickled back"""
+    item = _decode_and_validate(audio_path, voice_name, buffer)
+    if 'audio_data' in item:
+        raise AssertionError("decoded audio was pickled")
+    return item
+
+
+def test_worker_crash_fails_only_its_clip(tmp_path, monkeypatch):
+    """A crashing decode worker is reported as one failed item and the rest still run"""
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    clips = []
+    for i, name in enumerate(["a", "b", "bad", "c", "d", "e"]):
+        path = tmp_path / f"{name}.wav"
+        sf.write(str(path), 0.1 * np.sin(np.arange(16000) * (0.05 + 0.01 * i)), 16000)  # too short to clone
+        clips.append((str(path), name))
+    monkeypatch.setattr(bulk_clone, "_decode_and_validate", _crash_on_bad)
+
+    reports = {item['voice_name']: item for item in
+               bulk_clone.clone_voices_bulk(SimpleNamespace(config=config), clips, workers=2)}
+
+    assert sorted(reports) == ["a", "b", "bad", "c", "d", "e"]
+    assert not reports["bad"]['success'] and "crashed" in reports["bad"]['issues'][0]
+    for name in ["a", "b", "c", "d", "e"]:
+        assert not reports[name]['success']
+        assert 'duration' in reports[name]  # decoded and validated, not a crash report
+
+
+def test_bulk_cloned_voices_are_enrolled(tmp_path, monkeypatch):
+    """Bulk cloning returns audio through shared memory and enrolls voices like clone_voice"""
+    from voice_clone.core.application import VoiceCloneApp
+
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    config.model.device = "cpu"
+    config.audio.min_duration = 5.0
+    rng = np.random.default_rng(0)
+    t = np.arange(16000 * 12) / 16000
+    clips = []
+    for i, name in enumerate(["a", "b"]):
+        path = tmp_path / f"{name}.wav"
+        speech = 0.3 * np.sin(2 * np.pi * (150 + 30 * i) * t) * (np.sin(2 * np.pi * 0.7 * t) > 0)
+        sf.write(str(path), speech + 0.001 * rng.standard_normal(len(t)), 16000)
+        clips.append((str(path), name))
+    app = VoiceCloneApp(config)
+    monkeypatch.setattr(bulk_clone, "_decode_and_validate", _decode_into_shared_memory)
+
+    reports = list(app.clone_voices_bulk(clips, workers=1))
+
+    assert all(item['success'] for item in reports)
+    if os.path.isdir("/dev/shm"):
+        assert not [name for name in os.listdir("/dev/shm") if name.startswith("vcclone")]
+    for _, name in clips:
+        enrollment = app.voice_embedder.load_enrollment(name)
+        assert enrollment is not None and len(enrollment.segments) > 1
+        np.testing.assert_allclose(app.voice_embedder.load_voice(name), enrollment.embedding, rtol=1e-3, atol=1e-3)
+    assert app.add_reference_clip("a", clips[1][0]) is not None
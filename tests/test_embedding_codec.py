@@ -0,0 +1,82 @@
+# Tests for compact embedding storage
+import numpy as np
+import pytest
+from voice_clone.core.config import Config
+from voice_clone.modules.embedding_codec import (
+    cosine_similarity_rows, dequantize_embeddings, quantize_embeddings
+)
+from voice_clone.modules.voice_embedder import VoiceEmbedder
+from voice_clone.modules.voice_store import VoiceStore
+
+
+@pytest.mark.parametrize("dtype, min_cosine", [("fp16", 0.99999), ("int8", 0.9999)])
+def test_quantized_roundtrip_cosine(dtype, min_cosine):
+    """Test fp16/int8 round trips preserve direction with per-vector scaling"""
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((200, 512)).astype(np.float32) * rng.uniform(0.01, 10, (200, 1))
+    embeddings[0] = 0.0
+    
+    values, scales = quantize_embeddings(embeddings, dtype)
+    decoded = dequantize_embeddings(values, scales)
+    
+    assert decoded.dtype == np.float32
+    assert values.nbytes <= embeddings.nbytes // 2
+    assert np.all(decoded[0] == 0)
+    assert cosine_similarity_rows(embeddings[1:], decoded[1:]).min() > min_cosine
+
+
+def test_profile_format_detection(tmp_path):
+    """Test load_voice_profile reads legacy float32 and versioned int8 profiles"""
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    embedder = VoiceEmbedder(config)
+    embedding = np.random.default_rng(1).standard_normal(512).astype(np.float32)
+    
+    np.savez(tmp_path / "legacy.npz", embedding=embedding, voice_name="legacy", version='1.0')
+    np.testing.assert_array_equal(embedder.load_voice_profile(tmp_path / "legacy.npz"), embedding)
+    
+    embedder.save_voice_profile(embedding, tmp_path / "small.npz", "small", dtype="int8")
+    with np.load(tmp_path / "small.npz") as data:
+        assert data['embedding'].dtype == np.int8
+    loaded = embedder.load_voice_profile(tmp_path / "small.npz")
+    assert loaded.dtype == np.float32
+    assert cosine_similarity_rows(embedding, loaded)[0] > 0.9999
+
+
+def test_int8_store_compact_and_reopen(tmp_path):
+    """Test an int8 voice store keeps scales aligned with rows across compaction"""
+    store = VoiceStore(tmp_path, dtype="int8")
+    vectors = {name: np.full(512, i + 1, dtype=np.float32) for i, name in enumerate(["a", "b", "c"])}
+    for name, vector in vectors.items():
+        store.append(name, vector)
+    store.delete("a")
+    assert store.compact() == 1
+    
+    reopened = VoiceStore(tmp_path, dtype="fp32")
+    assert reopened.dtype == "int8"
+    assert reopened.matrix_path.stat().st_size == 2 * 512
+    np.testing.assert_allclose(reopened.get("c"), vectors["c"], rtol=1e-6)
+    np.testing.assert_allclose(reopened.matrix(), np.stack([vectors["b"], vectors["c"]]), rtol=1e-6)
+
+
+def test_quantized_store_decodes_only_new_rows(tmp_path, monkeypatch):
+    """Test appends after matrix() never re-decode the whole fp16 library"""
+    from voice_clone.modules import voice_store
+    
+    store = VoiceStore(tmp_path, dtype="fp16")
+    rng = np.random.default_rng(2)
+    vectors = {f"v{i}": rng.standard_normal(512).astype(np.float32) for i in range(50)}
+    for name, vector in vectors.items():
+        store.append(name, vector)
+    store.matrix()
+    
+    decoded_rows = []
+    decode = voice_store.dequantize_embeddings
+    monkeypatch.setattr(voice_store, "dequantize_embeddings",
+                        lambda values, *a, **kw: decoded_rows.append(np.atleast_2d(values).shape[0]) or
+                        decode(values, *a, **kw))
+    store.append("new", vectors["v0"])
+    np.testing.assert_allclose(store.get("new"), vectors["v0"], atol=1e-2)
+    np.testing.assert_allclose(store.get("v3"), vectors["v3"], atol=1e-2)
+    assert store.matrix().shape[0] == 51
+    assert decoded_rows == [1, 1]
@@ -0,0 +1,101 @@
+# Tests for the chunked FLAC/Opus/WAV encoders and batch export bundles
+import io
+import json
+import tarfile
+
+import numpy as np
+import pytest
+
+from voice_clone.modules.encoders import encode_waveform, format_for_path, open_encoder
+from voice_clone.modules.wav_writer import WavWriter
+
+sf = pytest.importorskip("soundfile")
+
+
+def _tone(seconds: float, sr: int) -> np.ndarray:
+    t = np.arange(int(seconds * sr)) / sr
+    return (0.4 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_flac_chunked_encode_matches_pcm16_quantization():
+    """FLAC written in small chunks decodes to the peak-normalized 16-bit signal"""
+    sr = 22050
+    waveform = _tone(1.0, sr)
+    buffer = io.BytesIO()
+    frames = encode_waveform(waveform, sr, buffer, "flac", chunk_frames=1000)
+    buffer.seek(0)
+    decoded, decoded_sr = sf.read(buffer, dtype='float32')
+    assert frames == len(waveform) and decoded_sr == sr
+    expected = waveform * (0.95 / np.abs(waveform).max())
+    assert np.max(np.abs(decoded - expected)) < 2 / 32767
+
+
+def test_opus_is_resampled_to_a_supported_rate():
+    """44.1 kHz input is written as 48 kHz Opus in a fraction of the WAV size"""
+    waveform = _tone(2.0, 44100)
+    opus, wav = io.BytesIO(), io.BytesIO()
+    frames = encode_waveform(waveform, 44100, opus, "opus", compression_level=0.8)
+    encode_waveform(waveform, 44100, wav, "wav")
+    opus.seek(0)
+    decoded, decoded_sr = sf.read(opus, dtype='float32')
+    assert decoded_sr == 48000 and frames == len(decoded)
+    assert abs(len(decoded) - 96000) < 100
+    assert len(opus.getvalue()) < len(wav.getvalue()) / 5
+
+
+def test_format_helpers_and_factory():
+    """Extensions map to formats and WAV keeps the native writer"""
+    assert format_for_path("a/b.FLAC") == "flac" and format_for_path("x.opus") == "opus"
+    assert format_for_path("x.mp3") == "wav"
+    assert isinstance(open_encoder(io.BytesIO(), "wav", 16000), WavWriter)
+    with pytest.raises(ValueError):
+        open_encoder(io.BytesIO(), "mp3", 16000)
+
+
+def test_export_bundle_records_files_as_they_complete(tmp_path):
+    """Bundled files leave the disk, the sidecar manifest grows per file and close adds manifest.json"""
+    from voice_clone.core.batch_export import ExportBundle
+
+    bundle = ExportBundle(tmp_path / "out.tar")
+    for i in range(2):
+        path = tmp_path / f"{i}.flac"
+        encode_waveform(_tone(0.5, 16000), 16000, path, "flac")
+        bundle.add(path, path.name, {'index': i})
+        assert not path.exists()
+        assert len(bundle.manifest_path.read_text(encoding='utf-8').splitlines()) == i + 1
+    bundle.close()
+
+    with tarfile.open(tmp_path / "out.tar") as tar:
+        assert tar.getnames() == ["0.flac", "1.flac", "manifest.json"]
+        manifest = json.load(tar.extractfile("manifest.json"))
+    assert [entry['file'] for entry in manifest['files']] == ["0.flac", "1.flac"]
+
+
+def test_resumed_bundle_drops_a_crash_truncated_member(tmp_path):
+    """A member cut short by a crash is truncated away, with its entry, before new files are appended"""
+    from voice_clone.core.batch_export import ExportBundle
+
+    bundle = ExportBundle(tmp_path / "out.tar")
+    for i in range(2):
+        path = tmp_path / f"{i}.flac"
+        encode_waveform(_tone(0.5, 16000), 16000, path, "flac")
+        bundle.add(path, path.name, {'index': i})
+    bundle._tar.fileobj.close()  # crash: no end-of-archive marker, no manifest.json
+    with tarfile.open(tmp_path / "out.tar") as tar:
+        last = tar.getmember("1.flac")
+    with open(tmp_path / "out.tar", 'r+b') as f:
+        f.truncate(last.offset_data + last.size // 2)
+
+    resumed = ExportBundle(tmp_path / "out.tar", resume=True)
+    assert "0.flac" in resumed and "1.flac" not in resumed
+    assert len(resumed.manifest_path.read_text(encoding='utf-8').splitlines()) == 1
+    path = tmp_path / "2.flac"
+    encode_waveform(_tone(0.5, 16000), 16000, path, "flac")
+    resumed.add(path, path.name, {'index': 2})
+    resumed.close()
+
+    with tarfile.open(tmp_path / "out.tar") as tar:
+        assert tar.getnames() == ["0.flac", "2.flac", "manifest.json"]
+        assert all(len(tar.extractfile(member).read()) == member.size for member in tar.getmembers())
+        manifest = json.load(tar.extractfile("manifest.json"))
+    assert [entry['file'] for entry in manifest['files']] == ["0.flac", "2.flac"]
@@ -0,0 +1,81 @@
+# Tests for incremental voice enrollment
+import numpy as np
+from voice_clone.modules.enrollment import VoiceEnrollment, split_segments
+
+
+def test_split_segments_remainder():
+    """Test fixed-length segmentation keeps long remainders and drops short ones"""
+    waveform = np.arange(1000, dtype=np.float32)
+    assert [len(s) for s in split_segments(waveform, 300)] == [300, 300, 300]
+    assert [len(s) for s in split_segments(waveform, 400)] == [400, 400, 200]
+    assert [len(s) for s in split_segments(waveform[:100], 400)] == [100]
+    assert np.shares_memory(split_segments(waveform, 300)[1], waveform)
+
+
+def test_add_remove_matches_rebuild(tmp_path):
+    """Test incremental add/remove agrees with a rebuild from stored segments"""
+    rng = np.random.default_rng(0)
+    clips = [(rng.standard_normal((n, 8)), rng.uniform(1, 3, n)) for n in (5, 3, 7)]
+    enrollment = VoiceEnrollment(dim=8)
+    ids = [enrollment.add_clip(embeddings, weights, source=f"clip{i}.wav")
+           for i, (embeddings, weights) in enumerate(clips)]
+    assert enrollment.remove_clip(ids[1])
+    assert not enrollment.remove_clip(ids[1])
+    
+    kept = [clips[0], clips[2]]
+    segments = np.concatenate([e for e, _ in kept])
+    weights = np.concatenate([w for _, w in kept])
+    expected = weights @ segments / weights.sum()
+    np.testing.assert_allclose(enrollment.embedding, expected, rtol=1e-5, atol=1e-6)
+    
+    enrollment.save(tmp_path / "voice.npz")
+    reloaded = VoiceEnrollment.load(tmp_path / "voice.npz")
+    reloaded.rebuild()
+    np.testing.assert_allclose(reloaded.embedding, enrollment.embedding, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(reloaded.variance, enrollment.variance, rtol=1e-4, atol=1e-6)
+    assert [clip['source'] for clip in reloaded.summary()] == ["clip0.wav", "clip2.wav"]
+    assert reloaded.add_clip(clips[1][0], clips[1][1]) == 4
+
+
+def test_overwriting_a_voice_drops_old_enrollment(tmp_path):
+    """Test a plain store_voice overwrite is not undone by a later rebuild from stale clips"""
+    from voice_clone.core.application import VoiceCloneApp
+    from voice_clone.core.config import Config
+    
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    config.model.device = "cpu"
+    app = VoiceCloneApp(config)
+    embedder = app.voice_embedder
+    
+    old = VoiceEnrollment(dim=512)
+    old.add_clip(np.full((2, 512), 1.0, dtype=np.float32), [1.0, 1.0], source="old.wav")
+    embedder.store_enrollment("alice", old)
+    assert embedder.load_enrollment("alice") is not None
+    
+    recloned = np.full(512, -1.0, dtype=np.float32)
+    embedder.store_voice("alice", recloned)  # as bulk clone does
+    assert embedder.load_enrollment("alice") is None
+    assert not app.rebuild_voice("alice")
+    np.testing.assert_allclose(app._load_voice("alice"), recloned, atol=1e-2)
+
+
+def test_segment_embedding_batches_follow_embedding_batch_size(tmp_path):
+    """Test segments are embedded embedding_batch_size at a time, independent of the synthesis batch size"""
+    from voice_clone.core.config import Config
+    from voice_clone.modules.voice_embedder import VoiceEmbedder
+    
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    config.model.device = "cpu"
+    config.model.embedding_segment_seconds = 1.0
+    config.model.embedding_batch_size = 3
+    config.model.max_batch_size = 32
+    embedder = VoiceEmbedder(config)
+    batch_sizes = []
+    extract = embedder.extract_embeddings
+    embedder.extract_embeddings = lambda batch: batch_sizes.append(len(batch)) or extract(batch)
+    
+    embeddings, weights = embedder.extract_segment_embeddings((np.zeros(16000 * 7, dtype=np.float32), 16000))
+    assert batch_sizes == [3, 3, 1]
+    assert embeddings.shape == (7, 512) and len(weights) == 7
@@ -0,0 +1,67 @@
+# Tests for BS.1770 loudness metering and normalization
+from pathlib import Path
+import numpy as np
+import pytest
+from voice_clone.modules.loudness import LoudnessMeter, TruePeakMeter, normalize_stream, normalize_waveform
+
+
+def test_sine_reference_level():
+    """Test a 1 kHz stereo sine at -23 dBFS reads -23 LUFS, fed in chunks"""
+    sr = 48000
+    tone = 10 ** (-23 / 20) * np.sin(2 * np.pi * 1000 * np.arange(sr * 5) / sr)
+    meter = LoudnessMeter(sr, channels=2)
+    stereo = np.stack([tone, tone], axis=1)
+    for start in range(0, len(stereo), 3000):
+        meter.update(stereo[start:start + 3000])
+    assert abs(meter.integrated() + 23.0) < 0.05
+
+
+def test_normalize_hits_target_under_ceiling():
+    """Test normalization reaches the target while the limiter holds the true peak"""
+    sr = 44100
+    waveform = (0.05 * np.random.default_rng(0).standard_normal(sr * 5)).astype(np.float32)
+    waveform[sr] = 0.9  # isolated transient that forces limiting
+    result = normalize_waveform(waveform, sr, target_lufs=-14.0, true_peak_db=-1.0)
+    
+    meter = LoudnessMeter(sr)
+    meter.update(result)
+    peak = TruePeakMeter()
+    peak.update(result)
+    peak.finish()
+    assert len(result) == len(waveform)
+    assert abs(meter.integrated() + 14.0) < 0.1
+    assert peak.peak_db < -0.9
+    
+    streamed = np.concatenate(list(normalize_stream(
+        (waveform[i:i + 4000] for i in range(0, len(waveform), 4000)), sr, -14.0, -1.0)))
+    np.testing.assert_allclose(streamed, result, atol=1e-6)
+
+
+def test_normalize_folder_keeps_each_files_format(tmp_path):
+    """Float and 32-bit WAVs keep their subtype and FLAC/Opus files are normalized too"""
+    sf = pytest.importorskip("soundfile")
+    from voice_clone.modules.loudness import normalize_folder
+
+    sr = 48000
+    tone = (0.05 * np.sin(2 * np.pi * 440 * np.arange(sr * 2) / sr)).astype(np.float32)
+    formats = {
+        'float.wav': ('WAV', 'FLOAT'),
+        'pcm32.wav': ('WAV', 'PCM_32'),
+        'pcm16.wav': ('WAV', 'PCM_16'),
+        'speech.flac': ('FLAC', 'PCM_24'),
+        'speech.opus': ('OGG', 'OPUS'),
+    }
+    for name, (container, subtype) in formats.items():
+        sf.write(str(tmp_path / name), tone, sr, subtype=subtype, format=container)
+    (tmp_path / "notes.txt").write_text("not audio")
+
+    reports = list(normalize_folder(tmp_path, target_lufs=-16.0, workers=1))
+    assert sorted(Path(report['path']).name for report in reports) == sorted(formats)
+    assert all(report['success'] for report in reports)
+    for name, (container, subtype) in formats.items():
+        info = sf.info(str(tmp_path / name))
+        assert (info.format, info.subtype) == (container, subtype)
+        waveform, _ = sf.read(str(tmp_path / name), dtype='float32')
+        meter = LoudnessMeter(sr)
+        meter.update(waveform)
+        assert abs(meter.integrated() + 16.0) < 0.3
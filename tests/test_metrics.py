@@ -0,0 +1,49 @@
+# Tests for the instrumentation layer
+import json
+import pytest
+from voice_clone.utils.metrics import Metrics
+
+
+def test_disabled_records_nothing():
+    """Test spans and counters are no-ops while disabled"""
+    registry = Metrics(enabled=False)
+    with registry.span("synthesize") as span:
+        span.audio_seconds = 1.0
+    registry.count("renders")
+    
+    snapshot = registry.snapshot()
+    assert snapshot['stages'] == {}
+    assert snapshot['counters'] == {}
+
+
+def test_span_records_stage_and_errors():
+    """Test spans aggregate calls, audio seconds and failures per stage"""
+    registry = Metrics(enabled=True)
+    for _ in range(3):
+        with registry.span("synthesize", audio_seconds=2.0):
+            sum(range(1000))
+    with pytest.raises(RuntimeError):
+        with registry.span("synthesize"):
+            raise RuntimeError("boom")
+    registry.count("renders", 3)
+    
+    stats = registry.snapshot()['stages']['synthesize']
+    assert stats['calls'] == 4
+    assert stats['errors'] == 1
+    assert stats['audio_seconds'] == 6.0
+    assert 0 < stats['rtf'] < 1
+    assert stats['wall_p50_seconds'] <= stats['wall_max_seconds']
+    assert registry.snapshot()['counters'] == {'renders': 3}
+
+
+def test_export_formats(tmp_path):
+    """Test export picks Prometheus text or JSON from the file suffix"""
+    registry = Metrics(enabled=True)
+    with registry.span("export", audio_seconds=1.0):
+        pass
+    
+    prom = registry.export(tmp_path / "metrics.prom").read_text()
+    assert 'voice_clone_stage_calls_total{stage="export"} 1' in prom
+    data = json.loads(registry.export(tmp_path / "metrics.json").read_text())
+    assert data['stages']['export']['calls'] == 1
+    assert not list(tmp_path.glob("*.tmp"))
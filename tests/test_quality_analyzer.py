@@ -0,0 +1,44 @@
+# Tests for frame-level quality analysis
+import numpy as np
+from voice_clone.modules.quality_analyzer import QualityAnalyzer, frame_signal
+
+
+def test_frame_signal_is_a_view():
+    """Test framing does not copy the signal"""
+    waveform = np.arange(100, dtype=np.float32)
+    frames = frame_signal(waveform, 10, 5)
+    assert frames.shape == (19, 10)
+    assert np.shares_memory(frames, waveform)
+
+
+def test_vad_and_snr():
+    """Test speech frames are detected and SNR reflects speech over noise energy"""
+    sr = 16000
+    rng = np.random.default_rng(0)
+    t = np.arange(sr * 4) / sr
+    speech = (t % 1.0) < 0.5
+    waveform = (0.001 * rng.standard_normal(len(t)) + speech * 0.1 * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+    
+    report = QualityAnalyzer(hangover_frames=0).analyze((waveform, sr))
+    assert abs(report.speech_ratio - 0.5) < 0.05
+    assert 30 < report.snr_db < 40
+    
+    mask = report.sample_mask(len(waveform))
+    assert np.mean(mask == speech) > 0.95
+
+
+def test_flatness_and_vad_resolve_every_frame_at_high_rates():
+    """Test flatness and speech decisions change at the frame where the signal does, at any rate"""
+    for sr in (16000, 44100, 48000):
+        rng = np.random.default_rng(1)
+        t = np.arange(sr * 2) / sr
+        boundary = sr  # tone, then white noise; loud, then quiet
+        waveform = np.where(t < 1.0, 0.1 * np.sin(2 * np.pi * 440 * t), 0.001 * rng.standard_normal(len(t)))
+        
+        report = QualityAnalyzer(hangover_frames=0).analyze((waveform.astype(np.float32), sr))
+        starts = np.arange(report.n_frames) * report.hop_length
+        before = starts + report.frame_length <= boundary
+        after = starts >= boundary
+        assert report.spectral_flatness[before].max() < 0.05
+        assert report.spectral_flatness[after].min() > 0.2
+        np.testing.assert_array_equal(report.speech_mask[before | after], before[before | after])
@@ -0,0 +1,43 @@
+# Tests for the rendered audio cache
+import numpy as np
+from voice_clone.modules.render_cache import RenderCache, render_key
+
+
+def test_render_key_normalizes_text():
+    """Test keys ignore whitespace differences but not parameters"""
+    embedding = np.ones(512, dtype=np.float32)
+    key = render_key(embedding, "Hello  world.", 1.0, 0.0, "neutral", "v1")
+    assert key == render_key(embedding, " Hello world. ", 1.0, 0.0, "neutral", "v1")
+    assert key != render_key(embedding, "Hello world.", 1.1, 0.0, "neutral", "v1")
+    assert key != render_key(embedding, "Hello world.", 1.0, 0.0, "neutral", "v2")
+
+
+def test_disk_tier_eviction_and_export(tmp_path):
+    """Test disk entries are served as exports and evicted by byte budget"""
+    cache = RenderCache(tmp_path / "cache", memory_budget=1024, disk_budget=150)
+    for name in ["a", "b"]:
+        wav = tmp_path / f"{name}.wav"
+        wav.write_bytes(name.encode() * 100)
+        cache.put_wav(name, 44100, 16, wav)
+    
+    assert not cache.export_wav("a", 44100, 16, tmp_path / "out_a.wav")
+    assert cache.export_wav("b", 44100, 16, tmp_path / "out_b.wav")
+    assert (tmp_path / "out_b.wav").read_bytes() == b"b" * 100
+    assert cache.stats()['disk_bytes'] == 100
+
+
+def test_synthesize_speech_counts_one_lookup_per_render(tmp_path):
+    """Test an uncached export counts one miss and a repeat counts one hit"""
+    from voice_clone.core.application import VoiceCloneApp
+    from voice_clone.core.config import Config
+    
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    config.model.device = "cpu"
+    app = VoiceCloneApp(config)
+    app.voice_embedder.store_voice("alice", np.ones(512, dtype=np.float32))
+    
+    assert app.synthesize_speech("alice", "Hello there.") is not None
+    assert (app.render_cache.hits, app.render_cache.misses) == (0, 1)
+    assert app.synthesize_speech("alice", "Hello there.") is not None
+    assert (app.render_cache.hits, app.render_cache.misses) == (1, 1)
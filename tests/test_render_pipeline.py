@@ -0,0 +1,177 @@
+# Tests for the staged render pipeline and pipelined script rendering
+import json
+import threading
+import time
+
+import pytest
+
+from voice_clone.core.config import Config
+from voice_clone.core.render_pipeline import Stage, StagedPipeline
+
+
+def _config(tmp_path) -> Config:
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    config.model.device = "cpu"
+    return config
+
+
+def test_ordered_results_match_input_despite_uneven_stage_times():
+    """Ordered mode yields input order even when later items finish first"""
+    def slow_for_small(x):
+        time.sleep(0.02 if x < 3 else 0.0)
+        return x
+
+    pipeline = StagedPipeline([Stage("a", slow_for_small, workers=4), Stage("b", lambda x: x * 10, workers=2)])
+    results = list(pipeline.run(range(12)))
+    assert [item.payload for item in results] == [x * 10 for x in range(12)]
+    stats = pipeline.stats()
+    assert stats["a"]["processed"] == 12 and stats["b"]["workers"] == 2
+
+
+def test_unordered_returns_every_item_and_failures_skip_later_stages():
+    """A failing item keeps its payload and error and never reaches later stages"""
+    seen = []
+
+    def check(x):
+        if x == 5:
+            raise ValueError("bad item")
+        return x
+
+    def record(x):
+        seen.append(x)
+        return x
+
+    pipeline = StagedPipeline([Stage("check", check, 2), Stage("record", record, 2)], ordered=False)
+    results = list(pipeline.run(range(10)))
+    assert sorted(item.seq for item in results) == list(range(10))
+    failed = [item for item in results if item.error is not None]
+    assert len(failed) == 1 and failed[0].failed_stage == "check" and failed[0].payload == 5
+    assert 5 not in seen
+    assert pipeline.stats()["check"]["failed"] == 1
+
+
+def test_items_in_flight_are_bounded():
+    """A slow final stage throttles the input instead of buffering everything"""
+    active = []
+    lock = threading.Lock()
+    peak = [0]
+
+    def enter(x):
+        with lock:
+            active.append(x)
+            peak[0] = max(peak[0], len(active))
+        return x
+
+    def leave(x):
+        time.sleep(0.005)
+        with lock:
+            active.remove(x)
+        return x
+
+    pipeline = StagedPipeline([Stage("enter", enter, 1, 1), Stage("leave", leave, 1, 1)], max_in_flight=3)
+    assert len(list(pipeline.run(range(30)))) == 30
+    assert peak[0] <= 3
+
+
+def test_script_render_pipeline_writes_outputs_state_and_resumes(tmp_path):
+    """Lines render through every stage, job state is saved, and a rerun skips them"""
+    pytest.importorskip("soundfile")
+    import numpy as np
+    from voice_clone.core.application import VoiceCloneApp
+
+    app = VoiceCloneApp(_config(tmp_path))
+    app.voice_embedder.store_voice("alice", np.ones(512, dtype=np.float32))
+    script = tmp_path / "script.jsonl"
+    rows = [{"voice": "alice", "text": f"Line number {i}."} for i in range(4)]
+    rows.append({"voice": "nobody", "text": "Missing voice."})
+    script.write_text("\n".join(json.dumps(row) for row in rows), encoding="utf-8")
+
+    summary = app.render_script(str(script), workers=2, output_dir=str(tmp_path / "out"))
+    assert summary["rendered"] == 4 and summary["failed"] == 1
+    assert set(summary["stages"]) == {"preprocess", "synthesize", "postprocess", "write"}
+    assert summary["stages"]["write"]["processed"] == 4
+    state = json.loads((tmp_path / "out" / "script.job.json").read_text(encoding="utf-8"))
+    assert state["status"] == "complete" and state["rendered"] == 4 and state["failed"] == 1
+    records = [json.loads(line) for line in open(summary["manifest"], encoding="utf-8")]
+    assert [record["index"] for record in records] == list(range(5))  # ordered completion
+    assert records[-1]["stage"] == "preprocess"
+
+    again = app.render_script(str(script), output_dir=str(tmp_path / "out"))
+    assert again["skipped"] == 4 and again["rendered"] == 0
+
+
+@pytest.mark.parametrize("fmt", ["wav", "flac"])
+def test_loudness_normalized_render_is_written_at_target(tmp_path, fmt):
+    """--lufs output keeps its loudness and true-peak ceiling instead of being peak-normalized"""
+    sf = pytest.importorskip("soundfile")
+    import numpy as np
+    from voice_clone.core.application import VoiceCloneApp
+    from voice_clone.modules.loudness import LoudnessMeter
+
+    config = _config(tmp_path)
+    config.pipeline.encode_processes = 0
+    app = VoiceCloneApp(config)
+    app.voice_embedder.store_voice("alice", np.ones(512, dtype=np.float32))
+    script = tmp_path / "script.jsonl"
+    script.write_text(json.dumps({"voice": "alice", "text": "A line long enough to measure its loudness."}),
+                      encoding="utf-8")
+
+    summary = app.render_script(str(script), output_dir=str(tmp_path / "out"), target_lufs=-23.0, fmt=fmt)
+    assert summary["rendered"] == 1
+    record = json.loads(open(summary["manifest"], encoding="utf-8").readline())
+    waveform, sr = sf.read(record["output"], dtype="float32")
+    meter = LoudnessMeter(sr)
+    meter.update(waveform)
+    assert abs(meter.integrated() + 23.0) < 0.5
+    assert np.abs(waveform).max() <= 10 ** (config.audio.true_peak_db / 20) + 1e-3
+
+
+@pytest.mark.parametrize("target_lufs", [None, -23.0])
+def test_manifest_loudness_matches_written_file(tmp_path, target_lufs):
+    """The manifest's loudness_lufs is that of the file on disk, peak-normalized or not"""
+    sf = pytest.importorskip("soundfile")
+    import numpy as np
+    from voice_clone.core.application import VoiceCloneApp
+    from voice_clone.modules.loudness import LoudnessMeter
+
+    config = _config(tmp_path)
+    config.pipeline.encode_processes = 0
+    app = VoiceCloneApp(config)
+    app.voice_embedder.store_voice("alice", np.ones(512, dtype=np.float32))
+    script = tmp_path / "script.jsonl"
+    script.write_text(json.dumps({"voice": "alice", "text": "A line long enough to measure its loudness."}),
+                      encoding="utf-8")
+
+    summary = app.render_script(str(script), output_dir=str(tmp_path / "out"), target_lufs=target_lufs)
+    record = json.loads(open(summary["manifest"], encoding="utf-8").readline())
+    waveform, sr = sf.read(record["output"], dtype="float32")
+    meter = LoudnessMeter(sr)
+    meter.update(waveform)
+    assert abs(record["loudness_lufs"] - meter.integrated()) < 0.2
+
+
+def test_script_lines_render_like_gui_exports(tmp_path):
+    """A script line gives the same audio as synthesize_speech and shares its render cache entry"""
+    sf = pytest.importorskip("soundfile")
+    import numpy as np
+    from voice_clone.core.application import VoiceCloneApp
+
+    config = _config(tmp_path)
+    config.pipeline.encode_processes = 0
+    app = VoiceCloneApp(config)
+    app.voice_embedder.store_voice("alice", np.linspace(-1, 1, 512, dtype=np.float32))
+    text = "First clause, second clause. And a sentence!"
+    script = tmp_path / "script.jsonl"
+    script.write_text(json.dumps({"voice": "alice", "text": text, "rate": 1.2, "pitch": 5}), encoding="utf-8")
+
+    summary = app.render_script(str(script), output_dir=str(tmp_path / "out"))
+    record = json.loads(open(summary["manifest"], encoding="utf-8").readline())
+    hits = app.render_cache.hits
+    exported = app.synthesize_speech("alice", text, 1.2, 5.0)
+
+    assert app.render_cache.hits == hits + 1
+    script_audio, sr = sf.read(record["output"], dtype="float32")
+    gui_audio, gui_sr = sf.read(exported, dtype="float32")
+    assert sr == gui_sr
+    np.testing.assert_allclose(script_audio, gui_audio, atol=1e-4)
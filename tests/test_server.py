@@ -0,0 +1,233 @@
+# Tests for the local synthesis server
+import asyncio
+import json
+import struct
+import threading
+import numpy as np
+import pytest
+from voice_clone.core.config import Config
+from voice_clone.server import SynthesisServer
+from voice_clone.server.protocol import (
+    CLOSE_TRY_AGAIN_LATER, OP_BINARY, OP_CLOSE, OP_TEXT, encode_frame, read_message,
+)
+
+
+def test_masked_frame_roundtrip():
+    """Test masked client frames of every length encoding decode back unchanged"""
+    async def roundtrip(payload):
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_frame(OP_BINARY, payload, mask=True))
+        reader.feed_eof()
+        return await read_message(reader, max_size=1 << 20)
+    
+    for size in (0, 5, 125, 126, 70000):
+        payload = bytes(range(256)) * (size // 256) + bytes(range(size % 256))
+        assert asyncio.run(roundtrip(payload)) == (OP_BINARY, payload)
+
+
+def test_rejects_non_loopback_host(tmp_path):
+    """Test the server refuses to bind beyond localhost"""
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    config.server.host = "0.0.0.0"
+    with pytest.raises(ValueError):
+        SynthesisServer(config)
+
+
+def _server_config(tmp_path, workers: int = 1, max_queue: int = 0) -> Config:
+    config = Config(app_dir=tmp_path, models_dir=tmp_path / "models", voices_dir=tmp_path / "voices",
+                    exports_dir=tmp_path / "exports", logs_dir=tmp_path / "logs", cache_dir=tmp_path / "cache")
+    config.model.device = "cpu"
+    config.server.port = 0
+    config.server.workers = workers
+    config.server.max_queue = max_queue
+    config.server.stream_chunk_size = 1024
+    return config
+
+
+class _GatedStream:
+    """Stand-in for synthesize_speech_stream whose chunks wait for a gate; counts chunks produced"""
+    
+    def __init__(self, chunks: int = 4):
+        self.gate = threading.Event()
+        self.chunks = chunks
+        self.produced = 0
+    
+    def __call__(self, voice_name, text, speech_rate=1.0, pitch=0.0, tone="neutral", chunk_size=4096):
+        for _ in range(self.chunks):
+            if not self.gate.wait(5):
+                return
+            self.produced += 1
+            yield np.full(chunk_size, 0.1, dtype=np.float32)
+
+
+def _start_server(tmp_path, stream: _GatedStream, **kwargs) -> SynthesisServer:
+    from voice_clone.core.application import VoiceCloneApp
+    
+    app = VoiceCloneApp(_server_config(tmp_path, **kwargs))
+    app.synthesize_speech_stream = stream
+    return SynthesisServer(app=app)
+
+
+async def _post(port: int, body: dict, reader_writer=None):
+    """POST /synthesize and return (status, headers, body)"""
+    reader, writer = reader_writer or await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode("utf-8")
+    writer.write(b"POST /synthesize HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\n\r\n%s" % (len(payload), payload))
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in head[1:] if line)
+    data = await reader.readexactly(int(headers["Content-Length"]))
+    if reader_writer is None:
+        writer.close()
+    return int(head[0].split()[1]), headers, data
+
+
+async def _websocket(port: int, body: dict):
+    """Open /stream, send the request and return every message up to the close frame"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /stream HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(encode_frame(OP_TEXT, json.dumps(body).encode("utf-8"), mask=True))
+    messages = []
+    while True:
+        opcode, payload = await read_message(reader)
+        messages.append((opcode, payload))
+        if opcode == OP_CLOSE:
+            break
+    writer.close()
+    return messages
+
+
+REQUEST = {"voice": "alice", "text": "Hello there."}
+
+
+def test_overload_is_rejected_with_503(tmp_path):
+    """Requests beyond workers + max_queue are rejected at once, and WebSocket rejects carry no header"""
+    stream = _GatedStream()
+    server = _start_server(tmp_path, stream)
+    
+    async def scenario():
+        await server.start()
+        first = asyncio.ensure_future(_post(server.port, REQUEST))
+        while server.admitted == 0:
+            await asyncio.sleep(0.01)
+        
+        status, headers, _ = await _post(server.port, REQUEST)
+        assert status == 503 and headers["Retry-After"] == "1"
+        messages = await _websocket(server.port, REQUEST)
+        assert [opcode for opcode, _ in messages] == [OP_TEXT, OP_CLOSE]
+        assert json.loads(messages[0][1])["status"] == 503
+        assert struct.unpack("!H", messages[1][1][:2])[0] == CLOSE_TRY_AGAIN_LATER
+        
+        stream.gate.set()
+        status, headers, body = await first
+        assert status == 200 and headers["Content-Type"] == "audio/wav" and body[:4] == b"RIFF"
+        assert server.stats()["rejected"] == 2 and server.stats()["completed"] == 1
+        await server.shutdown()
+    
+    asyncio.run(scenario())
+
+
+def test_deadline_expiry_returns_504_and_frees_the_worker(tmp_path):
+    """A request past its deadline gets 504 and its worker stops at the next chunk"""
+    stream = _GatedStream()
+    server = _start_server(tmp_path, stream)
+    
+    async def scenario():
+        await server.start()
+        status, _, body = await _post(server.port, {**REQUEST, "deadline_ms": 100})
+        assert status == 504 and b"Deadline" in body
+        assert server.stats()["timed_out"] == 1
+        
+        stream.gate.set()
+        while server.running:
+            await asyncio.sleep(0.01)
+        assert stream.produced <= 1  # cancelled at its first chunk
+        status, _, _ = await _post(server.port, REQUEST)
+        assert status == 200
+        await server.shutdown()
+    
+    asyncio.run(scenario())
+
+
+def test_stream_backpressure_stalls_synthesis_for_a_slow_client(tmp_path):
+    """A client that stops reading stalls the producer instead of buffering its output"""
+    stream = _GatedStream(chunks=100000)
+    stream.gate.set()
+    server = _start_server(tmp_path, stream)
+    
+    async def scenario():
+        await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /stream HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(encode_frame(OP_TEXT, json.dumps({**REQUEST, "deadline_ms": 1000}).encode("utf-8"),
+                                  mask=True))
+        
+        # Never read the audio: once the reader's buffer is full the socket fills up
+        previous = -1
+        while stream.produced != previous:
+            previous = stream.produced
+            await asyncio.sleep(0.3)
+        assert 0 < stream.produced < stream.chunks
+        
+        # The stalled send counts against the deadline, so the slot is released
+        while server.running:
+            await asyncio.sleep(0.05)
+        assert server.stats()["timed_out"] == 1
+        writer.close()
+        await server.shutdown()
+    
+    asyncio.run(scenario())
+
+
+def test_shutdown_drains_admitted_requests(tmp_path):
+    """Shutdown finishes admitted work and rejects new requests while draining"""
+    stream = _GatedStream()
+    server = _start_server(tmp_path, stream, max_queue=1)
+    
+    async def scenario():
+        await server.start()
+        idle = await asyncio.open_connection("127.0.0.1", server.port)
+        running = asyncio.ensure_future(_post(server.port, REQUEST))
+        while server.admitted == 0:
+            await asyncio.sleep(0.01)
+        
+        shutdown = asyncio.ensure_future(server.shutdown(drain_timeout=5))
+        await asyncio.sleep(0.05)
+        assert server.stats()["status"] == "draining" and not shutdown.done()
+        status, _, body = await _post(0, REQUEST, idle)  # listener is closed; reuse an open connection
+        assert status == 503 and b"draining" in body
+        
+        stream.gate.set()
+        status, _, _ = await running
+        assert status == 200
+        await asyncio.wait_for(shutdown, 5)
+        assert server.stats()["completed"] == 1
+    
+    asyncio.run(scenario())
+
+
+def test_drain_timeout_cancels_running_requests(tmp_path):
+    """Requests still running when the drain times out are cancelled"""
+    stream = _GatedStream()
+    server = _start_server(tmp_path, stream)
+    
+    async def scenario():
+        await server.start()
+        running = asyncio.ensure_future(_post(server.port, REQUEST))
+        while server.admitted == 0:
+            await asyncio.sleep(0.01)
+        shutdown = asyncio.ensure_future(server.shutdown(drain_timeout=0.1))
+        await asyncio.sleep(0.2)
+        stream.gate.set()  # the worker sees its cancellation at the next chunk
+        await asyncio.wait_for(shutdown, 5)
+        assert stream.produced == 1
+        with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+            await running
+        assert server.admitted == 0
+    
+    asyncio.run(scenario())
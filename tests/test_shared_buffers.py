@@ -0,0 +1,78 @@
+# Tests for the shared-memory audio buffer pool
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from voice_clone.core.shared_buffers import SharedBufferPool, attach
+
+
+def _peak(handle) -> float:
+    return float(np.abs(attach(handle)).max())
+
+
+def _crash(handle):
+    attach(handle)
+    os._exit(1)
+
+
+def test_handles_round_trip_to_workers():
+    """Test a worker reads pooled audio through a small pickled handle"""
+    waveform = np.random.default_rng(0).standard_normal(44100 * 5).astype(np.float32)
+    with SharedBufferPool(slab_bytes=1 << 20) as pool, ProcessPoolExecutor(max_workers=1) as workers:
+        handle = pool.put(waveform)
+        assert len(pickle.dumps(handle)) < 200
+        assert workers.submit(_peak, handle).result() == float(np.abs(waveform).max())
+        np.testing.assert_array_equal(pool.array(handle), waveform)
+        pool.release(handle)
+
+
+def test_slabs_are_shared_and_reused():
+    """Test small buffers share a slab at aligned offsets and freed slabs are reused"""
+    with SharedBufferPool(slab_bytes=1 << 20) as pool:
+        a, b = pool.put(np.ones(1000, np.float32)), pool.put(np.zeros(10, np.int16))
+        assert a.name == b.name and a.offset == 0 and b.offset % 64 == 0 and b.offset >= a.nbytes
+        assert pool.array(b).dtype == np.int16
+
+        big = pool.put(np.ones(300000, np.float32))  # over half a slab: dedicated
+        assert big.name != a.name
+        pool.acquire(big)
+        pool.release(big)
+        assert pool.in_use == 2
+        pool.release(big)
+        again = pool.put(np.ones(290000, np.float32))
+        assert again.name == big.name and pool.segments_created == 2
+
+
+def test_worker_crash_releases_buffer():
+    """Test a buffer handed to a crashing worker is still released and unlinked on close"""
+    pool = SharedBufferPool(slab_bytes=1 << 20)
+    handle = pool.put(np.ones(1000, np.float32))
+    with ProcessPoolExecutor(max_workers=1) as workers:
+        try:
+            with pytest.raises(BrokenProcessPool):
+                workers.submit(_crash, handle).result()
+        finally:
+            pool.release(handle)
+    assert pool.in_use == 0
+    pool.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=handle.name)
+
+
+def test_batch_exporter_encodes_from_shared_memory(tmp_path):
+    """Test pooled FLAC export reads the waveform from shared memory and frees it"""
+    pytest.importorskip("soundfile")
+    from voice_clone.core.batch_export import BatchExporter
+    from voice_clone.core.config import Config
+
+    waveform = (0.4 * np.sin(2 * np.pi * 220 * np.arange(22050) / 22050)).astype(np.float32)
+    with BatchExporter(Config(), "flac", processes=1) as exporter:
+        entry = exporter.export((waveform, 22050), tmp_path / "tone.flac")
+        assert exporter._buffers.in_use == 0
+    assert entry['duration'] == 1.0 and (tmp_path / "tone.flac").stat().st_size == entry['bytes']
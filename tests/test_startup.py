@@ -0,0 +1,18 @@
+# Tests for deferred imports at application startup
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_application_import_defers_heavy_dependencies():
+    """Importing the application core loads none of torch, librosa, scipy or PyQt6"""
+    code = ("import json, sys, voice_clone.core.application; "
+            "print(json.dumps([m for m in ('torch', 'librosa', 'scipy', 'PyQt6') if m in sys.modules]))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), os.environ.get('PYTHONPATH', '')]))
+    # A fresh interpreter, since this test session may already have imported them
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
@@ -0,0 +1,54 @@
+# Tests for the synthesis engine
+import numpy as np
+from voice_clone.core.config import Config
+from voice_clone.modules.synthesis_engine import SynthesisEngine, split_text_units
+
+
+def test_split_text_units():
+    """Test sentence/clause splitting"""
+    units = split_text_units("Hello there, world. How are you?\nFine")
+    assert units == ["Hello there,", "world.", "How are you?", "Fine"]
+
+
+def test_synthesize_stream_chunks():
+    """Test streaming synthesis yields fixed-size float32 chunks"""
+    engine = SynthesisEngine(Config())
+    embedding = np.zeros(512, dtype=np.float32)
+    chunks = list(engine.synthesize_stream("One, two. Three!", embedding, chunk_size=1024))
+    
+    assert len(chunks) > 1
+    assert all(chunk.dtype == np.float32 for chunk in chunks)
+    assert all(len(chunk) == 1024 for chunk in chunks[:-1])
+    assert 0 < len(chunks[-1]) <= 1024
+    
+    # Crossfaded boundaries should not introduce discontinuities
+    waveform = np.concatenate(chunks)
+    assert np.max(np.abs(np.diff(waveform))) < 0.05
+
+
+def test_synthesize_variants_match_stream():
+    """Test batched variants are identical to independent streaming renders"""
+    engine = SynthesisEngine(Config())
+    rng = np.random.default_rng(0)
+    voices = [rng.standard_normal(512).astype(np.float32) for _ in range(2)]
+    params = [(voices[0], 1.0, 0.0), (voices[0], 1.2, 0.0), (voices[1], 0.9, 5.0), (voices[1], 1.2, -3.0)]
+    text = "One, two. Three!"
+    
+    results = engine.synthesize_variants(text, [p[0] for p in params], [p[1] for p in params],
+                                         [p[2] for p in params], ["neutral"] * len(params))
+    for (waveform, _), (embedding, rate, pitch) in zip(results, params):
+        expected = np.concatenate(list(engine.synthesize_stream(text, embedding, rate, pitch)))
+        np.testing.assert_allclose(waveform, expected, atol=1e-6)
+
+
+def test_pitch_is_a_percent_of_frequency():
+    """Test pitch shifts the voice by a percentage, as the slider and PRD specify"""
+    engine = SynthesisEngine(Config())
+    embedding = np.zeros(512, dtype=np.float32)
+    for pitch in [-15.0, 15.0]:
+        waveform = np.concatenate(list(engine.synthesize_stream("A steady test tone.", embedding, pitch=pitch)))
+        middle = waveform[len(waveform) // 4:3 * len(waveform) // 4]
+        spectrum = np.abs(np.fft.rfft(middle * np.hanning(len(middle))))
+        frequency = np.argmax(spectrum) * engine.config.audio.sample_rate / len(middle)
+        expected = engine.BASE_FREQUENCY * (1 + pitch / 100)
+        assert abs(frequency - expected) < 0.01 * expected
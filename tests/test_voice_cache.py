@@ -0,0 +1,40 @@
+# Tests for the voice profile cache
+import numpy as np
+from voice_clone.core.config import Config
+from voice_clone.modules.voice_cache import VoiceProfileCache
+from voice_clone.modules.voice_embedder import VoiceEmbedder
+
+
+def test_lru_eviction_and_pinning():
+    """Test LRU eviction honours max size and pinned entries"""
+    cache = VoiceProfileCache(max_size=2)
+    cache.pin("a")
+    for name in ["a", "b", "c"]:
+        cache.get(name, 0, lambda: np.zeros(4, dtype=np.float32))
+    
+    cache.get("a", 0, lambda: np.ones(4, dtype=np.float32))
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 3
+    assert stats['evictions'] == 1
+    assert stats['size'] == 2
+
+
+def test_profile_cache_invalidation(tmp_path):
+    """Test overwrite and delete invalidate cached embeddings"""
+    embedder = VoiceEmbedder(Config())
+    profile_path = tmp_path / "alice.npz"
+    
+    first = np.ones(512, dtype=np.float32)
+    embedder.save_voice_profile(first, profile_path, "alice")
+    np.testing.assert_array_equal(embedder.load_voice_profile(profile_path), first)
+    np.testing.assert_array_equal(embedder.load_voice_profile(profile_path), first)
+    assert embedder.profile_cache.stats()['hits'] == 1
+    
+    second = np.full(512, 2.0, dtype=np.float32)
+    embedder.save_voice_profile(second, profile_path, "alice")
+    np.testing.assert_array_equal(embedder.load_voice_profile(profile_path), second)
+    
+    assert embedder.delete_voice_profile(profile_path)
+    assert embedder.profile_cache.stats()['size'] == 0
+    assert not profile_path.exists()
@@ -0,0 +1,56 @@
+# Tests for the voice similarity index
+import numpy as np
+from voice_clone.modules.voice_search import VoiceIndex, normalize_rows
+
+
+def _library(n: int = 2000, dim: int = 64, seed: int = 0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return [f"voice_{i}" for i in range(n)], vectors
+
+
+def test_exact_search_matches_brute_force():
+    """Test exhaustive search returns the true top-k by cosine similarity"""
+    names, vectors = _library()
+    index = VoiceIndex(names, vectors)
+    query = vectors[17] + 0.1 * np.random.default_rng(1).standard_normal(vectors.shape[1]).astype(np.float32)
+
+    results = index.search(query, k=5)
+    scores = normalize_rows(vectors) @ normalize_rows(query[None])[0]
+    expected = np.argsort(-scores)[:5]
+    assert [name for name, _ in results] == [names[i] for i in expected]
+    assert results[0][0] == "voice_17"
+    np.testing.assert_allclose([score for _, score in results], scores[expected], rtol=1e-5)
+
+
+def test_ivf_recall_against_exact_search():
+    """Test IVF search recall rises with nprobe and is exact when every list is probed"""
+    names, vectors = _library()
+    index = VoiceIndex(names, vectors)
+    index.build_ivf(n_lists=32)
+    assert index.list_offsets[-1] == len(names)
+
+    queries = vectors[:50] + 0.3 * np.random.default_rng(2).standard_normal((50, vectors.shape[1])).astype(np.float32)
+    recalls = []
+    for nprobe in (1, 8, 32):
+        hits = 0
+        for query in queries:
+            exact = {name for name, _ in index.search(query, k=10)}
+            hits += len(exact & {name for name, _ in index.search(query, k=10, nprobe=nprobe)})
+        recalls.append(hits / (10 * len(queries)))
+    assert recalls[0] <= recalls[1] <= recalls[2] == 1.0
+    assert recalls[1] >= 0.5
+
+
+def test_find_duplicates_across_tiles():
+    """Test near-duplicates are found within and across similarity tiles, each pair once"""
+    names, vectors = _library(n=300)
+    rng = np.random.default_rng(3)
+    for a, b in [(5, 6), (10, 250), (120, 299)]:
+        vectors[b] = vectors[a] + 0.01 * rng.standard_normal(vectors.shape[1]).astype(np.float32)
+    index = VoiceIndex(names, vectors)
+
+    pairs = index.find_duplicates(threshold=0.95, block_size=64)
+    assert {(a, b) for a, b, _ in pairs} == {("voice_5", "voice_6"), ("voice_10", "voice_250"),
+                                             ("voice_120", "voice_299")}
+    assert all(score >= 0.95 for _, _, score in pairs)
+    assert pairs == index.find_duplicates(threshold=0.95, block_size=4096)
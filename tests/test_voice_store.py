@@ -0,0 +1,87 @@
+# Tests for the memory-mapped voice store
+import numpy as np
+from voice_clone.modules.voice_store import VoiceStore
+
+
+def test_append_delete_compact(tmp_path):
+    """Test append, tombstone delete, overwrite and compaction"""
+    store = VoiceStore(tmp_path)
+    vectors = {name: np.full(512, i, dtype=np.float32) for i, name in enumerate(["a", "b", "c"])}
+    for name, vector in vectors.items():
+        store.append(name, vector)
+    
+    assert store.delete("b")
+    store.append("c", np.full(512, 9, dtype=np.float32))
+    assert store.list_voices() == ["a", "c"]
+    assert store.get_metadata("c")['version'] == 2
+    
+    assert store.compact() == 2
+    reopened = VoiceStore(tmp_path)
+    np.testing.assert_array_equal(reopened.get("a"), vectors["a"])
+    np.testing.assert_array_equal(reopened.get("c"), np.full(512, 9, dtype=np.float32))
+    assert reopened.matrix().shape == (2, 512)
+
+
+def test_import_npz(tmp_path):
+    """Test importing existing .npz profiles"""
+    embedding = np.arange(512, dtype=np.float32)
+    np.savez(tmp_path / "legacy.npz", embedding=embedding, voice_name="legacy", version='1.0')
+    
+    store = VoiceStore(tmp_path / "store")
+    assert store.import_npz(tmp_path) == 1
+    row = store.get("legacy")
+    assert np.shares_memory(row, store.matrix())
+    np.testing.assert_array_equal(row, embedding)
+
+
+def _crash(*args, **kwargs):
+    raise RuntimeError("simulated crash")
+
+
+def test_compact_crash_before_index_swap_keeps_old_library(tmp_path, monkeypatch):
+    """A crash after the new generation is written but before the index swap loses nothing"""
+    store = VoiceStore(tmp_path, dtype="int8")
+    for i, name in enumerate(["a", "b", "c"]):
+        store.append(name, np.linspace(-1, 1, 512, dtype=np.float32) * (i + 1))
+    store.delete("b")
+    before = {name: store.get(name).copy() for name in ["a", "c"]}
+    
+    monkeypatch.setattr(store, "_write_index", _crash)
+    try:
+        store.compact()
+    except RuntimeError:
+        pass
+    
+    reopened = VoiceStore(tmp_path)
+    assert reopened.list_voices() == ["a", "c"]
+    for name, embedding in before.items():
+        np.testing.assert_array_equal(reopened.get(name), embedding)
+    # The half-written generation is discarded on open
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["library.i8", "library_index.json",
+                                                         "library_scales.f32"]
+
+
+def test_compact_crash_after_index_swap_uses_new_library(tmp_path, monkeypatch):
+    """A crash before the old generation is deleted leaves the compacted library current"""
+    store = VoiceStore(tmp_path)
+    for i, name in enumerate(["a", "b", "c"]):
+        store.append(name, np.full(512, i, dtype=np.float32))
+    store.delete("a")
+    held = store.get("c")
+    
+    monkeypatch.setattr(store, "_remove_stale_generations", _crash)
+    try:
+        store.compact()
+    except RuntimeError:
+        pass
+    # Rows handed out before compaction stay readable
+    np.testing.assert_array_equal(held, np.full(512, 2, dtype=np.float32))
+    
+    reopened = VoiceStore(tmp_path)
+    assert reopened.get_metadata("c")['row'] == 1
+    assert reopened.matrix().shape == (2, 512)
+    np.testing.assert_array_equal(reopened.get("b"), np.full(512, 1, dtype=np.float32))
+    assert not (tmp_path / "library.f32").exists()
+    
+    reopened.append("d", np.full(512, 3, dtype=np.float32))
+    np.testing.assert_array_equal(VoiceStore(tmp_path).get("d"), np.full(512, 3, dtype=np.float32))
@@ -0,0 +1,33 @@
+# Tests for the streaming WAV writer
+import io
+import numpy as np
+import soundfile as sf
+from voice_clone.modules.wav_writer import WavWriter
+
+
+def test_packed_24bit_roundtrip():
+    """Test 24-bit output is packed 3-byte PCM that decodes back to the input"""
+    waveform = (0.5 * np.sin(np.linspace(0, 100, 10000))).astype(np.float32)
+    buffer = io.BytesIO()
+    with WavWriter(buffer, 48000, bit_depth=24) as writer:
+        for start in range(0, len(waveform), 3000):
+            writer.write(waveform[start:start + 3000])
+    
+    assert len(buffer.getvalue()) == 44 + 3 * len(waveform)
+    buffer.seek(0)
+    decoded, sr = sf.read(buffer, dtype='float32')
+    assert sr == 48000
+    assert sf.info(io.BytesIO(buffer.getvalue())).subtype == 'PCM_24'
+    np.testing.assert_allclose(decoded, waveform, atol=2 ** -22)
+
+
+def test_header_patched_on_close(tmp_path):
+    """Test header sizes are patched when frame count was not known up front"""
+    path = tmp_path / "out.wav"
+    with WavWriter(path, 16000, bit_depth=16, dither=True, seed=0) as writer:
+        writer.write(np.zeros(1000, dtype=np.float32))
+        writer.write(np.full(500, 0.25, dtype=np.float32))
+    
+    info = sf.info(str(path))
+    assert info.frames == 1500
+    assert info.subtype == 'PCM_16'
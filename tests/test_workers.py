@@ -0,0 +1,83 @@
+# Tests for the GUI's background job queue
+import threading
+import time
+import pytest
+
+pytest.importorskip("PyQt6")
+from PyQt6.QtCore import QCoreApplication  # noqa: E402
+from voice_clone.core.progress import JobCancelled  # noqa: E402
+from voice_clone.ui.workers import Job, JobQueue  # noqa: E402
+
+
+@pytest.fixture
+def qapp():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _settle(qapp, queue: JobQueue):
+    """Wait for the queue and deliver any queued signals"""
+    assert queue.wait(5000)
+    qapp.processEvents()
+
+
+def test_cancel_raises_job_cancelled_at_next_progress(qapp):
+    """Cancelling a running job raises JobCancelled inside it, and pending jobs never start"""
+    running, release = threading.Event(), threading.Event()
+    raised, outcomes, ran = [], [], []
+
+    def long_task(progress):
+        progress("render", 0, 2)
+        running.set()
+        release.wait(5)
+        try:
+            progress("render", 1, 2)
+        except JobCancelled as e:
+            raised.append(e)
+            raise
+        return "done"
+
+    queue = JobQueue()
+    first = queue.submit(Job("first", long_task))
+    second = queue.submit(Job("second", lambda progress: ran.append("second")))
+    for job in (first, second):
+        job.signals.cancelled.connect(lambda job=job: outcomes.append(("cancelled", job.description)))
+        job.signals.finished.connect(lambda result, job=job: outcomes.append(("finished", job.description)))
+    assert running.wait(5)
+    queue.cancel_all()
+    release.set()
+    _settle(qapp, queue)
+
+    assert len(raised) == 1 and first.is_cancelled and second.is_cancelled
+    assert not ran
+    assert sorted(outcomes) == [("cancelled", "first"), ("cancelled", "second")]
+    assert len(queue) == 0 and queue.current is None
+
+
+def test_jobs_run_one_at_a_time_in_submission_order(qapp):
+    """The queue never overlaps two jobs and starts them in the order they were submitted"""
+    lock = threading.Lock()
+    active, spans = [0], []
+
+    def task(name):
+        def run(progress):
+            with lock:
+                active[0] += 1
+                overlap = active[0]
+            start = time.perf_counter()
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            spans.append((name, start, time.perf_counter(), overlap))
+            return name
+        return run
+
+    queue = JobQueue()
+    results = []
+    for name in ("a", "b", "c"):
+        queue.submit(Job(name, task(name))).signals.finished.connect(results.append)
+    _settle(qapp, queue)
+
+    assert [span[0] for span in spans] == ["a", "b", "c"]
+    assert all(span[3] == 1 for span in spans)
+    assert all(earlier[2] <= later[1] for earlier, later in zip(spans, spans[1:]))
+    assert sorted(results) == ["a", "b", "c"]